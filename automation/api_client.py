@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+接口模式模块，复用浏览器登录后的Cookie，通过长连接池直接调用试卷编辑器的后台接口
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config.settings import (
+    API_BASE_URL, API_CREATE_PAPER_PATH, API_ADD_SECTION_PATH, API_ADD_QUESTION_PATH,
+    API_MAX_CONCURRENCY, API_POOL_SIZE, API_TIMEOUT, API_MAX_RETRIES,
+)
+from automation.question_import import ImportStats
+from utils.exceptions import ApiError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def session_from_driver(driver):
+    """
+    从已登录的浏览器中读取接口请求需要的Cookie和请求头
+
+    Args:
+        driver: 已打开考试星页面的ChromeDriver实例
+
+    Returns:
+        tuple: (Cookie列表, 请求头字典)
+    """
+    cookies = driver.driver.get_cookies()
+    headers = {
+        "User-Agent": driver.driver.execute_script("return navigator.userAgent"),
+        "Referer": driver.driver.current_url,
+        "X-Requested-With": "XMLHttpRequest",
+    }
+    logger.info(f"从浏览器读取了 {len(cookies)} 个Cookie")
+    return cookies, headers
+
+class KaoshixingApiClient:
+    """试卷编辑器后台接口客户端，所有请求共用一个带连接池的会话"""
+
+    def __init__(self, cookies=None, headers=None, base_url=API_BASE_URL,
+                 max_concurrency=API_MAX_CONCURRENCY, pool_size=API_POOL_SIZE, timeout=API_TIMEOUT):
+        """
+        Args:
+            cookies (list): selenium格式的Cookie列表
+            headers (dict): 附加的请求头
+            base_url (str): 接口地址，可以指向本地的模拟服务
+            max_concurrency (int): 同时发送的请求数
+            pool_size (int): 每个主机保持的长连接数
+            timeout (float): 单个请求的超时时间（秒）
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        # 接口都是POST，创建章节和题目不是幂等的，只在连接没有建立时重试，
+        # 读取超时和5xx响应时服务端可能已经执行了请求，重试会重复创建
+        retry = Retry(
+            total=API_MAX_RETRIES,
+            connect=API_MAX_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.3,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, max_concurrency), max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if headers:
+            self.session.headers.update(headers)
+        for cookie in cookies or []:
+            self.session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain", ""), path=cookie.get("path", "/"),
+            )
+
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+    def _post(self, path, payload):
+        """
+        发送POST请求并解析返回的JSON
+
+        Returns:
+            dict: 响应中的data字段
+
+        Raises:
+            ApiError: 请求失败、登录失效或接口返回错误
+        """
+        url = self.base_url + path
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ApiError(f"请求失败 {path}: {str(e)}")
+        finally:
+            with self._lock:
+                self.requests_sent += 1
+
+        if response.status_code in (401, 403):
+            raise ApiError(f"登录状态已失效（HTTP {response.status_code}），请在浏览器中重新登录")
+        if response.status_code >= 400:
+            raise ApiError(f"接口返回HTTP {response.status_code}: {path}")
+        try:
+            body = response.json()
+        except ValueError:
+            raise ApiError(f"接口返回的不是JSON，可能需要重新登录: {path}")
+        if not body.get("success", True):
+            raise ApiError(f"接口返回错误 {path}: {body.get('message') or body}")
+        return body.get("data") or {}
+
+    def create_paper(self, name):
+        """
+        创建试卷
+
+        Args:
+            name (str): 试卷名称
+
+        Returns:
+            str: 试卷ID
+        """
+        data = self._post(API_CREATE_PAPER_PATH, {"paperName": name})
+        paper_id = data.get("paperId") or data.get("id")
+        if not paper_id:
+            raise ApiError(f"创建试卷的响应中没有试卷ID: {data}")
+        logger.info(f"已创建试卷: {name}（ID: {paper_id}）")
+        return str(paper_id)
+
+    def add_section(self, paper_id, name, order):
+        """
+        添加大题
+
+        Args:
+            paper_id (str): 试卷ID
+            name (str): 大题名称
+            order (int): 大题序号
+
+        Returns:
+            str: 大题ID
+        """
+        data = self._post(API_ADD_SECTION_PATH.format(paper_id=paper_id), {"name": name, "sort": order})
+        return str(data.get("sectionId") or data.get("id") or "")
+
+    def add_question(self, paper_id, section_id, question_type, content, order):
+        """
+        添加题目，序号随请求发送，并发请求不影响题目顺序
+
+        Args:
+            paper_id (str): 试卷ID
+            section_id (str): 大题ID，可以为空
+            question_type (str): 题型，QuestionType中的常量
+            content (str): 题干
+            order (int): 题目在试卷中的序号
+
+        Returns:
+            dict: 接口返回的数据
+        """
+        payload = {
+            "sectionId": section_id,
+            "questionType": question_type,
+            "content": content,
+            "sort": order,
+        }
+        return self._post(API_ADD_QUESTION_PATH.format(paper_id=paper_id), payload)
+
+def import_questions_via_api(client, paper_name, batches):
+    """
+    通过接口创建试卷并导入题库，大题按顺序依次创建，同一批内的题目并发添加
+
+    Args:
+        client (KaoshixingApiClient): 接口客户端
+        paper_name (str): 试卷名称
+        batches: 题目批次迭代器，通常由iter_batches生成
+
+    Returns:
+        tuple: (试卷ID, ImportStats)，创建试卷失败时试卷ID为None
+    """
+    stats = ImportStats()
+    try:
+        paper_id = client.create_paper(paper_name)
+    except ApiError as e:
+        logger.error(f"创建试卷失败: {str(e)}")
+        return None, stats
+
+    # 与页面导入一致：大题名称变化时添加新的大题，未填写大题名称的题目归入前一个大题
+    current_section, section_id = None, ""
+    order = 0
+    with ThreadPoolExecutor(max_workers=client.max_concurrency) as executor:
+        for batch in batches:
+            jobs = []
+            try:
+                for record in batch:
+                    section = record["section"]
+                    if section and section != current_section:
+                        section_id = client.add_section(paper_id, section, stats.sections + 1)
+                        stats.sections += 1
+                        current_section = section
+                    order += 1
+                    jobs.append((record, executor.submit(
+                        client.add_question, paper_id, section_id,
+                        record["type"], record["content"], order,
+                    )))
+            except ApiError as e:
+                logger.error(f"第{record['line']}行: 添加大题失败: {str(e)}")
+                stats.failed_record = record
+
+            for record, future in jobs:
+                try:
+                    future.result()
+                    stats.questions += 1
+                except ApiError as e:
+                    logger.error(f"第{record['line']}行: 添加{record['type']}失败: {str(e)}")
+                    if stats.failed_record is None:
+                        stats.failed_record = record
+            if stats.failed_record is not None:
+                return paper_id, stats
+
+            stats.batches += 1
+            logger.info(
+                f"已完成第{stats.batches}批，累计{stats.questions}题，"
+                f"吞吐量: {stats.questions_per_minute:.1f} 题/分钟"
+            )
+
+    logger.info(
+        f"接口导入完成: {stats.sections}个大题，{stats.questions}题，共{client.requests_sent}个请求，"
+        f"用时{stats.elapsed:.1f}秒，吞吐量: {stats.questions_per_minute:.1f} 题/分钟"
+    )
+    return paper_id, stats
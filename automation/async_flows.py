@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+试卷操作的异步版本，基于DevTools协议驱动，一个浏览器的多个标签页可以同时创建多份试卷
+
+每个操作编译为一次批量页面脚本，与同步版本使用同一份元素注册表。
+"""
+
+import asyncio
+from core.actions import ActionBatch, first_failure
+from core.cdp_driver import AsyncChromeBrowser
+from automation.locators import LOCATORS, css_selectors
+from automation.paper_settings import FEATURE_OPTIONS_SCRIPT, select_feature_options
+from automation.question_import import ImportStats, split_by_section
+from automation.question_management import build_question_batch, count_added_questions
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def _selectors(name):
+    """获取注册表中元素的选择器链"""
+    return LOCATORS[name].selectors
+
+async def _run(tab, batch, action):
+    """
+    执行批量操作并记录失败的步骤
+
+    Returns:
+        list: 每个步骤的结果，执行出错时返回None
+    """
+    try:
+        results = await tab.run_batch(batch)
+    except Exception as e:
+        logger.error(f"{action}时发生错误: {str(e)}")
+        return None
+    failure = first_failure(results)
+    if failure:
+        logger.error(f"{action}失败，步骤 {failure['label']}: {failure.get('error', '未执行')}")
+    return results
+
+async def configure_paper_settings_async(tab, features=None):
+    """
+    配置试卷设置，configure_paper_settings的异步版本
+
+    Args:
+        tab (AsyncTab): 标签页
+        features (dict): 试卷功能选项的目标状态，{选项序号（从1开始）或选项文字: 是否勾选}；
+            None表示点击第三个选项
+
+    Returns:
+        bool: 操作是否成功
+    """
+    batch = ActionBatch()
+    batch.click(_selectors("settings_button"), label="settings_button")
+    if features is None:
+        batch.click(_selectors("settings_feature_checkbox"), label="settings_feature_checkbox")
+    else:
+        # 先打开对话框读取各选项的勾选状态，再只点击需要改变的选项
+        batch.wait_visible(_selectors("settings_feature_options"), label="settings_feature_options")
+        results = await _run(tab, batch, "打开试卷设置")
+        if results is None or first_failure(results) is not None:
+            return False
+        try:
+            options = await tab.execute_script(FEATURE_OPTIONS_SCRIPT, css_selectors("settings_feature_options"))
+            clicks = select_feature_options(options, features)
+        except Exception as e:
+            logger.error(f"配置试卷设置时发生错误: {str(e)}")
+            return False
+        batch = ActionBatch()
+        for index, key, wanted in clicks:
+            logger.info(f"{'勾选' if wanted else '取消勾选'}试卷功能选项: {key}")
+            batch.click(_selectors("settings_feature_options"), label=f"feature:{key}", index=index)
+    batch.click(_selectors("settings_confirm_button"), label="settings_confirm_button")
+    batch.wait_hidden(_selectors("settings_confirm_button"), label="settings_dialog_closed")
+    results = await _run(tab, batch, "配置试卷设置")
+    return results is not None and first_failure(results) is None
+
+async def add_section_async(tab, section_name=""):
+    """
+    添加大题，add_section的异步版本
+
+    Args:
+        tab (AsyncTab): 标签页
+        section_name (str): 大题名称（可选）
+
+    Returns:
+        bool: 操作是否成功
+    """
+    batch = ActionBatch()
+    batch.click(_selectors("add_section_button"), label="add_section_button")
+    if section_name:
+        batch.fill_text(_selectors("section_name_input"), section_name, label="section_name")
+    results = await _run(tab, batch, "添加大题")
+    return results is not None and first_failure(results) is None
+
+async def add_questions_async(tab, question_types, contents=None):
+    """
+    批量添加题目，add_questions的异步版本
+
+    Args:
+        tab (AsyncTab): 标签页
+        question_types (list): 题目类型列表
+        contents (list): 与题目类型对应的题干内容（可选）
+
+    Returns:
+        int: 按顺序成功添加的题目数量
+    """
+    question_types = list(question_types)
+    contents = list(contents) if contents else [""] * len(question_types)
+    batch = build_question_batch(question_types, contents)
+    results = await _run(tab, batch, "批量添加题目")
+    if results is None:
+        return 0
+    return count_added_questions(results, question_types)
+
+async def add_question_async(tab, question_type):
+    """
+    添加指定类型的题目，add_question的异步版本
+
+    Args:
+        tab (AsyncTab): 标签页
+        question_type (str): 题目类型
+
+    Returns:
+        bool: 操作是否成功
+    """
+    return await add_questions_async(tab, [question_type]) == 1
+
+async def import_questions_async(tab, batches):
+    """
+    将题库批次依次添加到标签页中的试卷，import_questions的异步版本
+
+    Args:
+        tab (AsyncTab): 已打开创建试卷页面的标签页
+        batches: 题目批次迭代器
+
+    Returns:
+        ImportStats: 导入统计信息
+    """
+    stats = ImportStats()
+    current_section = None
+    for batch in batches:
+        for section, records in split_by_section(batch):
+            if section and section != current_section:
+                if not await add_section_async(tab, section):
+                    stats.failed_record = records[0]
+                    return stats
+                stats.sections += 1
+                current_section = section
+
+            added = await add_questions_async(
+                tab, [record["type"] for record in records], [record["content"] for record in records]
+            )
+            stats.questions += added
+            if added < len(records):
+                stats.failed_record = records[added]
+                logger.error(f"第{records[added]['line']}行: 添加{records[added]['type']}失败")
+                return stats
+        stats.batches += 1
+    return stats
+
+async def build_paper_async(browser, url, batches, label=""):
+    """
+    在新标签页中创建一份试卷
+
+    Args:
+        browser (AsyncChromeBrowser): 浏览器
+        url (str): 创建试卷页面的URL
+        batches: 题目批次迭代器
+        label (str): 日志中使用的试卷标识
+
+    Returns:
+        bool: 试卷是否创建成功
+    """
+    tab = await browser.new_tab()
+    try:
+        if not await tab.navigate(url):
+            return False
+        stats = await import_questions_async(tab, batches)
+        logger.info(
+            f"试卷 {label} 完成: {stats.sections}个大题，{stats.questions}题，"
+            f"用时{stats.elapsed:.1f}秒，吞吐量: {stats.questions_per_minute:.1f} 题/分钟"
+        )
+        return stats.succeeded
+    except Exception as e:
+        logger.error(f"创建试卷 {label} 时发生错误: {str(e)}")
+        return False
+    finally:
+        await tab.close()
+
+async def build_papers_async(profile_name, url, jobs, headless=False):
+    """
+    在一个浏览器中为每份试卷打开一个标签页，并发创建多份试卷
+
+    Args:
+        profile_name (str): 用于复制登录状态的Chrome用户配置文件名称
+        url (str): 创建试卷页面的URL
+        jobs (list): [(试卷标识, 题目批次迭代器), ...]
+        headless (bool): 是否以无头模式运行
+
+    Returns:
+        list: 每份试卷是否创建成功
+    """
+    async with AsyncChromeBrowser(profile_name=profile_name, headless=headless) as browser:
+        results = await asyncio.gather(*(
+            build_paper_async(browser, url, batches, label) for label, batches in jobs
+        ))
+    logger.info(f"试卷创建完成: 成功{sum(1 for result in results if result)}份，共{len(jobs)}份")
+    return list(results)
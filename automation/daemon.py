@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+常驻服务模块，从任务队列中持续领取任务，由固定数量的工作进程创建试卷
+
+每个工作进程启动后保持一个已打开创建试卷页面的浏览器，依次处理领取到的任务。
+主进程负责启动和看护工作进程（意外退出时重新排队其任务，按指数退避延迟后重启），在本机提供HTTP接口：
+    POST /jobs        提交任务，请求体为{"import_file": ..., "library": ..., "restart": false}，
+                      多个文件时使用"import_files"
+    GET  /jobs/<id>   查询任务状态
+    GET  /metrics     队列深度、任务耗时和工作进程利用率
+并每隔DAEMON_REPORT_INTERVAL秒在日志中输出一次统计。
+"""
+
+import os
+import json
+import time
+import signal
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.settings import JOB_QUEUE_FILE, DAEMON_WORKERS, DAEMON_HOST, DAEMON_PORT, DAEMON_REPORT_INTERVAL
+from utils.logger import setup_logger, get_process_queue, configure_worker_logging
+from automation.job_queue import JobQueue, format_metrics
+
+logger = setup_logger(__name__)
+
+# 主进程检查工作进程状态的间隔（秒）
+SUPERVISE_INTERVAL = 1.0
+
+# 工作进程意外退出后重启的等待时间（秒），连续退出时每次翻倍，不超过RESTART_BACKOFF_MAX
+RESTART_BACKOFF_BASE = 1.0
+RESTART_BACKOFF_MAX = 300.0
+
+# 工作进程运行超过此时间（秒）后退出不计为连续退出，重启等待时间从头计算
+WORKER_STABLE_SECONDS = 600
+
+# 停止服务时等待工作进程完成当前任务的时间（秒），超过后强制结束
+STOP_TIMEOUT = 60
+
+def _worker_main(worker_target, name, log_queue, stop_event, args):
+    """工作进程入口，日志发送到主进程后调用worker_target(name, stop_event, *args)"""
+    # Ctrl+C由主进程处理，工作进程通过stop_event在任务之间停止，不中断正在创建的试卷
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_worker_logging(log_queue, worker=name)
+    worker_target(name, stop_event, *args)
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """任务提交和查询接口"""
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with JobQueue(self.server.queue_path) as queue:
+            if self.path == "/metrics":
+                self._reply(200, queue.metrics(self.server.started_at))
+                return
+            parts = self.path.strip("/").split("/")
+            if len(parts) == 2 and parts[0] == "jobs" and parts[1].isdigit():
+                job = queue.get(int(parts[1]))
+                if job:
+                    self._reply(200, job)
+                    return
+        self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            import_files = request.get("import_files") or [request.get("import_file")]
+        except (ValueError, AttributeError):
+            self._reply(400, {"error": "请求体不是有效的JSON对象"})
+            return
+        missing = [path for path in import_files if not isinstance(path, str) or not os.path.isfile(path)]
+        if missing:
+            self._reply(400, {"error": f"题库文件不存在: {missing}"})
+            return
+        with JobQueue(self.server.queue_path) as queue:
+            ids = [queue.submit(path, request.get("library"), request.get("restart", False)) for path in import_files]
+        logger.info(f"通过HTTP接口提交了{len(ids)}个任务: {ids}")
+        self._reply(201, {"ids": ids})
+
+    def log_message(self, format, *args):
+        logger.debug(f"HTTP {self.address_string()} {format % args}")
+
+class JobDaemon:
+    """任务队列常驻服务"""
+
+    def __init__(self, worker_target, worker_args=(), workers=DAEMON_WORKERS, host=DAEMON_HOST, port=DAEMON_PORT,
+                 queue_path=JOB_QUEUE_FILE, report_interval=DAEMON_REPORT_INTERVAL):
+        """
+        Args:
+            worker_target: 工作进程执行的函数，以(name, stop_event, *worker_args)调用，
+                需要能被pickle（模块级函数），在stop_event设置后处理完当前任务返回
+            worker_args (tuple): 传给worker_target的其余参数
+            workers (int): 工作进程数量
+            host (str): HTTP接口监听的地址，只应使用本机地址
+            port (int): HTTP接口的端口，None表示不提供HTTP接口
+            queue_path (str): 任务队列数据库路径
+            report_interval (float): 输出统计的间隔（秒）
+        """
+        self.worker_target = worker_target
+        self.worker_args = tuple(worker_args)
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.queue_path = queue_path
+        self.queue = None
+        self.report_interval = report_interval
+        self.started_at = None
+        self._stop_event = multiprocessing.Event()
+        self._processes = {}
+        self._started = {}
+        self._failures = {}
+        self._restart_at = {}
+        self._server = None
+
+    def _start_worker(self, name):
+        """启动一个工作进程"""
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(self.worker_target, name, get_process_queue(), self._stop_event, self.worker_args),
+            name=name,
+        )
+        process.start()
+        self.queue.register_worker(name, process.pid)
+        self._processes[name] = process
+        self._started[name] = time.monotonic()
+        logger.info(f"工作进程{name}已启动（pid {process.pid}）")
+
+    def _start_server(self):
+        """在后台线程中启动HTTP接口"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _JobRequestHandler)
+        self._server.queue_path = self.queue_path
+        self._server.started_at = self.started_at
+        threading.Thread(target=self._server.serve_forever, name="daemon-http", daemon=True).start()
+        logger.info(f"任务接口: http://{self.host}:{self._server.server_address[1]}/jobs")
+
+    def _supervise(self):
+        """意外退出的工作进程正在处理的任务重新排队，按指数退避延迟后重启该进程"""
+        now = time.monotonic()
+        for name, process in list(self._processes.items()):
+            if process.is_alive() or self._stop_event.is_set():
+                continue
+            if name in self._restart_at:
+                if now >= self._restart_at[name]:
+                    del self._restart_at[name]
+                    self._start_worker(name)
+                continue
+            requeued = self.queue.requeue_running(name)
+            if now - self._started[name] >= WORKER_STABLE_SECONDS:
+                self._failures[name] = 0
+            failures = self._failures[name] = self._failures.get(name, 0) + 1
+            delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * 2 ** (failures - 1))
+            self._restart_at[name] = now + delay
+            logger.error(
+                f"工作进程{name}意外退出（退出码{process.exitcode}，连续第{failures}次），"
+                f"{requeued}个任务重新排队，{delay:.0f}秒后重新启动"
+            )
+
+    def report(self):
+        """在日志中输出队列和工作进程的统计"""
+        logger.info("服务统计:\n" + format_metrics(self.queue.metrics(self.started_at)))
+
+    def serve_forever(self):
+        """启动工作进程和HTTP接口，直到收到KeyboardInterrupt（Ctrl+C）"""
+        self.started_at = time.time()
+        self.queue = JobQueue(self.queue_path)
+        requeued = self.queue.requeue_running()
+        if requeued:
+            logger.info(f"{requeued}个上次未完成的任务重新排队")
+        logger.info(f"服务启动: {self.workers}个工作进程，等待中的任务{self.queue.depth()}个")
+        for number in range(1, self.workers + 1):
+            self._start_worker(f"worker-{number}")
+        if self.port is not None:
+            self._start_server()
+
+        next_report = time.monotonic() + self.report_interval
+        try:
+            while True:
+                time.sleep(SUPERVISE_INTERVAL)
+                self._supervise()
+                if time.monotonic() >= next_report:
+                    self.report()
+                    next_report = time.monotonic() + self.report_interval
+        except KeyboardInterrupt:
+            logger.info("收到停止信号，等待工作进程完成当前任务")
+        finally:
+            self.stop()
+
+    def stop(self):
+        """停止HTTP接口和工作进程，超时未结束的进程强制结束，其任务重新排队"""
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for name, process in self._processes.items():
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"工作进程{name}未在{STOP_TIMEOUT}秒内结束，强制结束")
+                process.terminate()
+                process.join()
+        self._processes.clear()
+        self.queue.requeue_running()
+        self.report()
+        self.queue.close()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务队列模块，在SQLite中保存等待创建的试卷，供常驻服务的工作进程领取
+
+提交任务只是写入一条记录，服务没有运行时任务也不会丢失，服务启动后按提交顺序处理。
+工作进程在事务中领取任务，多个进程不会领到同一个任务；服务重启或工作进程退出时，
+正在处理的任务重新排队，配合导入日志从中断处继续。
+"""
+
+import os
+import time
+import sqlite3
+from config.settings import JOB_QUEUE_FILE, DAEMON_MAX_ATTEMPTS
+from utils.logger import setup_logger
+from utils.tracing import percentile
+
+logger = setup_logger(__name__)
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    import_file TEXT NOT NULL,
+    library TEXT,
+    restart INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS workers (
+    name TEXT PRIMARY KEY,
+    pid INTEGER,
+    started_at REAL NOT NULL,
+    busy_seconds REAL NOT NULL DEFAULT 0,
+    jobs INTEGER NOT NULL DEFAULT 0,
+    current_job INTEGER
+);
+"""
+
+_JOB_FIELDS = ("id", "import_file", "library", "restart", "status", "worker", "attempts", "error",
+               "submitted_at", "started_at", "finished_at")
+
+def _latency_summary(values):
+    """耗时列表的平均值、中位数和95分位数，列表为空时均为None"""
+    values = sorted(values)
+    if not values:
+        return {"avg": None, "p50": None, "p95": None}
+    return {
+        "avg": round(sum(values) / len(values), 2),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+    }
+
+class JobQueue:
+    """试卷任务队列"""
+
+    def __init__(self, path=JOB_QUEUE_FILE):
+        """
+        Args:
+            path (str): SQLite数据库路径，提交任务的命令、HTTP接口和各工作进程共用
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def submit(self, import_file, library=None, restart=False):
+        """
+        提交一个创建试卷的任务
+
+        Args:
+            import_file (str): 题库文件路径，保存为绝对路径
+            library (str): 去重使用的题库名称
+            restart (bool): 是否放弃未完成的导入任务重新创建试卷
+
+        Returns:
+            int: 任务ID
+        """
+        cursor = self.conn.execute(
+            "INSERT INTO jobs (import_file, library, restart, status, submitted_at) VALUES (?, ?, ?, ?, ?)",
+            (os.path.abspath(import_file), library, int(bool(restart)), JOB_QUEUED, time.time()),
+        )
+        return cursor.lastrowid
+
+    def claim(self, worker):
+        """
+        领取最早提交的等待中任务
+
+        Args:
+            worker (str): 工作进程名称
+
+        Returns:
+            dict: 任务记录，没有等待中的任务时返回None
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (JOB_RUNNING, worker, time.time(), row[0]),
+            )
+            self.conn.execute("UPDATE workers SET current_job = ? WHERE name = ?", (row[0], worker))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0])
+
+    def finish(self, job_id, succeeded, error=None, retryable=True):
+        """
+        记录任务结束，可以重试的失败任务未达到DAEMON_MAX_ATTEMPTS次时重新排队
+
+        Args:
+            job_id (int): 任务ID
+            succeeded (bool): 试卷是否创建成功
+            error (str): 失败原因
+            retryable (bool): 失败是否可能通过重试解决，题库为空或格式错误等确定性的失败为False，直接标记为失败
+
+        Returns:
+            str: 任务的新状态
+        """
+        job = self.get(job_id)
+        now = time.time()
+        if succeeded:
+            status = JOB_DONE
+        elif retryable and job["attempts"] < DAEMON_MAX_ATTEMPTS:
+            status = JOB_QUEUED
+            logger.warning(f"任务{job_id}失败（第{job['attempts']}次），重新排队: {error}")
+        else:
+            status = JOB_FAILED
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, error, now, job_id),
+        )
+        if job["worker"]:
+            self.conn.execute(
+                "UPDATE workers SET busy_seconds = busy_seconds + ?, jobs = jobs + 1, current_job = NULL WHERE name = ?",
+                (now - job["started_at"], job["worker"]),
+            )
+        return status
+
+    def requeue_running(self, worker=None):
+        """
+        将正在处理的任务重新排队，用于服务重启或工作进程意外退出；
+        已经尝试DAEMON_MAX_ATTEMPTS次的任务标记为失败，避免每次都让工作进程崩溃的任务无限重试
+
+        Args:
+            worker (str): 只处理该工作进程的任务，None表示全部
+
+        Returns:
+            int: 重新排队的任务数量
+        """
+        condition, params = "status = ?", [JOB_RUNNING]
+        if worker is not None:
+            condition += " AND worker = ?"
+            params.append(worker)
+        error = "工作进程在处理任务时退出"
+        failed = self.conn.execute(
+            f"UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE {condition} AND attempts >= ?",
+            [JOB_FAILED, error, time.time()] + params + [DAEMON_MAX_ATTEMPTS],
+        ).rowcount
+        if failed:
+            logger.error(f"{failed}个任务已尝试{DAEMON_MAX_ATTEMPTS}次仍未完成，标记为失败: {error}")
+        cursor = self.conn.execute(f"UPDATE jobs SET status = ? WHERE {condition}", [JOB_QUEUED] + params)
+        return cursor.rowcount
+
+    def register_worker(self, name, pid=None):
+        """登记工作进程，重新启动的同名进程从零开始统计"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO workers (name, pid, started_at) VALUES (?, ?, ?)",
+            (name, pid if pid is not None else os.getpid(), time.time()),
+        )
+
+    def get(self, job_id):
+        """
+        读取任务记录
+
+        Returns:
+            dict: 任务记录，不存在时返回None
+        """
+        row = self.conn.execute(f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(_JOB_FIELDS, row)) if row else None
+
+    def depth(self):
+        """等待中的任务数量"""
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JOB_QUEUED,)).fetchone()[0]
+
+    def metrics(self, since=None):
+        """
+        统计队列深度、任务耗时和工作进程利用率
+
+        Args:
+            since (float): 只统计此时间（time.time()）之后结束的任务，None表示全部
+
+        Returns:
+            dict: queue（各状态的任务数）、latency（排队和执行耗时，秒）、workers（各工作进程的利用率）
+        """
+        now = time.time()
+        counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        rows = self.conn.execute(
+            "SELECT started_at - submitted_at, finished_at - started_at FROM jobs "
+            "WHERE status IN (?, ?) AND finished_at >= ?",
+            (JOB_DONE, JOB_FAILED, since or 0),
+        ).fetchall()
+        workers = []
+        for name, pid, started_at, busy_seconds, jobs, current_job in self.conn.execute(
+            "SELECT name, pid, started_at, busy_seconds, jobs, current_job FROM workers ORDER BY name"
+        ).fetchall():
+            busy = busy_seconds
+            if current_job is not None:
+                job = self.get(current_job)
+                if job and job["status"] == JOB_RUNNING:
+                    busy += now - job["started_at"]
+            uptime = max(now - started_at, 1e-6)
+            workers.append({
+                "name": name, "pid": pid, "jobs": jobs, "current_job": current_job,
+                "utilization": round(min(busy / uptime, 1.0), 3),
+            })
+        return {
+            "queue": {status: counts.get(status, 0) for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)},
+            "latency": {
+                "jobs": len(rows),
+                "wait": _latency_summary([row[0] for row in rows]),
+                "run": _latency_summary([row[1] for row in rows]),
+            },
+            "workers": workers,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def format_metrics(metrics):
+    """
+    将metrics()的结果格式化为日志文本
+
+    Args:
+        metrics (dict): JobQueue.metrics()的返回值
+
+    Returns:
+        str: 多行文本
+    """
+    def seconds(value):
+        return "-" if value is None else f"{value:.1f}秒"
+
+    queue, latency = metrics["queue"], metrics["latency"]
+    lines = [
+        f"队列: 等待{queue[JOB_QUEUED]}，处理中{queue[JOB_RUNNING]}，完成{queue[JOB_DONE]}，失败{queue[JOB_FAILED]}",
+        f"耗时（{latency['jobs']}个任务）: 排队 平均{seconds(latency['wait']['avg'])} p95 {seconds(latency['wait']['p95'])}，"
+        f"执行 平均{seconds(latency['run']['avg'])} p50 {seconds(latency['run']['p50'])} p95 {seconds(latency['run']['p95'])}",
+    ]
+    for worker in metrics["workers"]:
+        current = f"，正在处理任务{worker['current_job']}" if worker["current_job"] is not None else ""
+        lines.append(f"{worker['name']}: 利用率{worker['utilization']:.0%}，已完成{worker['jobs']}个任务{current}")
+    return "\n".join(lines)
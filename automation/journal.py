@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+导入日志模块，在SQLite中以预写日志的方式记录题库导入的每一步
+
+每一步（添加大题、批量添加题目）开始前写入待完成记录，完成后写入实际添加的数量。
+浏览器崩溃或定位超时后重新运行同一题库时，打开上次记录的试卷地址，
+读取页面中已有的大题和题目数量与日志核对，然后从第一个未完成的步骤继续。
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+from config.settings import JOURNAL_FILE
+from utils.exceptions import BrowserError
+from utils.logger import setup_logger
+from automation.locators import LOCATORS
+
+logger = setup_logger(__name__)
+
+# 步骤类型
+STEP_SECTION = "section"
+STEP_QUESTIONS = "questions"
+
+# 步骤状态
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+
+# 任务状态
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_ABANDONED = "abandoned"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    paper_url TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs (fingerprint, status);
+CREATE TABLE IF NOT EXISTS steps (
+    job_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    detail TEXT,
+    size INTEGER NOT NULL,
+    applied INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+# 统计页面中的大题和题目数量，每个元素使用定位器中第一个有结果的选择器
+_COUNT_SCRIPT = """
+function count(chain) {
+    for (var i = 0; i < chain.length; i++) {
+        var n;
+        if (chain[i][0] === 'xpath') {
+            n = document.evaluate(chain[i][1], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+        } else {
+            n = document.querySelectorAll(chain[i][1]).length;
+        }
+        if (n) { return n; }
+    }
+    return 0;
+}
+return [count(arguments[0]), count(arguments[1])];
+"""
+
+def file_fingerprint(path):
+    """
+    计算题库文件内容的SHA-256，用于识别同一份题库
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_paper_progress(driver):
+    """
+    一次脚本调用读取页面中已有的大题和题目数量
+
+    Args:
+        driver: ChromeDriver实例
+
+    Returns:
+        tuple: (大题数量, 题目数量)
+    """
+    def chain(name):
+        return [("xpath" if by == "xpath" else "css", value) for by, value in LOCATORS[name].selectors]
+
+    sections, questions = driver.driver.execute_script(
+        _COUNT_SCRIPT, chain("section_item"), chain("question_block")
+    )
+    return sections, questions
+
+class BuildJournal:
+    """题库导入日志"""
+
+    def __init__(self, path=JOURNAL_FILE):
+        """
+        Args:
+            path (str): SQLite数据库路径，多个进程可以共用
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 自动提交模式，每条记录写入后立即落盘
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(_SCHEMA)
+        self.job_id = None
+        self.paper_url = None
+        self.resumed = False
+        self._seq = 0
+
+    def start_job(self, source, restart=False):
+        """
+        开始或恢复题库的导入任务，同一题库有未完成的任务时恢复该任务
+
+        Args:
+            source (str): 题库文件路径
+            restart (bool): 是否放弃未完成的任务重新开始
+
+        Returns:
+            bool: 是否恢复了未完成的任务
+        """
+        fingerprint = file_fingerprint(source)
+        row = self.conn.execute(
+            "SELECT id, paper_url FROM jobs WHERE fingerprint = ? AND status = ? ORDER BY id DESC LIMIT 1",
+            (fingerprint, JOB_RUNNING),
+        ).fetchone()
+        now = time.time()
+        if row and restart:
+            self.conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (JOB_ABANDONED, now, row[0]))
+            row = None
+
+        if row:
+            self.job_id, self.paper_url = row
+            self.resumed = True
+            self._seq = self.conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM steps WHERE job_id = ?", (self.job_id,)
+            ).fetchone()[0]
+            sections, questions, _ = self.progress()
+            logger.info(f"发现未完成的导入任务 {source}: 已完成{sections}个大题，{questions}题")
+        else:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (source, fingerprint, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(source), fingerprint, JOB_RUNNING, now, now),
+            )
+            self.job_id = cursor.lastrowid
+            self.paper_url = None
+            self.resumed = False
+            self._seq = 0
+        return self.resumed
+
+    def begin_step(self, kind, detail, size):
+        """
+        在执行一步之前写入待完成记录
+
+        Args:
+            kind (str): STEP_SECTION或STEP_QUESTIONS
+            detail (str): 步骤说明，大题名称或起始行号
+            size (int): 本步要添加的数量
+
+        Returns:
+            int: 步骤序号
+        """
+        self._seq += 1
+        self.conn.execute(
+            "INSERT INTO steps (job_id, seq, kind, detail, size, status, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.job_id, self._seq, kind, detail, size, STATUS_PENDING, time.time()),
+        )
+        return self._seq
+
+    def complete_step(self, seq, applied):
+        """
+        记录一步的结果，全部添加成功时标记为已完成
+
+        失败的步骤只记录确认添加的部分并保持待完成状态：失败的操作可能已经在页面中留下了内容
+        （例如题目已插入但题干填写失败），恢复时由页面中的实际数量决定跳过的位置。
+
+        Args:
+            seq (int): begin_step返回的步骤序号
+            applied (int): 确认添加的数量
+        """
+        self.conn.execute(
+            "UPDATE steps SET applied = ?, status = CASE WHEN ? >= size THEN ? ELSE ? END, updated_at = ? "
+            "WHERE job_id = ? AND seq = ?",
+            (applied, applied, STATUS_DONE, STATUS_PENDING, time.time(), self.job_id, seq),
+        )
+
+    def record_paper_url(self, url):
+        """记录试卷地址，恢复时从该地址打开试卷"""
+        if url and url != self.paper_url:
+            self.paper_url = url
+            self.conn.execute(
+                "UPDATE jobs SET paper_url = ?, updated_at = ? WHERE id = ?", (url, time.time(), self.job_id)
+            )
+
+    def progress(self):
+        """
+        汇总日志中的进度
+
+        Returns:
+            tuple: (确认添加的大题数, 确认添加的题目数, 未完成步骤中可能已生效的数量{类型: 数量})
+        """
+        confirmed = {STEP_SECTION: 0, STEP_QUESTIONS: 0}
+        pending = {STEP_SECTION: 0, STEP_QUESTIONS: 0}
+        for kind, size, applied, status in self.conn.execute(
+            "SELECT kind, size, applied, status FROM steps WHERE job_id = ? ORDER BY seq", (self.job_id,)
+        ):
+            confirmed[kind] += applied
+            if status == STATUS_PENDING:
+                pending[kind] += max(0, size - applied)
+        return confirmed[STEP_SECTION], confirmed[STEP_QUESTIONS], pending
+
+    def reconcile(self, page_sections, page_questions):
+        """
+        将页面中已有的大题和题目数量与日志核对，以页面为准确定继续的位置
+
+        崩溃或失败时正在执行的步骤可能部分生效，页面数量在日志确认的数量和
+        加上未完成步骤的全部数量之间都是正常的；页面数量更少说明试卷未保存上次的部分操作。
+
+        Args:
+            page_sections (int): 页面中的大题数量
+            page_questions (int): 页面中的题目数量
+
+        Returns:
+            tuple: (可以跳过的大题数, 可以跳过的题目数)
+
+        Raises:
+            BrowserError: 页面中的内容比日志记录的多，可能不是同一份试卷；或者日志已确认添加了内容，
+                页面中却一个都没有读取到（多半是定位器与页面不匹配），继续会重复添加全部题目
+        """
+        sections, questions, pending = self.progress()
+        for name, page_count, confirmed in (("大题", page_sections, sections), ("题目", page_questions, questions)):
+            if page_count == 0 and confirmed:
+                raise BrowserError(
+                    f"页面中没有读取到任何{name}，导入日志已确认添加了{confirmed}个，"
+                    f"可能是定位器与页面不匹配；请检查试卷后使用--restart重新创建试卷"
+                )
+        max_sections = sections + pending[STEP_SECTION]
+        max_questions = questions + pending[STEP_QUESTIONS]
+        if page_sections > max_sections or page_questions > max_questions:
+            raise BrowserError(
+                f"页面中有{page_sections}个大题、{page_questions}题，多于导入日志记录的"
+                f"{max_sections}个大题、{max_questions}题，可能不是同一份试卷"
+            )
+        if page_sections < sections or page_questions < questions:
+            logger.warning(
+                f"页面中只有{page_sections}个大题、{page_questions}题，少于导入日志记录的"
+                f"{sections}个大题、{questions}题，以页面为准继续"
+            )
+
+        # 结束未完成的步骤，再写入与页面数量的差值，使日志的合计与页面一致
+        self.conn.execute(
+            "UPDATE steps SET status = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+            (STATUS_DONE, time.time(), self.job_id, STATUS_PENDING),
+        )
+        for kind, delta in ((STEP_SECTION, page_sections - sections), (STEP_QUESTIONS, page_questions - questions)):
+            if delta:
+                self.complete_step(self.begin_step(kind, "核对页面", 0), delta)
+        logger.info(f"页面中已有{page_sections}个大题、{page_questions}题，从第{page_questions + 1}题继续导入")
+        return page_sections, page_questions
+
+    def finish(self):
+        """标记任务已完成，之后再次导入同一题库会创建新的试卷"""
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (JOB_FINISHED, time.time(), self.job_id)
+        )
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
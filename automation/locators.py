@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+页面元素定位模块，集中管理考试星页面元素的定位方式
+
+每个元素对应一条按顺序尝试的备选选择器链，可以再按文本或role过滤。
+整条选择器链在一次脚本调用中完成解析；解析结果按页面缓存，
+再次使用时只需一次调用确认元素仍然有效，失效后优先使用上次命中的选择器重新解析。
+元素尚未出现时在页面中监听DOM变化等待（见core.waits），不轮询chromedriver。
+"""
+
+import time
+import weakref
+from core.waits import PageCondition, WAIT_PRESENT, WAIT_CLICKABLE
+from utils.exceptions import ElementNotFoundError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 定位元素的默认超时时间（秒）
+DEFAULT_TIMEOUT = 10
+
+# 选择器类型，取值与selenium的By.CSS_SELECTOR、By.XPATH相同，注册表不必为此导入selenium
+CSS = "css selector"
+XPATH = "xpath"
+
+class Locator:
+    """页面元素定位方式"""
+
+    def __init__(self, name, selectors, text=None, role=None, description=""):
+        """
+        Args:
+            name (str): 元素名称，作为注册表的键
+            selectors (list): 按顺序尝试的选择器，元素为(CSS或XPATH, 选择器)
+            text (str): 元素文本需要包含的内容（可选）
+            role (str): 元素的role属性或标签名（可选），例如"button"
+            description (str): 元素说明，用于日志
+        """
+        self.name = name
+        self.selectors = list(selectors)
+        self.text = text
+        self.role = role
+        self.description = description or name
+
+# 考试星页面元素注册表
+LOCATORS = {}
+
+def register(locator):
+    """
+    注册元素定位方式
+
+    Args:
+        locator (Locator): 元素定位方式
+
+    Returns:
+        Locator: 注册的定位方式
+    """
+    LOCATORS[locator.name] = locator
+    return locator
+
+def css_selectors(name):
+    """
+    获取元素的CSS选择器，用于在页面脚本中从指定元素开始查找
+
+    Args:
+        name (str): 元素名称
+
+    Returns:
+        list: 按顺序尝试的CSS选择器，不包含XPath
+    """
+    return [value for by, value in LOCATORS[name].selectors if by == CSS]
+
+# 试卷设置
+register(Locator("settings_button", [
+    (CSS, "#paper-id > form > section > div > header > div.right.bottom > div.right-setting > span:nth-child(2)"),
+    (CSS, "#paper-id header .right-setting > span:nth-child(2)"),
+], description="设置按钮"))
+register(Locator("settings_feature_checkbox", [
+    (CSS, "#paper-id > div:nth-child(11) > div > div > div.el-dialog__body > div.setting-item.paper-feature > div.setting-content > div:nth-child(3) > label > span.el-checkbox__input > span"),
+    (CSS, ".el-dialog__body .paper-feature .setting-content > div:nth-child(3) .el-checkbox__inner"),
+], description="试卷功能复选框"))
+register(Locator("settings_feature_options", [
+    (CSS, "#paper-id > div:nth-child(11) > div > div > div.el-dialog__body > div.setting-item.paper-feature > div.setting-content > div > label"),
+    (CSS, ".el-dialog__body .paper-feature .setting-content label.el-checkbox"),
+], description="试卷功能选项"))
+register(Locator("settings_confirm_button", [
+    (CSS, "#paper-id > div:nth-child(11) > div > div > div.el-dialog__footer > div > button.el-button.el-button--primary.el-button--default.confirm-button"),
+    (CSS, ".el-dialog__footer button.confirm-button"),
+    (CSS, ".el-dialog__footer button.el-button--primary"),
+], description="设置确认按钮"))
+
+# 题目管理
+register(Locator("question_type_trigger", [
+    (CSS, ".suject-opreate .el-dropdown-link"),
+    (CSS, ".suject-opreate .el-dropdown"),
+], description="添加题目下拉按钮"))
+register(Locator("question_type_item", [
+    (CSS, ".el-dropdown-menu__item"),
+    (XPATH, "//li[@role='menuitem']"),
+], description="题型菜单项"))
+# 新添加题目的题干编辑器，这里需要根据实际类名调整
+register(Locator("question_stem_editor", [
+    (CSS, ".question-stem [contenteditable='true']"),
+    (CSS, ".question-stem textarea"),
+    (CSS, ".question-stem iframe"),
+], description="题干编辑器"))
+register(Locator("add_section_button", [
+    (CSS, "#wrap-affix-container > div > div > div.big-questions-aside > div.big-questions-footer > button > span"),
+    (CSS, ".big-questions-aside .big-questions-footer button"),
+], description="添加大题按钮"))
+register(Locator("section_name_input", [
+    (CSS, ".section-name-input"),
+    (CSS, ".big-questions-aside input"),
+], description="大题名称输入框"))
+# 大题栏和编辑器的容器，用于判断页面中读取不到大题或题目时是页面结构不同还是内容确实不存在
+register(Locator("section_sidebar", [
+    (CSS, "#wrap-affix-container .big-questions-aside"),
+    (CSS, ".big-questions-aside"),
+], description="大题栏"))
+register(Locator("editor_root", [
+    (CSS, "#paper-id"),
+], description="试卷编辑器"))
+register(Locator("section_item", [
+    (CSS, ".big-questions-aside .big-questions-list > div"),
+    (CSS, ".big-questions-aside .big-question"),
+], description="大题栏中的大题"))
+register(Locator("question_block", [
+    (CSS, ".question-list .question-block"),
+    (CSS, ".paper-body .question-block"),
+], description="试卷中的题目"))
+# 以下两项在题目内查找
+register(Locator("question_block_type", [
+    (CSS, ".question-type"),
+    (CSS, ".question-title .type"),
+], description="题目的题型标签"))
+register(Locator("question_block_stem", [
+    (CSS, ".question-stem"),
+    (CSS, ".question-content"),
+], description="题目的题干"))
+
+# 在页面中按顺序尝试选择器链，返回[命中的选择器序号, 元素或元素列表]
+_RESOLVE_SCRIPT = """
+var chain = arguments[0], text = arguments[1], role = arguments[2];
+var requireVisible = arguments[3], all = arguments[4];
+function query(kind, value) {
+    if (kind === 'xpath') {
+        var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var j = 0; j < result.snapshotLength; j++) { nodes.push(result.snapshotItem(j)); }
+        return nodes;
+    }
+    return Array.from(document.querySelectorAll(value));
+}
+function matches(el) {
+    if (requireVisible && (el.offsetParent === null || el.disabled)) { return false; }
+    if (text && (el.textContent || '').trim().indexOf(text) === -1) { return false; }
+    if (role && el.getAttribute('role') !== role && el.tagName.toLowerCase() !== role) { return false; }
+    return true;
+}
+for (var i = 0; i < chain.length; i++) {
+    var found = query(chain[i][0], chain[i][1]).filter(matches);
+    if (found.length) { return [i, all ? found : found[0]]; }
+}
+return null;
+"""
+
+# 确认缓存的元素仍在页面中（且可见）
+_REVALIDATE_SCRIPT = """
+var el = arguments[0];
+if (!el.isConnected) { return false; }
+return !arguments[1] || (el.offsetParent !== null && !el.disabled);
+"""
+
+class LocatorResolver:
+    """按页面缓存元素定位结果的解析器，每个ChromeDriver实例对应一个"""
+
+    def __init__(self, driver, registry=None):
+        """
+        Args:
+            driver: ChromeDriver实例
+            registry (dict): 元素注册表，默认使用LOCATORS
+        """
+        # 只持有弱引用：解析器是_resolvers中以driver为键的值，强引用会使键和缓存的元素永远不被回收
+        self._driver = weakref.ref(driver)
+        self.registry = LOCATORS if registry is None else registry
+        self._cache = {}
+        self._hits = {}
+        self._page_generation = None
+
+    @property
+    def driver(self):
+        """对应的ChromeDriver实例"""
+        return self._driver()
+
+    def _get_locator(self, name):
+        """获取注册的定位方式"""
+        locator = self.registry.get(name)
+        if locator is None:
+            raise KeyError(f"未注册的页面元素: {name}")
+        return locator
+
+    def _check_page(self):
+        """页面重新加载后清空缓存"""
+        if self._page_generation != self.driver.page_generation:
+            self._cache.clear()
+            self._page_generation = self.driver.page_generation
+
+    def invalidate(self, name=None):
+        """
+        清除缓存
+
+        Args:
+            name (str): 元素名称，None表示清除全部
+        """
+        if name is None:
+            self._cache.clear()
+        else:
+            for key in [key for key in self._cache if key[0] == name]:
+                del self._cache[key]
+
+    def _ordered_selectors(self, locator):
+        """将上次命中的选择器排到最前面"""
+        selectors = locator.selectors
+        hit = self._hits.get(locator.name)
+        if hit:
+            selectors = [selectors[hit]] + selectors[:hit] + selectors[hit + 1:]
+        return selectors, hit
+
+    def _ordered_chain(self, locator):
+        """转换为脚本使用的选择器链，上次命中的选择器排在最前面"""
+        selectors, hit = self._ordered_selectors(locator)
+        return [(self._selector_kind(by), value) for by, value in selectors], hit
+
+    def _selector_kind(self, by):
+        """将选择器类型转换为脚本中使用的类型"""
+        return "xpath" if by == XPATH else "css"
+
+    def _resolve_once(self, locator, text, visible, all_matches):
+        """
+        执行一次选择器链解析
+
+        Returns:
+            元素、元素列表或None
+        """
+        chain, hit = self._ordered_chain(locator)
+        result = self.driver.driver.execute_script(
+            _RESOLVE_SCRIPT, chain, text or locator.text, locator.role, visible, all_matches
+        )
+        if not result:
+            return None
+
+        index, found = result
+        self._record_hit(locator, index, hit)
+        return found
+
+    def _record_hit(self, locator, index, hit):
+        """记录命中的选择器，index为调整顺序后的选择器链中的序号"""
+        # 还原为注册表中的选择器序号
+        if hit:
+            index = hit if index == 0 else (index - 1 if index <= hit else index)
+        if index != self._hits.get(locator.name, 0):
+            logger.warning(f"{locator.description}使用备选选择器定位: {locator.selectors[index][1]}")
+        self._hits[locator.name] = index
+
+    def _revalidate(self, cached, visible):
+        """确认缓存的元素仍然有效，只需一次调用"""
+        # 已经持有元素时selenium必然已经加载，在这里导入使本模块不依赖selenium
+        from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+        element = cached[0] if isinstance(cached, list) else cached
+        try:
+            return bool(self.driver.driver.execute_script(_REVALIDATE_SCRIPT, element, visible))
+        except StaleElementReferenceException:
+            return False
+        except WebDriverException as e:
+            logger.debug(f"缓存元素校验失败: {str(e)}")
+            return False
+
+    def lookup(self, name, text=None, visible=False, all_matches=False):
+        """
+        立即定位元素，不等待
+
+        Args:
+            name (str): 元素名称
+            text (str): 覆盖注册表中的文本过滤条件
+            visible (bool): 是否要求元素可见且可用
+            all_matches (bool): 是否返回命中选择器的全部元素
+
+        Returns:
+            WebElement、WebElement列表，未找到时返回None
+        """
+        locator = self._get_locator(name)
+        self._check_page()
+        key = (name, text, visible, all_matches)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            if self._revalidate(cached, visible):
+                return cached
+            del self._cache[key]
+
+        found = self._resolve_once(locator, text, visible, all_matches)
+        if found:
+            self._cache[key] = found
+        return found
+
+    def _page_condition(self, locator, text, visible, all_matches):
+        """
+        生成页面内等待条件，选择器按上次命中的顺序排列
+
+        Returns:
+            tuple: (PageCondition, 上次命中的选择器序号)
+        """
+        selectors, hit = self._ordered_selectors(locator)
+        condition = PageCondition(
+            WAIT_CLICKABLE if visible else WAIT_PRESENT, selectors, text=text or locator.text,
+            role=locator.role, all_matches=all_matches, description=locator.name,
+        )
+        return condition, hit
+
+    def condition(self, name, text=None, visible=False, all_matches=False):
+        """
+        生成可用于ChromeDriver.pause、ChromeDriver.wait_for或WebDriverWait的等待条件
+
+        Returns:
+            PageCondition: 满足时返回元素或元素列表
+        """
+        return self._page_condition(self._get_locator(name), text, visible, all_matches)[0]
+
+    def find(self, name, text=None, visible=False, all_matches=False, timeout=DEFAULT_TIMEOUT):
+        """
+        定位元素，未找到时在页面中等待元素出现，直到超时
+
+        Args:
+            name (str): 元素名称
+            text (str): 覆盖注册表中的文本过滤条件
+            visible (bool): 是否要求元素可见且可用
+            all_matches (bool): 是否返回命中选择器的全部元素
+            timeout (float): 超时时间（秒）
+
+        Returns:
+            WebElement或WebElement列表
+
+        Raises:
+            ElementNotFoundError: 超时仍未找到元素
+        """
+        locator = self._get_locator(name)
+        self._check_page()
+        key = (name, text, visible, all_matches)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            if self._revalidate(cached, visible):
+                return cached
+            del self._cache[key]
+
+        # 立即检查一次，未找到时在页面中等待元素出现，只需一次调用
+        condition, hit = self._page_condition(locator, text, visible, all_matches)
+        started = time.monotonic()
+        try:
+            found = self.driver.wait_for(condition, timeout)
+        except Exception as e:
+            selectors = "; ".join(value for _, value in locator.selectors)
+            raise ElementNotFoundError(
+                f"{time.monotonic() - started:.1f}秒内未找到{locator.description}"
+                f"{'（' + (text or locator.text) + '）' if (text or locator.text) else ''}: {selectors}"
+            ) from e
+        self._record_hit(locator, condition.matched_index, hit)
+        self._cache[key] = found
+        return found
+
+# 每个ChromeDriver实例对应的解析器
+_resolvers = weakref.WeakKeyDictionary()
+
+def get_resolver(driver):
+    """
+    获取ChromeDriver实例对应的元素解析器
+
+    Args:
+        driver: ChromeDriver实例
+
+    Returns:
+        LocatorResolver: 元素解析器
+    """
+    resolver = _resolvers.get(driver)
+    if resolver is None:
+        resolver = LocatorResolver(driver)
+        _resolvers[driver] = resolver
+    return resolver
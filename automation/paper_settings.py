@@ -5,47 +5,106 @@
 试卷设置自动化模块
 """
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from automation.locators import get_resolver, css_selectors
+from utils.exceptions import ConfigError
 from utils.logger import setup_logger
+from utils.tracing import traced
 
 logger = setup_logger(__name__)
 
-def configure_paper_settings(driver):
+# 一次读取设置对话框中可见的试卷功能选项的文字和勾选状态，使用第一个有可见结果的选择器
+FEATURE_OPTIONS_SCRIPT = """
+var chain = arguments[0];
+for (var i = 0; i < chain.length; i++) {
+    var found = Array.from(document.querySelectorAll(chain[i])).filter(function (el) {
+        return el.offsetParent !== null && !el.disabled;
+    });
+    if (found.length) {
+        return found.map(function (label) { return [label.textContent.trim(), label.classList.contains('is-checked')]; });
+    }
+}
+return [];
+"""
+
+def select_feature_options(options, features):
     """
-    配置试卷设置
+    确定需要点击的试卷功能选项，已经是目标状态的选项不点击，同步和异步版本共用
+    
+    Args:
+        options (list): FEATURE_OPTIONS_SCRIPT读取的选项[(选项文字, 是否勾选), ...]
+        features (dict): {选项序号（从1开始）或选项文字: 是否勾选}
+        
+    Returns:
+        list: 需要点击的选项[(选项下标（从0开始）, 选项序号或文字, 是否勾选), ...]
+        
+    Raises:
+        ConfigError: 选项序号超出范围或找不到选项
+    """
+    clicks = []
+    for key, wanted in features.items():
+        if isinstance(key, int):
+            if not 1 <= key <= len(options):
+                raise ConfigError(f"试卷功能选项序号超出范围: {key}（共{len(options)}项）")
+            index = key - 1
+        else:
+            index = next((index for index, (text, _) in enumerate(options) if key in text), None)
+            if index is None:
+                raise ConfigError(f"未找到试卷功能选项: {key}")
+        if options[index][1] != bool(wanted):
+            clicks.append((index, key, bool(wanted)))
+    return clicks
+
+def _set_feature_options(driver, locators, features):
+    """
+    将试卷功能选项设置为目标状态，已经是目标状态的选项不点击
+    
+    Args:
+        driver: ChromeDriver实例
+        locators: 元素解析器
+        features (dict): {选项序号（从1开始）或选项文字: 是否勾选}
+    """
+    elements = locators.find("settings_feature_options", visible=True, all_matches=True)
+    options = driver.driver.execute_script(FEATURE_OPTIONS_SCRIPT, css_selectors("settings_feature_options"))
+    for index, key, wanted in select_feature_options(options, features):
+        logger.info(f"{'勾选' if wanted else '取消勾选'}试卷功能选项: {key}")
+        driver.click_element(elements[index])
+
+@traced()
+def configure_paper_settings(driver, features=None):
+    """
+    配置试卷设置，所有选项在一次打开的设置对话框中完成
     
     Args:
         driver: ChromeDriver实例
+        features (dict): 试卷功能选项的目标状态，{选项序号（从1开始）或选项文字: 是否勾选}；
+            None表示点击第三个选项
         
     Returns:
         bool: 操作是否成功
     """
     try:
+        locators = get_resolver(driver)
+        
         # 等待页面加载完成
         logger.info("等待页面加载...")
-        driver._random_sleep(2, 3)
+        driver.pause(2, 3)
 
         # 1. 点击设置按钮
         logger.info("点击设置按钮...")
-        settings_btn = WebDriverWait(driver.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#paper-id > form > section > div > header > div.right.bottom > div.right-setting > span:nth-child(2)"))
-        )
+        settings_btn = locators.find("settings_button", visible=True)
         driver.click_element(settings_btn)
 
         # 2. 点击第五个复选框
-        logger.info("点击复选框...")
-        checkbox = WebDriverWait(driver.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#paper-id > div:nth-child(11) > div > div > div.el-dialog__body > div.setting-item.paper-feature > div.setting-content > div:nth-child(3) > label > span.el-checkbox__input > span"))
-        )
-        driver.click_element(checkbox)
+        if features is None:
+            logger.info("点击复选框...")
+            checkbox = locators.find("settings_feature_checkbox", visible=True)
+            driver.click_element(checkbox)
+        else:
+            _set_feature_options(driver, locators, features)
 
         # 3. 点击确认按钮
         logger.info("点击确认按钮...")
-        confirm_btn = WebDriverWait(driver.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#paper-id > div:nth-child(11) > div > div > div.el-dialog__footer > div > button.el-button.el-button--primary.el-button--default.confirm-button"))
-        )
+        confirm_btn = locators.find("settings_confirm_button", visible=True)
         driver.click_element(confirm_btn)
 
         logger.info("试卷设置配置完成")
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+声明式试卷描述模块，将JSON或YAML格式的试卷描述编译为执行计划并执行
+
+试卷描述示例（YAML）：
+
+    name: 期中考试
+    settings:
+      features: {3: true, 显示答案: false}   # 试卷功能选项，键为序号（从1开始）或选项文字
+    sections:
+      - name: 第一部分 单选题
+        questions:
+          - {type: 单选题, count: 5}
+          - {type: 单选题, content: 以下哪一项正确？}
+      - name: 第二部分 问答题
+        settings:
+          features: {4: true}                # 大题中的设置会合并到试卷设置中
+        questions:
+          - {type: 问答题, content: 简述……}
+
+编译时所有设置合并为一次打开设置对话框并排在最前面，连续的同名大题合并，
+同一大题内连续的题目合并为一次批量添加；执行前输出计划和预计耗时。
+"""
+
+import os
+import json
+from config.settings import VERIFY_BATCHES, BULK_INPUT_MIN_LENGTH
+from utils.exceptions import ConfigError
+from utils.logger import setup_logger, log_context
+from automation.question_import import ImportStats, normalize_question_type
+from automation.paper_state import PaperVerifier, take_snapshot
+
+logger = setup_logger(__name__)
+
+# 支持的描述文件格式
+SPEC_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# 各节奏策略下每种操作的预计耗时（秒）和WebDriver命令数，取自各操作中的固定等待
+# 和命令数，可以用bench.run_bench在模拟页面上测得的结果校准
+COST_MODEL = {
+    "human": {
+        "settings_dialog": (6.7, 10),  # 等待页面、打开并确认设置对话框
+        "feature": (2.1, 5),  # 点击一个功能选项
+        "section": (3.6, 6),  # 点击添加大题
+        "section_name": (1.6, 5),  # 输入大题名称，另加每个字符的耗时
+        "section_name_char": (0.13, 1),
+        "question": (5.5, 5),  # 通过下拉菜单添加一道题目
+        "question_batch": (0.0, 0),
+        # 逐题添加后等待新题目的题干编辑区出现，点击、清空后逐字输入；题干较长时一次性写入，不计字符
+        "question_content": (1.6, 7),
+        "question_content_char": (0.13, 1),
+    },
+    "throughput": {
+        "settings_dialog": (0.6, 10),
+        "feature": (0.1, 5),
+        "section": (0.3, 6),
+        "section_name": (0.05, 2),
+        "section_name_char": (0.0, 0),
+        "question": (0.15, 0),  # 批量添加时在页面中执行，不产生额外命令
+        "question_batch": (0.02, 2),  # 每次批量添加的一次往返
+        "question_content": (0.05, 0),  # 在批量操作中一次性写入
+        "question_content_char": (0.0, 0),
+    },
+}
+
+class PlanStep:
+    """执行计划中的一步"""
+
+    def __init__(self, kind, description, seconds, commands, **args):
+        """
+        Args:
+            kind (str): 操作类型，settings、section或questions
+            description (str): 操作说明
+            seconds (float): 预计耗时（秒）
+            commands (int): 预计WebDriver命令数
+            **args: 执行操作需要的参数
+        """
+        self.kind = kind
+        self.description = description
+        self.seconds = seconds
+        self.commands = commands
+        self.args = args
+
+class ExecutionPlan:
+    """试卷的执行计划"""
+
+    def __init__(self, name, pacing, steps, naive_cost):
+        """
+        Args:
+            name (str): 试卷名称
+            pacing (str): 估算耗时使用的节奏策略名称
+            steps (list): PlanStep列表
+            naive_cost (tuple): 不合并操作、逐项执行时的(预计耗时, 预计命令数)
+        """
+        self.name = name
+        self.pacing = pacing
+        self.steps = steps
+        self.naive_cost = naive_cost
+
+    @property
+    def seconds(self):
+        """预计总耗时（秒）"""
+        return sum(step.seconds for step in self.steps)
+
+    @property
+    def commands(self):
+        """预计WebDriver命令总数"""
+        return sum(step.commands for step in self.steps)
+
+    @property
+    def question_count(self):
+        """题目总数"""
+        return sum(len(step.args["question_types"]) for step in self.steps if step.kind == "questions")
+
+    def format(self):
+        """
+        生成可读的执行计划
+
+        Returns:
+            str: 执行计划文本
+        """
+        lines = [f"执行计划: {self.name or '未命名试卷'}（{self.pacing}节奏，{self.question_count}题）"]
+        for number, step in enumerate(self.steps, 1):
+            lines.append(f"  {number:>3}. {step.description:<40} 约{step.seconds:>6.1f}秒 {step.commands:>5}个命令")
+        naive_seconds, naive_commands = self.naive_cost
+        lines.append(
+            f"  预计耗时{self.seconds:.1f}秒，{self.commands}个WebDriver命令"
+            f"（逐项执行约{naive_seconds:.1f}秒，{naive_commands}个命令）"
+        )
+        return "\n".join(lines)
+
+def load_spec(path):
+    """
+    读取试卷描述文件
+
+    Args:
+        path (str): JSON或YAML文件路径
+
+    Returns:
+        dict: 试卷描述
+
+    Raises:
+        ConfigError: 格式不支持或内容有误
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if ext == ".json":
+            try:
+                spec = json.load(f)
+            except ValueError as e:
+                raise ConfigError(f"试卷描述JSON格式有误: {str(e)}")
+        elif ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ConfigError("读取YAML试卷描述需要安装PyYAML: pip install pyyaml")
+            try:
+                spec = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ConfigError(f"试卷描述YAML格式有误: {str(e)}")
+        else:
+            raise ConfigError(f"不支持的试卷描述格式: {ext}，支持: {', '.join(SPEC_EXTENSIONS)}")
+    if not isinstance(spec, dict):
+        raise ConfigError("试卷描述的顶层必须是对象")
+    return spec
+
+def _merge_features(target, settings, where):
+    """将一处设置中的功能选项合并到target，后出现的设置覆盖先出现的"""
+    if not settings:
+        return
+    if not isinstance(settings, dict) or not isinstance(settings.get("features", {}), dict):
+        raise ConfigError(f"{where}的settings格式有误，应为 {{features: {{选项: 是否勾选}}}}")
+    for key, wanted in settings.get("features", {}).items():
+        key = int(key) if isinstance(key, int) or str(key).isdigit() else str(key)
+        target[key] = bool(wanted)
+
+def _expand_questions(questions, where):
+    """
+    展开题目列表中的count字段
+
+    Returns:
+        list: [(题型, 题干), ...]
+    """
+    expanded = []
+    for index, question in enumerate(questions or [], 1):
+        if not isinstance(question, dict) or "type" not in question:
+            raise ConfigError(f"{where}第{index}题缺少type字段")
+        try:
+            question_type = normalize_question_type(question["type"])
+        except ConfigError as e:
+            raise ConfigError(f"{where}第{index}题: {str(e)}")
+        count = question.get("count", 1)
+        if not isinstance(count, int) or count < 1:
+            raise ConfigError(f"{where}第{index}题的count必须是正整数")
+        expanded.extend([(question_type, str(question.get("content") or ""))] * count)
+    return expanded
+
+def _content_cost(cost, contents):
+    """
+    填写题干的预计耗时和命令数，逐字输入的题干另加每个字符的耗时
+
+    Args:
+        cost (dict): 节奏策略对应的COST_MODEL
+        contents (list): 题干内容，为空的题目不填写
+
+    Returns:
+        tuple: (耗时（秒）, 命令数)
+    """
+    seconds = commands = 0
+    for content in contents:
+        if not content:
+            continue
+        seconds += cost["question_content"][0]
+        commands += cost["question_content"][1]
+        if BULK_INPUT_MIN_LENGTH is None or len(content) < BULK_INPUT_MIN_LENGTH:
+            seconds += cost["question_content_char"][0] * len(content)
+            commands += cost["question_content_char"][1] * len(content)
+    return seconds, commands
+
+def _describe_questions(question_types):
+    """将题型列表概括为"单选题×5, 问答题×2"的形式"""
+    runs = []
+    for question_type in question_types:
+        if runs and runs[-1][0] == question_type:
+            runs[-1][1] += 1
+        else:
+            runs.append([question_type, 1])
+    return ", ".join(f"{question_type}×{count}" for question_type, count in runs)
+
+def compile_plan(spec, pacing="human"):
+    """
+    将试卷描述编译为执行计划
+
+    - 试卷和各大题中的设置合并为一次设置对话框操作，排在添加题目之前
+    - 连续的同名大题合并为一个大题
+    - 同一大题内的全部题目合并为一次批量添加
+
+    Args:
+        spec (dict): 试卷描述
+        pacing (str): 估算耗时使用的节奏策略名称
+
+    Returns:
+        ExecutionPlan: 执行计划
+    """
+    if pacing not in COST_MODEL:
+        raise ConfigError(f"没有节奏策略 {pacing} 的耗时估算，可选: {', '.join(COST_MODEL)}")
+    cost = COST_MODEL[pacing]
+
+    features = {}
+    settings_sources = 0
+    if spec.get("settings"):
+        _merge_features(features, spec["settings"], "试卷")
+        settings_sources += 1
+
+    # 未归入大题的题目排在最前面，然后依次是各个大题
+    groups = []
+    if spec.get("questions"):
+        groups.append(("", _expand_questions(spec["questions"], "试卷")))
+    for index, section in enumerate(spec.get("sections") or [], 1):
+        if not isinstance(section, dict):
+            raise ConfigError(f"第{index}个大题格式有误")
+        name = str(section.get("name") or "")
+        where = f"大题“{name or index}”"
+        if section.get("settings"):
+            _merge_features(features, section["settings"], where)
+            settings_sources += 1
+        questions = _expand_questions(section.get("questions"), where)
+        if groups and name and groups[-1][0] == name:
+            groups[-1][1].extend(questions)
+        else:
+            groups.append((name, questions))
+
+    steps = []
+    naive_seconds, naive_commands = 0.0, 0
+    if settings_sources:
+        seconds = cost["settings_dialog"][0] + cost["feature"][0] * len(features)
+        commands = cost["settings_dialog"][1] + cost["feature"][1] * len(features)
+        options = ", ".join(f"{key}={'开' if wanted else '关'}" for key, wanted in features.items())
+        steps.append(PlanStep("settings", f"试卷设置: {options or '无'}", seconds, commands, features=features))
+        # 逐项执行时每处设置各打开一次对话框
+        naive_seconds += cost["settings_dialog"][0] * settings_sources + cost["feature"][0] * len(features)
+        naive_commands += cost["settings_dialog"][1] * settings_sources + cost["feature"][1] * len(features)
+
+    for index, (name, questions) in enumerate(groups):
+        if name or index > 0:
+            seconds = cost["section"][0]
+            commands = cost["section"][1]
+            if name:
+                seconds += cost["section_name"][0] + cost["section_name_char"][0] * len(name)
+                commands += cost["section_name"][1] + cost["section_name_char"][1] * len(name)
+            steps.append(PlanStep("section", f"添加大题: {name or '未命名'}", seconds, commands, name=name))
+            naive_seconds += seconds
+            naive_commands += commands
+        if not questions:
+            continue
+
+        question_types = [question_type for question_type, _ in questions]
+        contents = [content for _, content in questions]
+        content_seconds, content_commands = _content_cost(cost, contents)
+        seconds = cost["question_batch"][0] + cost["question"][0] * len(questions) + content_seconds
+        commands = cost["question_batch"][1] + cost["question"][1] * len(questions) + content_commands
+        steps.append(PlanStep(
+            "questions", f"添加题目: {_describe_questions(question_types)}", seconds, commands,
+            question_types=question_types, contents=contents,
+        ))
+        # 逐项执行时每道题目单独调用一次
+        naive_seconds += (cost["question_batch"][0] + cost["question"][0]) * len(questions)
+        naive_seconds += content_seconds
+        naive_commands += (cost["question_batch"][1] + cost["question"][1]) * len(questions) + content_commands
+
+    return ExecutionPlan(spec.get("name", ""), pacing, steps, (naive_seconds, naive_commands))
+
+def execute_plan(driver, plan, verify=VERIFY_BATCHES):
+    """
+    在已打开的创建试卷页面中按顺序执行计划，遇到第一个失败的步骤即停止
+
+    Args:
+        driver: ChromeDriver实例
+        plan (ExecutionPlan): 执行计划
+        verify (bool): 是否在每一步完成后读取试卷状态，与计划核对
+
+    Returns:
+        ImportStats: 执行统计，失败时failed_record记录失败的步骤序号和说明，核对不一致时记录在mismatches中
+    """
+    from automation.paper_settings import configure_paper_settings
+    from automation.question_management import add_section, add_questions
+
+    stats = ImportStats()
+    verifier = PaperVerifier(take_snapshot(driver)) if verify else None
+    for number, step in enumerate(plan.steps, 1):
+        logger.info(f"执行第{number}/{len(plan.steps)}步: {step.description}")
+        with log_context(step=f"{number}:{step.kind}"):
+            if step.kind == "settings":
+                succeeded = configure_paper_settings(driver, step.args["features"])
+                if verifier and succeeded:
+                    verifier.expect_settings(step.args["features"] or {})
+            elif step.kind == "section":
+                succeeded = add_section(driver, step.args["name"])
+                stats.sections += succeeded
+                if verifier and succeeded:
+                    verifier.expect_section(step.args["name"])
+            else:
+                added = add_questions(driver, step.args["question_types"], step.args["contents"])
+                stats.questions += added
+                succeeded = added == len(step.args["question_types"])
+                if verifier:
+                    verifier.expect_questions(step.args["question_types"][:added])
+        if not succeeded:
+            stats.failed_record = {"line": number, "step": step.kind, "description": step.description}
+            logger.error(f"第{number}步失败: {step.description}")
+            return stats
+        if verifier:
+            stats.mismatches = verifier.verify(driver)
+            if stats.mismatches:
+                logger.error(f"第{number}步完成后试卷状态与计划不一致，停止执行: {step.description}")
+                return stats
+        if driver.memory is not None:
+            driver.memory.checkpoint(f"第{number}步")
+        stats.batches += 1
+
+    logger.info(
+        f"试卷创建完成: {stats.sections}个大题，{stats.questions}题，"
+        f"用时{stats.elapsed:.1f}秒（预计{plan.seconds:.1f}秒）"
+    )
+    return stats
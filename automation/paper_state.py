@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+试卷状态快照模块，一次脚本调用读取整份试卷的结构，并按批次与预期结果核对
+
+快照包含大题名称、按顺序排列的题目题型和试卷功能选项的勾选状态。
+PaperVerifier以导入开始时的快照为基准，累计每一步预期添加的内容，每批完成后读取一次快照比较，
+不需要在每道题目之后单独检查页面。页面中读取不到任何大题或题目时，先看大题栏或编辑器容器是否存在：
+容器存在说明内容确实没有添加，报告不一致；容器也不存在时多半是编辑器改版、定位器不匹配，
+只记录一次警告并跳过这一项的核对。
+"""
+
+from automation.locators import css_selectors
+from automation.question_management import MENU_ITEM_POSITIONS
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 一次读取大题、题目和试卷功能选项，每个元素使用定位器中第一个有结果的选择器
+_SNAPSHOT_SCRIPT = """
+var c = arguments[0];
+function queryAll(root, chain) {
+    for (var i = 0; i < chain.length; i++) {
+        var found = Array.from(root.querySelectorAll(chain[i]));
+        if (found.length) { return found; }
+    }
+    return [];
+}
+var sections = queryAll(document, c.section).map(function (item) {
+    var input = item.querySelector('input');
+    return input ? input.value.trim() : item.textContent.trim();
+});
+var questions = queryAll(document, c.block).map(function (block) {
+    var type = queryAll(block, c.blockType)[0];
+    return type ? type.textContent.trim() : '';
+});
+var options = queryAll(document, c.option);
+var settings = options.length ? options.map(function (label) {
+    return [label.textContent.trim(), label.classList.contains('is-checked')];
+}) : null;
+var anchors = {
+    sections: queryAll(document, c.sectionAnchor).length > 0,
+    questions: queryAll(document, c.questionAnchor).length > 0
+};
+return {sections: sections, questions: questions, settings: settings, anchors: anchors};
+"""
+
+def match_question_type(text):
+    """
+    从题目的题型标签中识别题型，标签可能带有分值等附加文字
+
+    Args:
+        text (str): 题型标签文字
+
+    Returns:
+        str: QuestionType中的题型值，无法识别时返回None
+    """
+    return next((value for value in MENU_ITEM_POSITIONS if value in (text or "")), None)
+
+class PaperSnapshot:
+    """试卷状态快照"""
+
+    def __init__(self, sections, questions, settings=None, anchors=None):
+        """
+        Args:
+            sections (list): 大题名称，按页面顺序排列
+            questions (list): 题目的题型，按页面顺序排列，无法识别的题型保留原文字
+            settings (list): 试卷功能选项[(选项文字, 是否勾选), ...]，设置对话框未渲染时为None
+            anchors (dict): {"sections": 大题栏是否存在, "questions": 编辑器是否存在}，None表示都存在
+        """
+        self.sections = sections
+        self.questions = questions
+        self.settings = settings
+        self.anchors = anchors or {"sections": True, "questions": True}
+
+    def to_dict(self):
+        """转换为可序列化的字典"""
+        return {"sections": self.sections, "questions": self.questions, "settings": self.settings, "anchors": self.anchors}
+
+def take_snapshot(driver):
+    """
+    一次脚本调用读取试卷状态
+
+    Args:
+        driver: ChromeDriver实例
+
+    Returns:
+        PaperSnapshot: 试卷状态
+    """
+    state = driver.driver.execute_script(_SNAPSHOT_SCRIPT, {
+        "section": css_selectors("section_item"),
+        "block": css_selectors("question_block"),
+        "blockType": css_selectors("question_block_type"),
+        "option": css_selectors("settings_feature_options"),
+        "sectionAnchor": css_selectors("section_sidebar"),
+        "questionAnchor": css_selectors("editor_root"),
+    })
+    questions = [match_question_type(text) or text for text in state["questions"]]
+    settings = [tuple(option) for option in state["settings"]] if state["settings"] is not None else None
+    return PaperSnapshot(state["sections"], questions, settings, state["anchors"])
+
+class PaperVerifier:
+    """按批次核对试卷状态"""
+
+    def __init__(self, baseline):
+        """
+        Args:
+            baseline (PaperSnapshot): 开始操作前的快照，页面中已有的内容
+        """
+        self.sections = list(baseline.sections)
+        self.questions = list(baseline.questions)
+        self.settings = {}
+        # 已经警告过无法核对的项目，每项只警告一次
+        self._unverifiable = set()
+
+    def expect_section(self, name):
+        """预期添加一个大题，名称为空时不核对名称"""
+        self.sections.append(name or None)
+
+    def expect_questions(self, question_types):
+        """预期按顺序添加一组题目"""
+        self.questions.extend(question_types)
+
+    def expect_settings(self, features):
+        """
+        预期的试卷功能选项状态
+
+        Args:
+            features (dict): {选项序号（从1开始）或选项文字: 是否勾选}
+        """
+        self.settings.update(features)
+
+    def diff(self, snapshot):
+        """
+        比较快照与预期的状态
+
+        Args:
+            snapshot (PaperSnapshot): 当前的快照
+
+        Returns:
+            list: 不一致之处的说明，一致时为空列表
+        """
+        differences = []
+        if self._verifiable("大题", snapshot.sections, self.sections, snapshot.anchors["sections"]):
+            if len(snapshot.sections) != len(self.sections):
+                differences.append(f"大题数量为{len(snapshot.sections)}，预期{len(self.sections)}")
+            for number, (actual, expected) in enumerate(zip(snapshot.sections, self.sections), 1):
+                if expected and actual != expected:
+                    differences.append(f"第{number}个大题名称为「{actual}」，预期「{expected}」")
+
+        if self._verifiable("题目", snapshot.questions, self.questions, snapshot.anchors["questions"]):
+            if len(snapshot.questions) != len(self.questions):
+                differences.append(f"题目数量为{len(snapshot.questions)}，预期{len(self.questions)}")
+            for number, (actual, expected) in enumerate(zip(snapshot.questions, self.questions), 1):
+                if actual != expected:
+                    # 第一处顺序不一致之后的题目都会错位，只报告第一处
+                    differences.append(f"第{number}题为{actual}，预期{expected}")
+                    break
+
+        if self.settings and snapshot.settings is None:
+            logger.debug("设置对话框未渲染，跳过试卷功能选项的核对")
+        elif self.settings:
+            for key, wanted in self.settings.items():
+                if isinstance(key, int):
+                    option = snapshot.settings[key - 1] if 1 <= key <= len(snapshot.settings) else None
+                else:
+                    option = next((option for option in snapshot.settings if key in option[0]), None)
+                if option is None:
+                    differences.append(f"未找到试卷功能选项: {key}")
+                elif option[1] != bool(wanted):
+                    differences.append(f"试卷功能选项「{option[0]}」{'未勾选' if wanted else '仍处于勾选状态'}")
+        return differences
+
+    def _verifiable(self, item, actual, expected, anchored):
+        """
+        页面中一个都没有读取到但预期应有内容，且所在的容器也不存在时，多半是定位器与页面不匹配，警告后跳过这一项
+
+        Args:
+            item (str): 核对项目的名称
+            actual (list): 快照中读取到的内容
+            expected (list): 预期的内容
+            anchored (bool): 页面中是否存在该项所在的容器（大题栏或编辑器）
+
+        Returns:
+            bool: 是否核对这一项
+        """
+        if actual or not expected or anchored:
+            return True
+        if item not in self._unverifiable:
+            self._unverifiable.add(item)
+            logger.warning(f"页面中未读取到任何{item}（预期{len(expected)}个），其所在的容器也不存在，可能是定位器与页面不匹配，跳过{item}的核对")
+        return False
+
+    def verify(self, driver):
+        """
+        读取一次快照并与预期的状态比较，不一致时记录错误日志
+
+        Args:
+            driver: ChromeDriver实例
+
+        Returns:
+            list: 不一致之处的说明，一致时为空列表
+        """
+        differences = self.diff(take_snapshot(driver))
+        for difference in differences:
+            logger.error(f"试卷状态与预期不一致: {difference}")
+        return differences
@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+题库批量导入模块，以流式方式读取JSONL、CSV、Excel题库并按顺序添加大题和题目
+"""
+
+import os
+import csv
+import json
+import time
+from config.settings import VERIFY_BATCHES
+from utils.logger import setup_logger, log_context
+from utils.exceptions import ConfigError
+from utils.tracing import span, traced
+from automation.question_management import add_section, add_questions, QuestionType
+from automation.journal import read_paper_progress, STEP_SECTION, STEP_QUESTIONS
+from automation.paper_state import PaperVerifier, take_snapshot
+
+logger = setup_logger(__name__)
+
+# 每批解析的题目数量
+DEFAULT_BATCH_SIZE = 50
+
+# 支持的文件格式
+SUPPORTED_EXTENSIONS = (".jsonl", ".csv", ".xlsx", ".xlsm")
+
+# 题型别名，支持中文名称和QuestionType常量名
+_TYPE_ALIASES = {
+    name.lower(): value
+    for name, value in vars(QuestionType).items()
+    if not name.startswith("_")
+}
+_TYPE_ALIASES.update({value: value for value in _TYPE_ALIASES.values()})
+
+
+def normalize_question_type(value):
+    """
+    将题库中的题型字段转换为QuestionType常量
+
+    Args:
+        value (str): 题型，可以是"问答题"或"QUESTION_ANSWER"
+
+    Returns:
+        str: QuestionType中的题型值
+
+    Raises:
+        ConfigError: 未知的题型
+    """
+    key = str(value or "").strip()
+    question_type = _TYPE_ALIASES.get(key) or _TYPE_ALIASES.get(key.lower())
+    if not question_type:
+        raise ConfigError(f"未知的题型: {value}")
+    return question_type
+
+
+def _make_record(row, line_no):
+    """
+    将一行原始数据转换为题目记录
+
+    Args:
+        row (dict): 原始行数据，包含section、type、content字段
+        line_no (int): 行号，用于错误提示
+
+    Returns:
+        dict: 题目记录
+    """
+    try:
+        question_type = normalize_question_type(row.get("type"))
+    except ConfigError as e:
+        raise ConfigError(f"第{line_no}行: {str(e)}")
+
+    return {
+        "section": str(row.get("section") or "").strip(),
+        "type": question_type,
+        "content": str(row.get("content") or ""),
+        "line": line_no,
+    }
+
+
+def _iter_jsonl(path):
+    """逐行读取JSONL题库"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ConfigError(f"第{line_no}行不是合法的JSON: {str(e)}")
+            yield _make_record(row, line_no)
+
+
+def _iter_csv(path):
+    """逐行读取CSV题库，第一行为表头"""
+    # utf-8-sig 兼容Excel导出的带BOM的CSV
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        for line_no, row in enumerate(reader, 2):
+            if not any(row.values()):
+                continue
+            yield _make_record(row, line_no)
+
+
+def _iter_excel(path):
+    """以只读模式逐行读取Excel题库，第一行为表头"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ConfigError("读取Excel题库需要安装openpyxl: pip install openpyxl")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        header = [str(cell or "").strip().lower() for cell in header]
+        for line_no, values in enumerate(rows, 2):
+            if not any(values):
+                continue
+            yield _make_record(dict(zip(header, values)), line_no)
+    finally:
+        workbook.close()
+
+
+def iter_questions(path):
+    """
+    按文件格式以流式方式读取题库
+
+    Args:
+        path (str): 题库文件路径
+
+    Yields:
+        dict: 题目记录，包含section、type、content、line字段
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return _iter_jsonl(path)
+    if ext == ".csv":
+        return _iter_csv(path)
+    if ext in (".xlsx", ".xlsm"):
+        return _iter_excel(path)
+    raise ConfigError(f"不支持的题库格式: {ext}，支持: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+def iter_batches(records, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    将题目记录按批次分组
+
+    Args:
+        records: 题目记录迭代器
+        batch_size (int): 每批题目数量
+
+    Yields:
+        list: 一批题目记录
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportStats:
+    """导入统计信息"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.sections = 0
+        self.questions = 0
+        self.batches = 0
+        self.skipped = 0
+        self.failed_record = None
+        self.mismatches = []  # 批次核对发现的不一致之处
+
+    @property
+    def elapsed(self):
+        """已用时间（秒）"""
+        return time.monotonic() - self.started_at
+
+    @property
+    def questions_per_minute(self):
+        """每分钟添加的题目数"""
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return self.questions * 60.0 / elapsed
+
+    @property
+    def succeeded(self):
+        """导入是否全部成功"""
+        return self.failed_record is None and not self.mismatches
+
+
+def split_by_section(batch):
+    """
+    将一批题目按连续的大题名称分组，未填写大题名称的题目归入前一组
+
+    Yields:
+        tuple: (大题名称, 题目记录列表)
+    """
+    section, records = None, []
+    for record in batch:
+        if record["section"] and record["section"] != section and records:
+            yield section, records
+            records = []
+        if record["section"]:
+            section = record["section"]
+        records.append(record)
+    if records:
+        yield section, records
+
+
+@traced()
+def import_questions(driver, batches, journal=None, index=None, verify=VERIFY_BATCHES):
+    """
+    将题库批次依次添加到当前试卷，大题名称变化时先添加新的大题
+
+    Args:
+        driver: ChromeDriver实例
+        batches: 题目批次迭代器，通常由iter_batches生成
+        journal (BuildJournal): 导入日志（可选），每一步前后写入记录；
+            恢复的任务先核对页面中已有的大题和题目，跳过已完成的部分
+        index (QuestionIndex): 题目去重索引（可选），先读取试卷中已有的题目，
+            之后跳过已在试卷或题库中的题目；大题的题目全部重复时不添加该大题
+        verify (bool): 是否在每批完成后读取试卷状态，与预期添加的大题和题目核对
+
+    Returns:
+        ImportStats: 导入统计信息，遇到第一个失败的题目或核对不一致即停止
+    """
+    stats = ImportStats()
+    current_section = None
+    skip_sections = skip_questions = 0
+    if journal is not None and journal.resumed:
+        skip_sections, skip_questions = journal.reconcile(*read_paper_progress(driver))
+    if index is not None:
+        index.scrape(driver)
+    verifier = PaperVerifier(take_snapshot(driver)) if verify else None
+
+    for batch in batches:
+        with span("import_batch", batch=stats.batches + 1, size=len(batch)), log_context(step=f"batch-{stats.batches + 1}"):
+            for section, records in split_by_section(batch):
+                # 恢复的任务跳过页面中已有的题目
+                skipped = 0
+                if skip_questions:
+                    skipped = min(skip_questions, len(records))
+                    skip_questions -= skipped
+                    stats.skipped += skipped
+                    records = records[skipped:]
+
+                # 跳过已在试卷或题库中的题目
+                if index is not None and records:
+                    fresh = index.filter_new(records)
+                    stats.skipped += len(records) - len(fresh)
+                    records = fresh
+
+                # 题目都已在试卷或题库中时暂不添加大题，同名大题之后有新题目时再添加；
+                # 页面中已有其题目的大题已经添加过，需要计入恢复时跳过的大题
+                if not records and not skipped:
+                    continue
+
+                if section and section != current_section:
+                    if skip_sections:
+                        skip_sections -= 1
+                    else:
+                        step = journal.begin_step(STEP_SECTION, section, 1) if journal else None
+                        added_section = add_section(driver, section)
+                        if journal:
+                            journal.complete_step(step, int(added_section))
+                        if verifier and added_section:
+                            verifier.expect_section(section)
+                        if not added_section:
+                            stats.failed_record = records[0]
+                            logger.error(f"第{records[0]['line']}行: 添加大题失败: {section}")
+                            return stats
+                        stats.sections += 1
+                    current_section = section
+                if not records:
+                    continue
+
+                # 同一大题内连续的题目一次性批量添加
+                step = journal.begin_step(STEP_QUESTIONS, str(records[0]["line"]), len(records)) if journal else None
+                added = add_questions(
+                    driver,
+                    [record["type"] for record in records],
+                    [record["content"] for record in records],
+                )
+                if journal:
+                    journal.complete_step(step, added)
+                if index is not None:
+                    index.add(records[:added])
+                if verifier:
+                    verifier.expect_questions([record["type"] for record in records[:added]])
+                stats.questions += added
+                if added < len(records):
+                    record = records[added]
+                    stats.failed_record = record
+                    logger.error(f"第{record['line']}行: 添加{record['type']}失败")
+                    return stats
+
+        stats.batches += 1
+        if journal:
+            journal.record_paper_url(driver.driver.current_url)
+        if index is not None:
+            index.bind_paper(driver.driver.current_url)
+        if verifier:
+            stats.mismatches = verifier.verify(driver)
+            if stats.mismatches:
+                logger.error(f"第{stats.batches}批完成后试卷状态与预期不一致，停止导入")
+                return stats
+        # 本批已完成并核对，记录内存变化；超过阈值时在任务结束后回收
+        if driver.memory is not None:
+            driver.memory.checkpoint(f"第{stats.batches}批")
+        logger.info(
+            f"已完成第{stats.batches}批，累计{stats.questions}题，"
+            f"吞吐量: {stats.questions_per_minute:.1f} 题/分钟"
+        )
+
+    logger.info(
+        f"题库导入完成: {stats.sections}个大题，{stats.questions}题"
+        f"{f'（跳过已有的{stats.skipped}题）' if stats.skipped else ''}，"
+        f"用时{stats.elapsed:.1f}秒，吞吐量: {stats.questions_per_minute:.1f} 题/分钟"
+    )
+    return stats
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+题目去重索引模块，在SQLite中按试卷和题库记录题目内容的摘要
+
+摘要由题型和规范化后的题干计算（全角转半角、去掉HTML标签、合并空白）。
+索引的内容来自两处：自动化添加成功的题目，以及导入开始时一次读取的试卷中已有的题目。
+重复运行同一题库或合并多份题库时，已在试卷（或指定题库）中的题目直接跳过，不再操作页面。
+同一次导入中内容相同的题目（例如题干相同、选项不同的通用题干）不视为重复，都会添加。
+题干为空的题目无法判断是否重复，总是添加。
+"""
+
+import os
+import re
+import html
+import time
+import uuid
+import sqlite3
+import hashlib
+import unicodedata
+from config.settings import DEDUP_INDEX_FILE
+from utils.logger import setup_logger
+from automation.locators import css_selectors
+from automation.paper_state import match_question_type
+
+logger = setup_logger(__name__)
+
+# 索引范围
+SCOPE_PAPER = "paper"
+SCOPE_LIBRARY = "library"
+
+# 记录来源
+SOURCE_ADDED = "added"  # 自动化添加成功
+SOURCE_SCRAPED = "scraped"  # 从试卷页面读取
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    scope TEXT NOT NULL,
+    scope_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    type TEXT NOT NULL,
+    preview TEXT,
+    source TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (scope, scope_id, hash)
+);
+"""
+
+# 一次读取试卷中全部题目的题型和题干，每个元素使用定位器中第一个有结果的选择器
+_SCRAPE_SCRIPT = """
+var blockChain = arguments[0], typeChain = arguments[1], stemChain = arguments[2];
+function queryAll(root, chain) {
+    for (var i = 0; i < chain.length; i++) {
+        var found = Array.from(root.querySelectorAll(chain[i]));
+        if (found.length) { return found; }
+    }
+    return [];
+}
+function stemText(el) {
+    if (!el) { return ''; }
+    var target = el.querySelector('textarea, input, iframe, [contenteditable]') || el;
+    if (target.tagName === 'IFRAME') { return target.contentDocument ? target.contentDocument.body.innerText : ''; }
+    if (target.tagName === 'TEXTAREA' || target.tagName === 'INPUT') { return target.value; }
+    return target.innerText;
+}
+return queryAll(document, blockChain).map(function (block) {
+    var type = queryAll(block, typeChain)[0];
+    return [type ? type.textContent.trim() : '', stemText(queryAll(block, stemChain)[0])];
+});
+"""
+
+_PAPER_ID_PATTERN = re.compile(r"paperId=([^&#/]+)")
+
+def normalize_content(content):
+    """
+    规范化题干：全角字符转半角、去掉HTML标签、合并空白
+
+    Args:
+        content (str): 题干
+
+    Returns:
+        str: 规范化后的题干
+    """
+    text = unicodedata.normalize("NFKC", content or "")
+    text = html.unescape(re.sub(r"<[^>]+>", " ", text))
+    return re.sub(r"\s+", " ", text).strip()
+
+def content_hash(question_type, content):
+    """
+    计算题目内容的摘要
+
+    Args:
+        question_type (str): 题型
+        content (str): 题干
+
+    Returns:
+        str: 十六进制摘要，题干为空时返回None
+    """
+    text = normalize_content(content)
+    if not text:
+        return None
+    return hashlib.sha256(f"{question_type}\n{text}".encode("utf-8")).hexdigest()
+
+def paper_key(url):
+    """
+    从试卷地址中取出试卷ID
+
+    Args:
+        url (str): 页面地址
+
+    Returns:
+        str: 试卷ID，创建试卷页面等还没有试卷ID时返回None
+    """
+    match = _PAPER_ID_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+def scrape_paper_questions(driver):
+    """
+    一次脚本调用读取试卷中已有题目的题型和题干
+
+    Args:
+        driver: ChromeDriver实例
+
+    Returns:
+        list: [(题型, 题干), ...]，无法识别题型的题目不包含在内
+    """
+    questions = []
+    rows = driver.driver.execute_script(
+        _SCRAPE_SCRIPT, css_selectors("question_block"), css_selectors("question_block_type"),
+        css_selectors("question_block_stem"),
+    )
+    for type_text, content in rows:
+        question_type = match_question_type(type_text)
+        if question_type is None:
+            logger.debug(f"无法识别试卷中题目的题型: {type_text}")
+            continue
+        questions.append((question_type, content))
+    return questions
+
+class QuestionIndex:
+    """题目去重索引"""
+
+    def __init__(self, path=DEDUP_INDEX_FILE, library=None):
+        """
+        Args:
+            path (str): SQLite数据库路径，多个进程可以共用
+            library (str): 题库名称（可选），指定时同一题库中已有的题目也跳过
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.library = library
+        # 还没有试卷ID时使用临时ID，得到试卷ID后再迁移
+        self.paper_id = f"pending:{uuid.uuid4().hex}"
+        self.paper_bound = False
+        # 本次导入新加入索引的摘要，同一题库文件中内容相同的题目不因此跳过
+        self._added_hashes = set()
+
+    def _scopes(self):
+        """当前生效的索引范围"""
+        scopes = [(SCOPE_PAPER, self.paper_id)]
+        if self.library:
+            scopes.append((SCOPE_LIBRARY, self.library))
+        return scopes
+
+    def bind_paper(self, url):
+        """
+        根据页面地址确定试卷ID，之前记录在临时ID下的题目迁移到试卷ID下
+
+        Args:
+            url (str): 当前页面地址
+        """
+        key = paper_key(url)
+        if key is None or (self.paper_bound and key == self.paper_id):
+            return
+        self.conn.execute(
+            "INSERT OR IGNORE INTO questions SELECT scope, ?, hash, type, preview, source, added_at "
+            "FROM questions WHERE scope = ? AND scope_id = ?",
+            (key, SCOPE_PAPER, self.paper_id),
+        )
+        self.conn.execute("DELETE FROM questions WHERE scope = ? AND scope_id = ?", (SCOPE_PAPER, self.paper_id))
+        self.paper_id = key
+        self.paper_bound = True
+
+    def scrape(self, driver):
+        """
+        读取试卷中已有的题目并加入索引
+
+        Args:
+            driver: 已打开试卷的ChromeDriver实例
+
+        Returns:
+            int: 读取到的题目数量
+        """
+        self.bind_paper(driver.driver.current_url)
+        questions = scrape_paper_questions(driver)
+        self._insert(questions, SOURCE_SCRAPED)
+        if questions:
+            logger.info(f"试卷中已有{len(questions)}道题目，已加入去重索引")
+        return len(questions)
+
+    def _insert(self, questions, source):
+        """写入索引，questions为(题型, 题干)的迭代器"""
+        now = time.time()
+        rows = []
+        for question_type, content in questions:
+            digest = content_hash(question_type, content)
+            if digest is None:
+                continue
+            preview = normalize_content(content)[:40]
+            rows.extend((scope, scope_id, digest, question_type, preview, source, now) for scope, scope_id in self._scopes())
+        if rows:
+            self.conn.executemany("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def add(self, records):
+        """
+        记录添加成功的题目
+
+        Args:
+            records (list): 题目记录，包含type、content字段
+        """
+        questions = [(record["type"], record["content"]) for record in records]
+        for question_type, content in questions:
+            digest = content_hash(question_type, content)
+            if digest is not None and not self.contains(digest):
+                self._added_hashes.add(digest)
+        self._insert(questions, SOURCE_ADDED)
+
+    def contains(self, digest):
+        """摘要是否已在试卷或题库中"""
+        for scope, scope_id in self._scopes():
+            row = self.conn.execute(
+                "SELECT 1 FROM questions WHERE scope = ? AND scope_id = ? AND hash = ?", (scope, scope_id, digest)
+            ).fetchone()
+            if row:
+                return True
+        return False
+
+    def filter_new(self, records):
+        """
+        去掉导入开始前已在试卷或题库中的题目，本次导入中内容相同的题目不跳过
+
+        Args:
+            records (list): 题目记录
+
+        Returns:
+            list: 需要添加的题目记录
+        """
+        fresh = []
+        for record in records:
+            digest = content_hash(record["type"], record["content"])
+            if digest is not None and digest not in self._added_hashes and self.contains(digest):
+                logger.info(f"第{record['line']}行: 题目已在试卷或题库中，跳过: {normalize_content(record['content'])[:40]}")
+                continue
+            fresh.append(record)
+        return fresh
+
+    def count(self, scope=SCOPE_PAPER, scope_id=None):
+        """
+        索引中的题目数量
+
+        Args:
+            scope (str): 索引范围
+            scope_id (str): 试卷ID或题库名称，默认为当前试卷或题库
+        """
+        if scope_id is None:
+            scope_id = self.paper_id if scope == SCOPE_PAPER else self.library
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM questions WHERE scope = ? AND scope_id = ?", (scope, scope_id)
+        ).fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接，未得到试卷ID时删除临时记录"""
+        if not self.paper_bound:
+            self.conn.execute("DELETE FROM questions WHERE scope = ? AND scope_id = ?", (SCOPE_PAPER, self.paper_id))
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -5,15 +5,30 @@
 试题管理自动化模块
 """
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
+from automation.locators import LOCATORS, get_resolver
+from core.actions import ActionBatch
+from core.retry import FallbackChain
+from core.waits import all_hidden, element_present, count_reached
+from utils.exceptions import StepCommittedError
 from utils.logger import setup_logger
-from selenium.webdriver.common.keys import Keys
+from utils.tracing import traced
 
 logger = setup_logger(__name__)
 
+# 题型在下拉菜单中的位置，键盘操作时使用
+MENU_ITEM_POSITIONS = {
+    "单选题": 0,
+    "多选题": 1,
+    "判断题": 2,
+    "填空题": 3,
+    "问答题": 4,
+    "组合题": 5,
+    "录音题": 6
+}
+
+# 下拉菜单选项全部隐藏，用于高吞吐模式下判断选择已生效
+DROPDOWN_MENU_CLOSED = all_hidden(LOCATORS["question_type_item"].selectors[:1], description="dropdown_menu_closed")
+
 class QuestionType:
     """题型枚举"""
     SINGLE_CHOICE = "单选题"
@@ -24,10 +39,105 @@ class QuestionType:
     GROUP = "组合题"
     RECORD = "录音题"
 
+def _add_question_by_click(driver, question_type):
+    """通过点击下拉菜单选项添加题目"""
+    locators = get_resolver(driver)
+
+    # 1. 首先定位并点击触发按钮
+    trigger_button = locators.find("question_type_trigger")
+    
+    # 使用 JavaScript 点击按钮
+    driver.driver.execute_script("""
+        function clickButton(button) {
+            // 确保元素在视图中
+            button.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            
+            // 模拟鼠标移入
+            button.dispatchEvent(new MouseEvent('mouseenter', {
+                bubbles: true,
+                cancelable: true,
+                view: window
+            }));
+            
+            // 短暂延迟后点击
+            setTimeout(() => {
+                button.click();
+            }, 100);
+        }
+        arguments[0].click();
+    """, trigger_button)
+    
+    # 2. 等待下拉菜单出现，按题型名称找到对应的选项
+    target_item = driver.pause(2, 3, until=locators.condition("question_type_item", text=question_type, visible=True))
+    if not target_item:
+        target_item = locators.find("question_type_item", text=question_type, visible=True)
+
+    # 3. 使用 JavaScript 点击目标选项
+    driver.driver.execute_script("""
+        function clickMenuItem(item) {
+            // 确保元素在视图中
+            item.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            
+            // 模拟鼠标移入
+            item.dispatchEvent(new MouseEvent('mouseenter', {
+                bubbles: true,
+                cancelable: true,
+                view: window
+            }));
+            
+            // 短暂延迟后点击
+            setTimeout(() => {
+                item.click();
+            }, 100);
+        }
+        arguments[0].click();
+    """, target_item)
+
+    # 选项已点击，之后的失败不能重试，否则可能重复添加
+    try:
+        driver.pause(1, 2, until=DROPDOWN_MENU_CLOSED)
+    except Exception as e:
+        raise StepCommittedError(f"已选择{question_type}，但下拉菜单未关闭: {str(e)}") from e
+    return True
+
+def _add_question_by_keyboard(driver, question_type):
+    """通过方向键在下拉菜单中选择题型添加题目"""
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.keys import Keys
+    
+    locators = get_resolver(driver)
+    actions = ActionChains(driver.driver)
+    # 先点击触发按钮
+    trigger_button = locators.find("question_type_trigger")
+    actions.move_to_element(trigger_button).click().perform()
+    driver.pause(1, 2, until=locators.condition("question_type_item", visible=True))
+    
+    # 使用方向键选择选项
+    for _ in range(MENU_ITEM_POSITIONS[question_type]):
+        actions.send_keys(Keys.ARROW_DOWN).perform()
+        driver.pause(0.5, 1)
+    
+    # 按回车确认
+    actions.send_keys(Keys.ENTER).perform()
+    try:
+        driver.pause(1, 2, until=DROPDOWN_MENU_CLOSED)
+    except Exception as e:
+        raise StepCommittedError(f"已按回车选择{question_type}，但下拉菜单未关闭: {str(e)}") from e
+    return True
+
+# 添加题目的方式，默认先点击菜单选项，失败时使用键盘操作
+ADD_QUESTION_CHAIN = FallbackChain("add_question", [
+    ("click", _add_question_by_click),
+    ("keyboard", _add_question_by_keyboard),
+])
+
+@traced()
 def add_question(driver, question_type):
     """
     添加指定类型的题目
     
+    依次尝试点击菜单选项和键盘操作，可重试的失败按退避重试，见core.retry。
+    
     Args:
         driver: ChromeDriver实例
         question_type: 题目类型，使用QuestionType类中的常量
@@ -35,118 +145,153 @@ def add_question(driver, question_type):
     Returns:
         bool: 操作是否成功
     """
+    if question_type not in MENU_ITEM_POSITIONS:
+        logger.error(f"未知的题型: {question_type}")
+        return False
+    
     try:
         logger.info(f"准备添加{question_type}...")
-        driver._random_sleep(1, 2)
-
-        # 1. 首先定位并点击触发按钮
-        trigger_button = WebDriverWait(driver.driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".suject-opreate .el-dropdown-link"))
-        )
-        
-        # 使用 JavaScript 点击按钮
-        driver.driver.execute_script("""
-            function clickButton(button) {
-                // 确保元素在视图中
-                button.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                
-                // 模拟鼠标移入
-                button.dispatchEvent(new MouseEvent('mouseenter', {
-                    bubbles: true,
-                    cancelable: true,
-                    view: window
-                }));
-                
-                // 短暂延迟后点击
-                setTimeout(() => {
-                    button.click();
-                }, 100);
-            }
-            arguments[0].click();
-        """, trigger_button)
-        
-        driver._random_sleep(2, 3)  # 等待下拉菜单出现
-
-        # 2. 等待下拉菜单出现并获取所有选项
-        menu_items = WebDriverWait(driver.driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".el-dropdown-menu__item"))
-        )
-
-        # 3. 根据题型找到对应的选项
-        item_positions = {
-            "单选题": 0,
-            "多选题": 1,
-            "判断题": 2,
-            "填空题": 3,
-            "问答题": 4,
-            "组合题": 5,
-            "录音题": 6
-        }
-
-        position = item_positions.get(question_type)
-        if position is None:
-            raise Exception(f"未知的题型: {question_type}")
-
-        if position >= len(menu_items):
-            raise Exception(f"菜单项索引越界: {position}, 总数: {len(menu_items)}")
-
-        target_item = menu_items[position]
-
-        # 4. 使用 JavaScript 点击目标选项
-        driver.driver.execute_script("""
-            function clickMenuItem(item) {
-                // 确保元素在视图中
-                item.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                
-                // 模拟鼠标移入
-                item.dispatchEvent(new MouseEvent('mouseenter', {
-                    bubbles: true,
-                    cancelable: true,
-                    view: window
-                }));
-                
-                // 短暂延迟后点击
-                setTimeout(() => {
-                    item.click();
-                }, 100);
-            }
-            arguments[0].click();
-        """, target_item)
-
-        driver._random_sleep(1, 2)
+        driver.pause(1, 2)
+        ADD_QUESTION_CHAIN.run(driver, question_type)
         logger.info(f"{question_type}添加成功")
         return True
+    except Exception as e:
+        logger.error(f"添加{question_type}失败: {str(e)}")
+        return False
+
+def _count_stem_editors(driver):
+    """页面中题干编辑区的数量"""
+    editors = element_present(LOCATORS["question_stem_editor"].selectors, all_matches=True)(driver.driver)
+    return len(editors) if editors else 0
+
+def _count_question_blocks(driver):
+    """页面中题目的数量"""
+    blocks = element_present(LOCATORS["question_block"].selectors, all_matches=True)(driver.driver)
+    return len(blocks) if blocks else 0
+
+def _fill_new_stem(driver, editors_before, content):
+    """
+    等待新题目的题干编辑区出现后填写题干，人类节奏模式下使用
+
+    Args:
+        driver: ChromeDriver实例
+        editors_before (int): 添加题目之前题干编辑区的数量
+        content (str): 题干内容
 
+    Returns:
+        bool: 题干是否填写成功
+    """
+    try:
+        editors = driver.wait_for(count_reached(
+            LOCATORS["question_stem_editor"].selectors, editors_before + 1, description="new_stem_editor"
+        ))
     except Exception as e:
-        logger.error(f"添加题目时发生错误: {str(e)}")
-        import traceback
-        logger.error(f"详细错误信息: {traceback.format_exc()}")
+        logger.error(f"新题目的题干编辑区未出现: {str(e)}")
+        return False
+    editor = editors[-1]
+    # iframe富文本编辑器无法逐字输入，一次性写入
+    return driver.input_text(editor, content, bulk=True if editor.tag_name.lower() == "iframe" else None)
+
+def build_question_batch(question_types, contents):
+    """
+    将一组题目编译为批量页面操作，每道题目的步骤使用"序号:题型"作为标签
+    
+    Args:
+        question_types (list): 题目类型列表
+        contents (list): 与题目类型对应的题干内容，为空的题目不填写题干
         
-        # 如果失败，尝试使用键盘操作
+    Returns:
+        ActionBatch: 批量页面操作
+    """
+    trigger = LOCATORS["question_type_trigger"].selectors
+    menu_item = LOCATORS["question_type_item"].selectors
+    editor = LOCATORS["question_stem_editor"].selectors
+    
+    batch = ActionBatch()
+    for index, (question_type, content) in enumerate(zip(question_types, contents)):
+        label = f"{index}:{question_type}"
+        if content:
+            batch.count(editor, "editors", label=label)
+        batch.open_dropdown(trigger, menu_item, label=label)
+        batch.pick_item(menu_item, question_type, label=label)
+        if content:
+            # 等待新题目的编辑区出现后填写题干
+            batch.wait_for_more(editor, "editors", label=label)
+            batch.fill_text(editor, content, label=label)
+    return batch
+
+def count_added_questions(results, question_types):
+    """
+    根据批量操作的结果计算按顺序成功添加的题目数量，某道题目的全部步骤成功才算添加成功
+    
+    Args:
+        results (list): 批量操作的结果
+        question_types (list): 题目类型列表
+        
+    Returns:
+        int: 成功添加的题目数量
+    """
+    failed = {result["label"] for result in results if not result.get("ok")}
+    added = 0
+    for index, question_type in enumerate(question_types):
+        if f"{index}:{question_type}" in failed:
+            break
+        added += 1
+    return added
+
+@traced()
+def add_questions(driver, question_types, contents=None):
+    """
+    批量添加题目，高吞吐模式下将整组题目编译为一次页面脚本调用执行
+    
+    人类节奏模式下逐题调用add_question并逐字输入题干，保留随机等待。
+    
+    Args:
+        driver: ChromeDriver实例
+        question_types (list): 题目类型列表，使用QuestionType类中的常量
+        contents (list): 与题目类型对应的题干内容（可选），为空的题目不填写题干
+        
+    Returns:
+        int: 成功添加的题目数量，按顺序计算，遇到第一个失败的题目即停止
+    """
+    question_types = list(question_types)
+    contents = list(contents) if contents else [""] * len(question_types)
+    
+    if driver.pacing.human_gestures:
+        added = 0
+        for question_type, content in zip(question_types, contents):
+            editors_before = _count_stem_editors(driver) if content else 0
+            if not add_question(driver, question_type):
+                break
+            if content and not _fill_new_stem(driver, editors_before, content):
+                # 题目已添加但题干未填写，不计入成功的数量
+                logger.error(f"{question_type}已添加，但填写题干失败")
+                break
+            added += 1
+        return added
+    
+    batch = build_question_batch(question_types, contents)
+    blocks_before = _count_question_blocks(driver)
+    
+    try:
+        logger.info(f"批量添加{len(question_types)}道题目...")
+        results = driver.run_batch(batch)
+    except Exception as e:
+        # 脚本超时等异常时部分题目可能已经添加，读取一次页面中的题目数量
+        logger.error(f"批量添加题目时发生错误: {str(e)}")
         try:
-            logger.info("尝试使用键盘操作...")
-            actions = ActionChains(driver.driver)
-            # 先点击触发按钮
-            trigger_button = driver.driver.find_element(By.CSS_SELECTOR, ".suject-opreate .el-dropdown-link")
-            actions.move_to_element(trigger_button).click().perform()
-            driver._random_sleep(1, 2)
-            
-            # 使用方向键选择选项
-            for _ in range(item_positions.get(question_type, 0)):
-                actions.send_keys(Keys.ARROW_DOWN).perform()
-                driver._random_sleep(0.5, 1)
-            
-            # 按回车确认
-            actions.send_keys(Keys.ENTER).perform()
-            driver._random_sleep(1, 2)
-            
-            logger.info(f"{question_type}添加成功（通过键盘操作）")
-            return True
-            
-        except Exception as e:
-            logger.error(f"键盘操作也失败了: {str(e)}")
-            return False
+            added = min(len(question_types), max(0, _count_question_blocks(driver) - blocks_before))
+        except Exception as count_error:
+            logger.error(f"读取页面中的题目数量失败: {str(count_error)}")
+            return 0
+        logger.warning(f"页面中已添加{added}道，共{len(question_types)}道，最后一道的题干可能未填写完成")
+        return added
+    
+    added = count_added_questions(results, question_types)
+    logger.info(f"批量添加完成: 成功{added}道，共{len(question_types)}道")
+    return added
 
+@traced()
 def add_section(driver, section_name=""):
     """
     添加大题
@@ -161,19 +306,16 @@ def add_section(driver, section_name=""):
     try:
         # 定位添加大题按钮
         logger.info("准备添加大题...")
-        add_section_btn = WebDriverWait(driver.driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#wrap-affix-container > div > div > div.big-questions-aside > div.big-questions-footer > button > span"))
-        )
+        locators = get_resolver(driver)
+        add_section_btn = locators.find("add_section_button", visible=True)
         
         driver.click_element(add_section_btn)
-        driver._random_sleep(1, 2)  # 添加等待时间，确保UI响应
+        driver.pause(1, 2)  # 添加等待时间，确保UI响应
         
         # 如果提供了大题名称，则设置名称
         if section_name:
             # 等待名称输入框出现并输入
-            name_input = WebDriverWait(driver.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".section-name-input"))  # 这里需要根据实际类名调整
-            )
+            name_input = locators.find("section_name_input")
             driver.input_text(name_input, section_name)
         
         logger.info(f"大题添加成功{': ' + section_name if section_name else ''}")
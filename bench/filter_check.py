@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求过滤配置的对照测试：先不拦截加载一次页面，再使用过滤配置加载一次，
+比较加载时间、请求数和传输字节数，并确认编辑器的关键元素在过滤后仍然可以定位。
+
+两次加载都禁用浏览器缓存。不拦截的那次加载测得的各资源类型平均大小会保存下来，
+之后正常运行时据此估算拦截节省的流量。
+
+用法：
+    python -m bench.filter_check --filter lean -p "Profile 2"           # 使用配置文件登录考试星
+    python -m bench.filter_check --filter lean --session-state session.bin
+    python -m bench.filter_check --filter lean --mock                   # 在本地模拟页面上检查
+"""
+
+import sys
+import time
+import argparse
+from config.settings import DEFAULT_URL, REQUEST_FILTER_PROFILES
+from core.driver import ChromeDriver
+from core.request_filter import RequestFilter, save_resource_sizes
+from core.session_state import load_session_state
+from automation.locators import get_resolver
+from utils.exceptions import ElementNotFoundError
+from bench.mock_editor import start_mock_editor, paper_create_url
+
+# 编辑器可用时必须能定位到的元素
+EDITOR_ELEMENTS = ["question_type_trigger", "add_section_button", "settings_button"]
+
+def load_page(driver, url, profile):
+    """
+    使用指定的过滤配置加载一次页面
+
+    Args:
+        driver: ChromeDriver实例，启动时未启用请求过滤
+        url (str): 页面URL
+        profile: 过滤配置，空字典表示只统计不拦截
+
+    Returns:
+        dict: 加载时间、缺失的编辑器元素和过滤统计
+    """
+    request_filter = RequestFilter(profile, disable_cache=True)
+    request_filter.install(driver)
+    try:
+        driver.driver.get("about:blank")
+        started = time.perf_counter()
+        loaded = driver.navigate_to(url)
+        load_seconds = time.perf_counter() - started
+
+        missing = []
+        resolver = get_resolver(driver)
+        for name in EDITOR_ELEMENTS:
+            try:
+                resolver.find(name, timeout=10)
+            except ElementNotFoundError:
+                missing.append(name)
+        ready_seconds = time.perf_counter() - started
+        # 等待页面中延迟发出的请求完成后再读取统计
+        time.sleep(1)
+        return {
+            "loaded": loaded,
+            "load_seconds": round(load_seconds, 2),
+            "ready_seconds": round(ready_seconds, 2),
+            "missing": missing,
+            "stats": request_filter.stats(),
+        }
+    finally:
+        request_filter.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="检查请求过滤配置对页面加载的影响以及编辑器是否仍然可用")
+    parser.add_argument("--filter", required=True, choices=list(REQUEST_FILTER_PROFILES), help="要检查的过滤配置")
+    parser.add_argument("-u", "--url", default=DEFAULT_URL, help="页面URL")
+    parser.add_argument("-p", "--profile", help="登录考试星使用的Chrome用户配置文件")
+    parser.add_argument("--session-state", help="登录考试星使用的会话状态文件")
+    parser.add_argument("--mock", action="store_true", help="在本地模拟页面上检查，不需要登录")
+    parser.add_argument("--headed", action="store_true", help="显示浏览器窗口")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    driver_kwargs = {"isolated": True, "profile_path": args.profile}
+    if args.mock:
+        server = start_mock_editor()
+        url = paper_create_url(server)
+    elif args.session_state:
+        driver_kwargs["session_state"] = load_session_state(args.session_state)
+
+    try:
+        with ChromeDriver(headless=not args.headed, pacing="throughput", request_filter=False, **driver_kwargs) as driver:
+            baseline = load_page(driver, url, {})
+            filtered = load_page(driver, url, args.filter)
+    finally:
+        if server:
+            server.shutdown()
+
+    save_resource_sizes(baseline["stats"])
+    print(f"{'':<10}{'加载(s)':>10}{'可用(s)':>10}{'请求数':>8}{'传输(KB)':>10}{'拦截':>6}  缺失的元素")
+    for label, result in (("不拦截", baseline), (args.filter, filtered)):
+        stats = result["stats"]
+        print(
+            f"{label:<10}{result['load_seconds']:>10.2f}{result['ready_seconds']:>10.2f}{stats['requests']:>8}"
+            f"{stats['bytes'] / 1024:>10.0f}{stats['blocked']:>6}  {', '.join(result['missing']) or '-'}"
+        )
+    saved_bytes = baseline["stats"]["bytes"] - filtered["stats"]["bytes"]
+    saved_requests = baseline["stats"]["requests"] - filtered["stats"]["requests"]
+    print(f"节省: {saved_requests}个请求，{saved_bytes / 1024:.0f}KB，加载时间{baseline['load_seconds'] - filtered['load_seconds']:+.2f}秒")
+
+    if not filtered["loaded"] or filtered["missing"]:
+        print(f"过滤配置 {args.filter} 使编辑器不可用，请调整block_types或allow_urls")
+        sys.exit(1)
+    print(f"过滤配置 {args.filter} 下编辑器可用")
+
+if __name__ == "__main__":
+    main()
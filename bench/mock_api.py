@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+试卷编辑器后台接口的本地模拟服务，用于在不访问考试星的情况下验证接口模式
+
+用法：
+    python -m bench.mock_api --port 8765
+    python main.py -i questions.jsonl --backend api --api-base http://127.0.0.1:8765
+"""
+
+import re
+import json
+import argparse
+import threading
+import itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config.settings import API_CREATE_PAPER_PATH, API_ADD_SECTION_PATH, API_ADD_QUESTION_PATH
+
+def _route(path_template):
+    """将配置中的接口路径转换为正则表达式"""
+    return re.compile("^" + re.escape(path_template).replace(re.escape("{paper_id}"), r"(?P<paper_id>[^/]+)") + "$")
+
+class MockPaperStore:
+    """模拟服务中保存的试卷数据"""
+
+    def __init__(self):
+        self.papers = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_paper(self, name):
+        with self._lock:
+            paper_id = str(next(self._ids))
+            self.papers[paper_id] = {"paperId": paper_id, "paperName": name, "sections": [], "questions": []}
+        return {"paperId": paper_id}
+
+    def add_section(self, paper_id, payload):
+        with self._lock:
+            section_id = str(next(self._ids))
+            self.papers[paper_id]["sections"].append(dict(payload, sectionId=section_id))
+        return {"sectionId": section_id}
+
+    def add_question(self, paper_id, payload):
+        with self._lock:
+            question_id = str(next(self._ids))
+            self.papers[paper_id]["questions"].append(dict(payload, questionId=question_id))
+        return {"questionId": question_id}
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """模拟接口的请求处理器"""
+
+    protocol_version = "HTTP/1.1"  # 支持长连接
+    store = None
+    required_cookie = None
+
+    routes = [
+        (_route(API_CREATE_PAPER_PATH), "create_paper"),
+        (_route(API_ADD_SECTION_PATH), "add_section"),
+        (_route(API_ADD_QUESTION_PATH), "add_question"),
+    ]
+
+    def log_message(self, format, *args):
+        """不输出每个请求的访问日志"""
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        """GET /papers/<id> 返回试卷的全部数据，便于核对"""
+        match = re.match(r"^/papers/(?P<paper_id>[^/]+)$", self.path)
+        paper = match and self.store.papers.get(match.group("paper_id"))
+        if not paper:
+            self._send_json(404, {"success": False, "message": "not found"})
+            return
+        self._send_json(200, {"success": True, "data": paper})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.required_cookie and self.required_cookie not in (self.headers.get("Cookie") or ""):
+            self._send_json(401, {"success": False, "message": "not logged in"})
+            return
+
+        for pattern, action in self.routes:
+            match = pattern.match(self.path)
+            if not match:
+                continue
+            paper_id = match.groupdict().get("paper_id")
+            if paper_id is not None and paper_id not in self.store.papers:
+                self._send_json(404, {"success": False, "message": f"paper {paper_id} not found"})
+                return
+            if action == "create_paper":
+                data = self.store.create_paper(payload.get("paperName", ""))
+            else:
+                data = getattr(self.store, action)(paper_id, payload)
+            self._send_json(200, {"success": True, "data": data})
+            return
+
+        self._send_json(404, {"success": False, "message": "unknown endpoint"})
+
+def start_mock_api(port=0, required_cookie=None):
+    """
+    在后台线程中启动模拟服务
+
+    Args:
+        port (int): 监听端口，0表示自动分配
+        required_cookie (str): 请求必须携带的Cookie名称，None表示不校验
+
+    Returns:
+        tuple: (ThreadingHTTPServer, MockPaperStore)，服务地址为 http://127.0.0.1:server.server_port
+    """
+    store = MockPaperStore()
+    handler = type("BoundMockApiHandler", (MockApiHandler,), {"store": store, "required_cookie": required_cookie})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, store
+
+def main():
+    parser = argparse.ArgumentParser(description="试卷编辑器后台接口的本地模拟服务")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--require-cookie", type=str, help="请求必须携带的Cookie名称")
+    args = parser.parse_args()
+
+    server, _ = start_mock_api(args.port, args.require_cookie)
+    print(f"模拟接口已启动: http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+创建试卷页面的本地模拟服务，页面位于bench/static/paper_create.html
+
+用法：
+    python -m bench.mock_editor --port 8766
+    然后在浏览器中打开 http://127.0.0.1:8766/paper_create.html?latency=50
+"""
+
+import os
+import argparse
+import functools
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# 模拟页面所在目录
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# 模拟的创建试卷页面
+PAPER_CREATE_PAGE = "paper_create.html"
+
+class MockEditorHandler(SimpleHTTPRequestHandler):
+    """静态页面请求处理器"""
+
+    def log_message(self, format, *args):
+        """不输出每个请求的访问日志"""
+        pass
+
+def start_mock_editor(port=0):
+    """
+    在后台线程中启动模拟页面服务
+
+    Args:
+        port (int): 监听端口，0表示自动分配
+
+    Returns:
+        ThreadingHTTPServer: 服务实例，页面地址见paper_create_url
+    """
+    handler = functools.partial(MockEditorHandler, directory=STATIC_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def paper_create_url(server, latency_ms=None):
+    """
+    获取模拟的创建试卷页面地址
+
+    Args:
+        server (ThreadingHTTPServer): start_mock_editor返回的服务
+        latency_ms (int): 页面界面响应的延迟（毫秒），None表示使用页面默认值
+
+    Returns:
+        str: 页面URL
+    """
+    url = f"http://127.0.0.1:{server.server_port}/{PAPER_CREATE_PAGE}"
+    if latency_ms is not None:
+        url += f"?latency={int(latency_ms)}"
+    return url
+
+def main():
+    parser = argparse.ArgumentParser(description="创建试卷页面的本地模拟服务")
+    parser.add_argument("--port", type=int, default=8766, help="监听端口")
+    args = parser.parse_args()
+
+    server = start_mock_editor(args.port)
+    print(f"模拟页面已启动: {paper_create_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
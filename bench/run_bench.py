@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线基准测试，在本地模拟的创建试卷页面上以无头模式运行自动化流程，不需要登录考试星
+
+每个场景在新加载的页面上执行，结束后读取页面状态核对结果，并统计：
+题目吞吐量（题/分钟）、每道题的WebDriver命令数、耗时。
+结果与保存的基准比较，任何一项变差超过容差时以非零状态退出。
+
+用法：
+    python -m bench.run_bench                       # 运行并与bench/baseline.json比较
+    python -m bench.run_bench --update-baseline     # 运行并保存为新的基准
+    python -m bench.run_bench --scenario questions --repeat 5 --latency 100
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from core.driver import ChromeDriver, PACING_POLICIES
+from automation.paper_settings import configure_paper_settings
+from automation.question_management import add_questions, QuestionType
+from automation.question_import import iter_batches, import_questions
+from core.retry import strategy_stats
+from utils.logger import logging_stats
+from bench.mock_editor import start_mock_editor, paper_create_url
+
+# 默认的基准文件
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# 默认容差：耗时、吞吐量、命令数相对基准变差超过此比例视为退化
+DEFAULT_TOLERANCE = 0.2
+
+# 全部七种题型，按菜单顺序
+ALL_TYPES = [
+    QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE, QuestionType.JUDGMENT,
+    QuestionType.FILL_BLANK, QuestionType.QUESTION_ANSWER, QuestionType.GROUP, QuestionType.RECORD,
+]
+
+def _page_state(driver):
+    """读取模拟页面记录的试卷状态"""
+    return driver.driver.execute_script("return window.__mockState")
+
+def scenario_settings(driver):
+    """
+    配置试卷设置
+
+    Returns:
+        tuple: (添加的题目数, 错误信息或None)
+    """
+    if not configure_paper_settings(driver):
+        return 0, "configure_paper_settings返回失败"
+    # 等待对话框关闭后设置才写入页面状态
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if _page_state(driver)["settings"].get("show_score"):
+            return 0, None
+        time.sleep(0.05)
+    return 0, "第三个功能复选框未被选中"
+
+def scenario_questions(driver, count=21):
+    """
+    按菜单顺序循环添加各种题型，不填写题干
+
+    Returns:
+        tuple: (添加的题目数, 错误信息或None)
+    """
+    question_types = [ALL_TYPES[index % len(ALL_TYPES)] for index in range(count)]
+    added = add_questions(driver, question_types)
+    if added < count:
+        return added, f"只添加了{added}道，共{count}道"
+    actual = [question["type"] for question in _page_state(driver)["questions"]]
+    if actual != question_types:
+        return added, f"页面中的题型与预期不一致: {actual[:5]}..."
+    return added, None
+
+def scenario_import(driver, sections=3, per_section=10, batch_size=8):
+    """
+    导入带题干的题库，包含多个大题，跨越多个批次
+
+    Returns:
+        tuple: (添加的题目数, 错误信息或None)
+    """
+    records = []
+    for section_index in range(sections):
+        for question_index in range(per_section):
+            line = len(records) + 1
+            records.append({
+                "section": f"第{section_index + 1}部分",
+                "type": ALL_TYPES[question_index % len(ALL_TYPES)],
+                "content": f"基准测试题目{line}：" + "题干内容" * 10,
+                "line": line,
+            })
+
+    stats = import_questions(driver, iter_batches(iter(records), batch_size))
+    if stats.mismatches:
+        return stats.questions, f"导入后试卷状态与预期不一致: {stats.mismatches[0]}"
+    if not stats.succeeded:
+        return stats.questions, f"导入在第{stats.failed_record['line']}行失败"
+
+    state = _page_state(driver)
+    names = [section["name"] for section in state["sections"]]
+    expected_names = [f"第{index + 1}部分" for index in range(sections)]
+    if names != expected_names:
+        return stats.questions, f"大题名称与预期不一致: {names}"
+    contents = [question["content"] for question in state["questions"]]
+    if contents != [record["content"] for record in records]:
+        return stats.questions, "页面中的题干与预期不一致"
+    return stats.questions, None
+
+SCENARIOS = {
+    "settings": scenario_settings,
+    "questions": scenario_questions,
+    "import": scenario_import,
+}
+
+def run_scenario(driver, url, name, repeat):
+    """
+    重复运行一个场景，每次重新加载页面，页面加载不计入统计
+
+    Returns:
+        dict: 场景的统计结果，耗时和命令数取各次的中位数
+    """
+    wall_times, commands, ready_times, questions, error = [], [], [], 0, None
+    for _ in range(repeat):
+        if not driver.navigate_to(url):
+            return {"error": "页面加载失败"}
+        ready_times.append(driver.ready_state["seconds"])
+        commands_before = driver.command_count
+        started = time.perf_counter()
+        try:
+            questions, error = SCENARIOS[name](driver)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        wall_times.append(time.perf_counter() - started)
+        commands.append(driver.command_count - commands_before)
+        if error:
+            break
+
+    wall_time = statistics.median(wall_times)
+    command_count = statistics.median(commands)
+    result = {
+        "questions": questions,
+        "wall_time": round(wall_time, 3),
+        "commands": command_count,
+        "questions_per_minute": round(questions / wall_time * 60, 1) if questions and wall_time else None,
+        "commands_per_question": round(command_count / questions, 2) if questions else None,
+        "ready_seconds": round(statistics.median(ready_times), 3),
+    }
+    if error:
+        result["error"] = error
+    return result
+
+def compare(results, baseline, tolerance):
+    """
+    与基准比较
+
+    Args:
+        results (dict): 本次的场景结果
+        baseline (dict): 基准中的场景结果
+        tolerance (float): 容差
+
+    Returns:
+        list: 退化项的说明，没有退化时为空列表
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or result.get("error"):
+            continue
+        checks = [
+            ("wall_time", result["wall_time"], base.get("wall_time"), 1),
+            ("commands_per_question", result["commands_per_question"], base.get("commands_per_question"), 1),
+            ("questions_per_minute", result["questions_per_minute"], base.get("questions_per_minute"), -1),
+        ]
+        for metric, value, base_value, direction in checks:
+            if value is None or not base_value:
+                continue
+            change = (value - base_value) / base_value * direction
+            if change > tolerance:
+                regressions.append(f"{name}.{metric}: {base_value} -> {value}（变差{change:.0%}）")
+    return regressions
+
+def format_results(results):
+    """生成结果表"""
+    lines = [f"{'场景':<12}{'题目':>6}{'耗时(s)':>10}{'命令数':>8}{'题/分钟':>10}{'命令/题':>10}  状态"]
+    for name, result in results.items():
+        def show(value, fmt):
+            return format(value, fmt) if value is not None else "-"
+        lines.append(
+            f"{name:<12}{result.get('questions', 0):>6}{show(result.get('wall_time'), '.2f'):>10}"
+            f"{show(result.get('commands'), '.0f'):>8}{show(result.get('questions_per_minute'), '.1f'):>10}"
+            f"{show(result.get('commands_per_question'), '.2f'):>10}  {result.get('error') or 'OK'}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="在本地模拟页面上运行离线基准测试")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="要运行的场景")
+    parser.add_argument("--pacing", choices=list(PACING_POLICIES), default="throughput", help="操作节奏策略")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景的运行次数，取中位数")
+    parser.add_argument("--latency", type=int, default=50, help="模拟页面界面响应的延迟（毫秒）")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基准文件路径")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许的变差比例")
+    parser.add_argument("--update-baseline", action="store_true", help="将本次结果保存为基准")
+    parser.add_argument("--output", help="将本次结果写入JSON文件")
+    parser.add_argument("--headed", action="store_true", help="显示浏览器窗口，便于调试")
+    args = parser.parse_args()
+
+    server = start_mock_editor()
+    url = paper_create_url(server, args.latency)
+    results = {}
+    try:
+        with ChromeDriver(headless=not args.headed, pacing=args.pacing, isolated=True) as driver:
+            for name in args.scenario:
+                results[name] = run_scenario(driver, url, name, args.repeat)
+    finally:
+        server.shutdown()
+
+    print(format_results(results))
+    report = {"pacing": args.pacing, "latency_ms": args.latency, "scenarios": results, "strategies": strategy_stats(), "logging": logging_stats()}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    failed = [name for name, result in results.items() if result.get("error")]
+    if failed:
+        print(f"场景失败: {', '.join(failed)}")
+        sys.exit(1)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"已更新基准: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        # 没有基准时无法判断是否退化，不能当作通过
+        print(f"基准文件不存在: {args.baseline}，使用 --update-baseline 生成")
+        sys.exit(1)
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if (baseline.get("pacing"), baseline.get("latency_ms")) != (args.pacing, args.latency):
+        print(f"基准使用的参数不同（pacing={baseline.get('pacing')}，latency={baseline.get('latency_ms')}），跳过比较")
+        return
+
+    regressions = compare(results, baseline.get("scenarios", {}), args.tolerance)
+    if regressions:
+        print("性能退化:\n" + "\n".join(f"  {item}" for item in regressions))
+        sys.exit(1)
+    print(f"未发现超过{args.tolerance:.0%}的退化")
+
+if __name__ == "__main__":
+    main()
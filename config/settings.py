@@ -22,10 +22,137 @@ CHROME_BINARY_PATH = None  # Chrome浏览器可执行文件路径，None表示
 # CHROME_BINARY_PATH = "/usr/bin/google-chrome"
 
 # WebDriver设置
-IMPLICIT_WAIT_TIME = 10  # 隐式等待时间（秒）
+IMPLICIT_WAIT_TIME = 0  # 隐式等待时间（秒），0表示关闭；元素等待都使用显式等待，开启后两者叠加会使超时时间翻倍
+PAGE_LOAD_STRATEGY = "eager"  # 页面加载策略：eager在DOM解析完成后返回，由页面就绪检测判断何时可以操作；normal等待所有资源加载完成
+REMOTE_DEBUGGING_PORT = 9222  # 非隔离模式下使用的远程调试端口
+
+# 页面就绪检测设置：访问页面后等待应用挂载、网络空闲且编辑器根元素出现再开始操作，代替固定的随机等待
+READY_TIMEOUT = 30  # 等待页面就绪的超时时间（秒），超时后记录警告并继续
+READY_NETWORK_IDLE_MS = 500  # 没有进行中的请求且持续这么久（毫秒）没有新请求时视为网络空闲
+READY_APP_SELECTOR = "#app"  # Vue应用的挂载元素，页面中没有该元素时不检查应用是否挂载
+READY_ROOT_SELECTORS = ["#paper-id", "#wrap-affix-container .big-questions-aside"]  # 编辑器根元素，任意一个出现即可
+
+# 启动缓存设置：缓存chromedriver和Chrome的路径（Chrome版本变化时失效）以及配置文件列表（用户数据目录修改时失效）
+STARTUP_CACHE_ENABLED = True
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+
+# 隔离模式设置：每个浏览器使用动态分配的调试端口和临时用户数据目录
+ISOLATED_TEMP_DIR = None  # 临时用户数据目录的父目录，None表示使用系统临时目录
+# 复制配置文件时跳过的缓存和锁文件
+ISOLATED_PROFILE_IGNORE = [
+    "Cache", "Code Cache", "GPUCache", "DawnCache", "GrShaderCache", "ShaderCache",
+    "Media Cache", "CacheStorage", "ScriptCache", "Crashpad", "Singleton*", "*.tmp",
+]
+
+# 配置文件快照设置：只复制登录考试星需要的文件到内存盘，多次启动复用，源配置文件的Cookie变化时自动刷新
+PROFILE_SNAPSHOT = False  # 是否默认使用快照启动浏览器，也可以通过命令行参数--snapshot指定
+SNAPSHOT_DIR = None  # 快照的存放目录，None表示Linux下使用/dev/shm，其他系统使用系统临时目录（可以指定内存盘）
+# 快照包含的文件，路径相对于配置文件目录；Local State（Cookie解密密钥所在）总是会复制
+SNAPSHOT_INCLUDE = [
+    "Cookies", "Cookies-journal", "Network/Cookies", "Network/Cookies-journal",
+    "Local Storage", "Preferences", "Secure Preferences",
+]
+
+# 会话状态设置：一次交互式登录后导出Cookie和localStorage（加密保存），工作浏览器不需要配置文件，导入后直接使用
+SESSION_STATE_KEY_FILE = os.path.join(CACHE_DIR, "session_state.key")  # 加密密钥文件，也可以通过环境变量KAOSHIXING_STATE_KEY指定密钥
+SESSION_STATE_MAX_AGE = 12 * 3600  # 会话状态导出后的有效时间（秒），超过后重新登录
+SESSION_COOKIE_DOMAIN = "kaoshixing.com"  # 导出此域名下的Cookie
+SESSION_AUTH_COOKIES = []  # 登录凭证所在的Cookie名称，其中任何一个过期即视为会话过期；为空时只按导出时间判断
+LOGIN_URL_KEYWORDS = ["login", "passport"]  # 页面跳转到包含这些关键字的URL时视为未登录
+LOGIN_TIMEOUT = 300  # 等待手动登录的超时时间（秒）
+
+# 请求过滤设置：通过DevTools协议拦截自动化不需要的资源（图片、字体、统计脚本等），缩短页面加载时间
+# block_types按资源类型拦截（Document、Stylesheet、Image、Media、Font、Script、XHR、Fetch等），
+# block_urls按URL通配符拦截，allow_urls中的URL不受block_types影响（例如登录验证码图片）
+REQUEST_FILTER = None  # 默认使用的过滤配置名称，None表示不过滤，也可以通过命令行参数--request-filter指定
+REQUEST_FILTER_PROFILES = {
+    # 只拦截第三方统计和广告脚本
+    "analytics": {
+        "block_types": [],
+        "block_urls": [
+            "*google-analytics.com*", "*googletagmanager.com*", "*hm.baidu.com*", "*cnzz.com*",
+            "*growingio.com*", "*sensorsdata*", "*doubleclick.net*",
+        ],
+        "allow_urls": [],
+    },
+    # 另外拦截图片、字体和音视频，编辑器只依赖脚本、样式和接口
+    "lean": {
+        "block_types": ["Image", "Font", "Media"],
+        "block_urls": [
+            "*google-analytics.com*", "*googletagmanager.com*", "*hm.baidu.com*", "*cnzz.com*",
+            "*growingio.com*", "*sensorsdata*", "*doubleclick.net*",
+        ],
+        "allow_urls": ["*captcha*", "*verify*"],
+    },
+}
+
+# 操作节奏设置
+# human: 默认模式，每步操作后随机等待，模拟人类操作
+# throughput: 高吞吐模式，去掉固定等待，等到预期的页面状态出现后立即继续
+PACING_MODE = "human"
+THROUGHPUT_WAIT_TIMEOUT = 10  # 高吞吐模式下等待页面状态的超时时间（秒）
+THROUGHPUT_POLL_INTERVAL = 0.05  # 高吞吐模式下检查页面状态的间隔（秒）
+BULK_INPUT_MIN_LENGTH = 100  # 文本达到此长度时一次性写入，不再逐字输入；None表示只在高吞吐模式下一次性写入
+
+# 浏览器会话池设置
+POOL_SIZE = 1  # 保持预热的浏览器数量
+POOL_MAX_JOBS_PER_SESSION = 20  # 每个浏览器最多处理的任务数，超过后重启
+POOL_IDLE_TIMEOUT = 600  # 空闲浏览器的最长保留时间（秒），超过后关闭
+
+# 重试设置：可重试的失败（元素失效、点击被遮挡、定位超时）按抖动的指数退避重试，连续失败的操作方式暂时跳过
+RETRY_MAX_ATTEMPTS = 3  # 每种操作方式的最多尝试次数
+RETRY_BASE_DELAY = 0.2  # 退避的基础时间（秒），第n次重试最多等待基础时间的2^n倍
+RETRY_MAX_DELAY = 2.0  # 单次退避的最长时间（秒）
+CIRCUIT_FAILURE_THRESHOLD = 5  # 一种操作方式连续失败此次数后暂时跳过
+CIRCUIT_RESET_TIMEOUT = 60  # 跳过的时间（秒），之后再试一次，成功则恢复
+
+# 导入日志设置：每一步开始前和完成后写入SQLite日志，中断后重新运行同一题库时核对页面并从第一个未完成的步骤继续
+JOURNAL_ENABLED = True
+JOURNAL_FILE = os.path.join(CACHE_DIR, "build_journal.db")
+
+# 题目去重设置：按试卷（和题库）记录已有题目的内容摘要，导入时跳过已存在的题目
+# 摘要只包含题型和题干，题干相同、选项不同的题目也会被跳过，默认关闭；指定题库名称时自动启用
+DEDUP_ENABLED = False
+DEDUP_INDEX_FILE = os.path.join(CACHE_DIR, "question_index.db")
+DEDUP_LIBRARY = None  # 题库名称，指定时启用去重，同一题库中已有的题目也跳过，也可以通过命令行参数--library指定
+
+# 批次核对设置：每批完成后一次读取整份试卷的大题、题目和设置，与预期结果比较，不一致时停止
+VERIFY_BATCHES = True
+
+# 常驻服务设置：python main.py --daemon 从任务队列中持续领取任务创建试卷
+JOB_QUEUE_FILE = os.path.join(CACHE_DIR, "job_queue.db")
+DAEMON_WORKERS = 2  # 工作进程数量，每个进程保持一个预热的浏览器
+DAEMON_HOST = "127.0.0.1"  # 任务接口监听的地址，只在本机提供
+DAEMON_PORT = 8765  # 任务接口的端口，None表示不提供HTTP接口，只能通过 --submit 提交
+DAEMON_POLL_INTERVAL = 1.0  # 工作进程没有任务时检查队列的间隔（秒）
+DAEMON_REPORT_INTERVAL = 60  # 在日志中输出队列深度、任务耗时和工作进程利用率的间隔（秒）
+DAEMON_MAX_ATTEMPTS = 2  # 每个任务最多尝试的次数，失败未达到次数时重新排队
+
+# 内存管理设置：浏览器使用低内存启动选项；跟踪Chrome进程树的常驻内存和页面的JS堆（需要安装psutil），
+# 超过阈值时在任务之间（浏览器归还会话池时）回收标签页或浏览器，每个任务的内存变化输出到日志
+LOW_MEMORY_MODE = True  # 是否使用低内存启动选项
+RENDERER_PROCESS_LIMIT = 2  # 渲染进程数量上限
+DISK_CACHE_SIZE_MB = 64  # 磁盘缓存上限（MB）
+MEMORY_MONITOR = False  # 是否跟踪内存，也可以通过命令行参数--memory-limit启用
+MEMORY_RSS_LIMIT_MB = 2048  # Chrome进程树常驻内存的阈值（MB）
+MEMORY_JS_HEAP_LIMIT_MB = 768  # 页面JS堆的阈值（MB），None表示不限制
+MEMORY_RECYCLE = "tab"  # 超过阈值时的回收方式：tab在新标签页中重新打开页面，仍超过阈值时重启浏览器；browser直接重启浏览器
+
+# 接口模式设置：登录后直接调用试卷编辑器的后台接口，浏览器只用于登录和核对
+# 接口路径取自试卷编辑器页面发出的XHR请求，站点更新后需要根据实际请求调整
+API_BASE_URL = "https://v.kaoshixing.com"
+API_CREATE_PAPER_PATH = "/admin/paper/api/paper/create"
+API_ADD_SECTION_PATH = "/admin/paper/api/paper/{paper_id}/section/add"
+API_ADD_QUESTION_PATH = "/admin/paper/api/paper/{paper_id}/question/add"
+API_PAPER_VIEW_URL = "https://v.kaoshixing.com/admin/paper/#/edit?paperId={paper_id}"  # 创建完成后在浏览器中核对的页面
+API_MAX_CONCURRENCY = 4  # 同时发送的请求数
+API_POOL_SIZE = 8  # 每个主机保持的长连接数
+API_TIMEOUT = 15  # 单个请求的超时时间（秒）
+API_MAX_RETRIES = 3  # 连接失败的重试次数（读取超时和5xx响应不重试，避免重复创建）
 
 # 日志设置
 LOG_LEVEL = "INFO"  # 日志级别：DEBUG, INFO, WARNING, ERROR, CRITICAL
 LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "app.log")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S" 
\ No newline at end of file
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_JSON = False  # 日志文件是否使用JSON Lines格式（附带job、worker、step字段），也可以通过命令行参数--log-json指定 
\ No newline at end of file
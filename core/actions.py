@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+批量页面操作模块，将多个DOM操作编译为一次execute_async_script调用，减少与chromedriver的往返
+"""
+
+# 等待类步骤的默认超时时间（毫秒）
+DEFAULT_STEP_TIMEOUT_MS = 10000
+
+# 页面内等待条件的检查间隔（毫秒）
+STEP_POLL_INTERVAL_MS = 25
+
+# 整批操作的最短超时时间和在各步骤超时时间之和以外预留的时间（秒）
+BATCH_MIN_TIMEOUT = 60
+BATCH_TIMEOUT_MARGIN = 10
+
+# 向输入框或富文本编辑器写入文本并触发input/change事件，返回写入后读回的值
+# append为true时追加到已有内容之后
+FILL_TEXT_FUNCTION = """
+function (el, text, append) {
+    if (el.tagName === 'IFRAME') { el = el.contentDocument.body; }
+    var tag = el.tagName;
+    if (tag === 'INPUT' || tag === 'TEXTAREA') {
+        var proto = tag === 'INPUT' ? HTMLInputElement.prototype : HTMLTextAreaElement.prototype;
+        var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+        el.focus();
+        setter.call(el, append ? el.value + text : text);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        el.blur();
+        return el.value;
+    }
+    el.focus();
+    el.innerText = append ? el.innerText.replace(/\\n$/, '') + text : text;
+    el.dispatchEvent(new InputEvent('input', { bubbles: true, inputType: 'insertText', data: text }));
+    el.dispatchEvent(new KeyboardEvent('keyup', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    el.blur();
+    return el.innerText.replace(/\\n$/, '');
+}
+"""
+
+# 批量写入文本，等页面框架处理完事件后再读回一次，只产生一次WebDriver往返
+BULK_FILL_SCRIPT = """
+var el = arguments[0], text = arguments[1], append = arguments[2], done = arguments[arguments.length - 1];
+var fill = __FILL_TEXT_FUNCTION__;
+try { fill(el, text, append); } catch (e) { done({ error: String(e && e.message || e) }); return; }
+setTimeout(function () {
+    var target = el.tagName === 'IFRAME' ? el.contentDocument.body : el;
+    var value = (target.tagName === 'INPUT' || target.tagName === 'TEXTAREA') ? target.value : target.innerText;
+    done({ value: value });
+}, 0);
+""".replace("__FILL_TEXT_FUNCTION__", FILL_TEXT_FUNCTION.strip())
+
+# 在页面中按顺序执行步骤，每一步返回 {step, label, ok, elapsed_ms, value, error}
+# 某一步失败后，后续步骤标记为skipped，不再执行
+BATCH_RUNNER_SCRIPT = """
+var steps = arguments[0], pollMs = arguments[1], done = arguments[arguments.length - 1];
+var vars = {}, results = [];
+
+function query(chain) {
+    for (var i = 0; i < chain.length; i++) {
+        var kind = chain[i][0], value = chain[i][1], nodes = [];
+        if (kind === 'xpath') {
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (var j = 0; j < snapshot.snapshotLength; j++) { nodes.push(snapshot.snapshotItem(j)); }
+        } else {
+            nodes = Array.from(document.querySelectorAll(value));
+        }
+        if (nodes.length) { return nodes; }
+    }
+    return [];
+}
+function isVisible(el) { return el.offsetParent !== null && !el.disabled; }
+function resolve(target) {
+    return query(target.chain).filter(function (el) {
+        if (target.visible && !isVisible(el)) { return false; }
+        if (target.text && (el.textContent || '').trim().indexOf(target.text) === -1) { return false; }
+        return true;
+    });
+}
+function pick(nodes, index) {
+    if (!nodes.length) { return null; }
+    return nodes[index < 0 ? nodes.length + index : index] || null;
+}
+function waitFor(predicate, timeoutMs) {
+    return new Promise(function (resolveWait, rejectWait) {
+        var started = Date.now();
+        (function check() {
+            var value;
+            try { value = predicate(); } catch (e) { rejectWait(e); return; }
+            if (value) { resolveWait(value); return; }
+            if (Date.now() - started >= timeoutMs) { rejectWait(new Error('timeout after ' + timeoutMs + 'ms')); return; }
+            setTimeout(check, pollMs);
+        })();
+    });
+}
+// 富文本编辑器读回时换行（CRLF）和首尾空白可能被规整，与ChromeDriver.fill_text一样比较时忽略这些差异
+function normalizeText(text) { return String(text).replace(/\\s+/g, ' ').trim(); }
+function click(el) {
+    el.scrollIntoView({ block: 'center' });
+    el.dispatchEvent(new MouseEvent('mouseenter', { bubbles: true, cancelable: true, view: window }));
+    el.click();
+}
+var FILL_TEXT = __FILL_TEXT_FUNCTION__;
+var ops = {
+    click: function (step) {
+        return waitFor(function () { return pick(resolve(step.target), step.index); }, step.timeout_ms)
+            .then(function (el) { click(el); return true; });
+    },
+    wait_visible: function (step) {
+        return waitFor(function () { return pick(resolve(step.target), step.index); }, step.timeout_ms)
+            .then(function () { return true; });
+    },
+    wait_hidden: function (step) {
+        return waitFor(function () {
+            return query(step.target.chain).every(function (el) { return !isVisible(el); });
+        }, step.timeout_ms);
+    },
+    count: function (step) {
+        vars[step.key] = resolve(step.target).length;
+        return Promise.resolve(vars[step.key]);
+    },
+    wait_for_more: function (step) {
+        var before = vars[step.key] || 0;
+        return waitFor(function () {
+            var now = resolve(step.target).length;
+            return now > before ? now : 0;
+        }, step.timeout_ms).then(function (now) { vars[step.key] = now; return now; });
+    },
+    fill_text: function (step) {
+        return waitFor(function () { return pick(resolve(step.target), step.index); }, step.timeout_ms)
+            .then(function (el) {
+                var committed = FILL_TEXT(el, step.value);
+                if (normalizeText(committed) !== normalizeText(step.value)) {
+                    throw new Error('read-back mismatch: ' + committed.slice(0, 50));
+                }
+                return committed.length;
+            });
+    }
+};
+
+var index = 0;
+function next() {
+    if (index >= steps.length) { done(results); return; }
+    var step = steps[index], started = Date.now();
+    index += 1;
+    Promise.resolve().then(function () { return ops[step.op](step); }).then(function (value) {
+        results.push({ step: step.op, label: step.label, ok: true, elapsed_ms: Date.now() - started, value: value });
+        next();
+    }, function (error) {
+        results.push({ step: step.op, label: step.label, ok: false, elapsed_ms: Date.now() - started, error: String(error && error.message || error) });
+        for (var k = index; k < steps.length; k++) {
+            results.push({ step: steps[k].op, label: steps[k].label, ok: false, skipped: true });
+        }
+        done(results);
+    });
+}
+next();
+""".replace("__FILL_TEXT_FUNCTION__", FILL_TEXT_FUNCTION.strip())
+
+def _selector_chain(selectors):
+    """
+    将选择器转换为脚本使用的格式
+
+    Args:
+        selectors: CSS选择器字符串，或(By.CSS_SELECTOR/By.XPATH, 选择器)列表
+
+    Returns:
+        list: [[类型, 选择器], ...]
+    """
+    if isinstance(selectors, str):
+        return [["css", selectors]]
+    # By.XPATH的值就是"xpath"，这里直接比较字符串，不必为此导入selenium
+    return [["xpath" if by == "xpath" else "css", value] for by, value in selectors]
+
+class ActionBatch:
+    """
+    批量页面操作，按添加顺序在页面中执行
+
+    用法：
+        batch = ActionBatch().click(trigger).click(item, text="问答题")
+        results = driver.run_batch(batch)
+    """
+
+    def __init__(self, timeout_ms=DEFAULT_STEP_TIMEOUT_MS):
+        """
+        Args:
+            timeout_ms (int): 等待类步骤的默认超时时间（毫秒）
+        """
+        self.timeout_ms = timeout_ms
+        self.steps = []
+
+    def __len__(self):
+        return len(self.steps)
+
+    def script_timeout(self):
+        """整批操作的超时时间（秒），按各步骤的超时时间之和计算，不少于BATCH_MIN_TIMEOUT"""
+        return max(BATCH_MIN_TIMEOUT, sum(step["timeout_ms"] for step in self.steps) / 1000 + BATCH_TIMEOUT_MARGIN)
+
+    def _add(self, op, selectors, label=None, text=None, visible=True, index=0, **extra):
+        """添加一个步骤"""
+        step = {
+            "op": op,
+            "label": label or op,
+            "target": {"chain": _selector_chain(selectors), "text": text, "visible": visible},
+            "index": index,
+            "timeout_ms": extra.pop("timeout_ms", None) or self.timeout_ms,
+        }
+        step.update(extra)
+        self.steps.append(step)
+        return self
+
+    def click(self, selectors, text=None, label=None, index=0):
+        """等待元素可见后点击，text用于按文本选择元素"""
+        return self._add("click", selectors, label, text, index=index)
+
+    def open_dropdown(self, trigger, menu_item, label=None):
+        """点击下拉按钮并等待菜单项出现"""
+        self._add("click", trigger, label or "open_dropdown", visible=False)
+        return self._add("wait_visible", menu_item, label or "open_dropdown")
+
+    def pick_item(self, menu_item, text, label=None):
+        """按文本点击菜单项，并等待菜单收起"""
+        self._add("click", menu_item, label or f"pick_item:{text}", text)
+        return self._add("wait_hidden", menu_item, label or f"pick_item:{text}")
+
+    def wait_visible(self, selectors, text=None, label=None):
+        """等待元素可见"""
+        return self._add("wait_visible", selectors, label, text)
+
+    def wait_hidden(self, selectors, label=None):
+        """等待匹配的元素全部隐藏"""
+        return self._add("wait_hidden", selectors, label)
+
+    def count(self, selectors, key, label=None):
+        """记录当前匹配的元素数量，供wait_for_more使用"""
+        return self._add("count", selectors, label, visible=False, key=key)
+
+    def wait_for_more(self, selectors, key, label=None, timeout_ms=None):
+        """等待匹配的元素数量超过上次count记录的数量，例如等待新的编辑区出现"""
+        return self._add("wait_for_more", selectors, label, visible=False, key=key, timeout_ms=timeout_ms)
+
+    def fill_text(self, selectors, text, index=-1, label=None):
+        """向输入框或富文本编辑器写入文本，默认写入最后一个匹配的元素"""
+        return self._add("fill_text", selectors, label, visible=False, index=index, value=text)
+
+def batch_succeeded(results):
+    """
+    判断批量操作是否全部成功
+
+    Args:
+        results (list): ChromeDriver.run_batch的返回值
+
+    Returns:
+        bool: 全部步骤成功时返回True
+    """
+    return bool(results) and all(result.get("ok") for result in results)
+
+def first_failure(results):
+    """
+    返回第一个失败的步骤
+
+    Args:
+        results (list): ChromeDriver.run_batch的返回值
+
+    Returns:
+        dict: 失败步骤的结果，全部成功时返回None
+    """
+    for result in results:
+        if not result.get("ok"):
+            return result
+    return None
@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基于asyncio的Chrome DevTools协议驱动，一个浏览器进程中可以同时操作多个标签页
+
+与ChromeDriver不同，这里不经过chromedriver，直接通过websocket向浏览器发送DevTools命令。
+页面脚本与ChromeDriver共用，execute_script风格的脚本（使用arguments和return）可以直接执行。
+"""
+
+import os
+import json
+import shutil
+import asyncio
+import platform
+import itertools
+import subprocess
+import tempfile
+import urllib.request
+from config.settings import CHROME_BINARY_PATH, ISOLATED_TEMP_DIR
+from core.actions import BATCH_RUNNER_SCRIPT, STEP_POLL_INTERVAL_MS
+from core.driver import find_free_port
+from core.profile_manager import ProfileManager
+from utils.exceptions import BrowserError, ConfigError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 单个DevTools命令的超时时间（秒）
+CDP_COMMAND_TIMEOUT = 30
+
+# 等待浏览器开放调试端口的超时时间（秒）
+CDP_STARTUP_TIMEOUT = 20
+
+# 各系统下Chrome的常见安装路径
+_CHROME_CANDIDATES = {
+    "Windows": [
+        os.path.join(os.environ.get("PROGRAMFILES", r"C:\Program Files"), "Google", "Chrome", "Application", "chrome.exe"),
+        os.path.join(os.environ.get("PROGRAMFILES(X86)", r"C:\Program Files (x86)"), "Google", "Chrome", "Application", "chrome.exe"),
+        os.path.join(os.environ.get("LOCALAPPDATA", ""), "Google", "Chrome", "Application", "chrome.exe"),
+    ],
+    "Darwin": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"],
+    "Linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+}
+
+def find_chrome_binary():
+    """
+    查找Chrome可执行文件
+
+    Returns:
+        str: Chrome可执行文件路径
+
+    Raises:
+        BrowserError: 未找到Chrome
+    """
+    if CHROME_BINARY_PATH and os.path.exists(CHROME_BINARY_PATH):
+        return CHROME_BINARY_PATH
+    for candidate in _CHROME_CANDIDATES.get(platform.system(), []):
+        path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+        if path and os.path.exists(path):
+            return path
+    raise BrowserError("未找到Chrome浏览器，请在config/settings.py中设置CHROME_BINARY_PATH")
+
+class CdpConnection:
+    """DevTools协议websocket连接，负责命令的请求/响应匹配和事件分发"""
+
+    def __init__(self, websocket):
+        """
+        Args:
+            websocket: 已建立的websocket连接
+        """
+        self._websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = []
+        self._listeners = []
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, url):
+        """
+        连接到DevTools websocket地址
+
+        Args:
+            url (str): webSocketDebuggerUrl
+
+        Returns:
+            CdpConnection: 连接实例
+        """
+        try:
+            import websockets
+        except ImportError:
+            raise ConfigError("DevTools协议驱动需要安装websockets: pip install websockets")
+        websocket = await websockets.connect(url, max_size=None, ping_interval=None)
+        return cls(websocket)
+
+    async def send(self, method, params=None, session_id=None, timeout=CDP_COMMAND_TIMEOUT):
+        """
+        发送命令并等待响应
+
+        Args:
+            method (str): 命令名称，例如"Page.navigate"
+            params (dict): 命令参数
+            session_id (str): 标签页会话ID，None表示发送给浏览器
+            timeout (float): 超时时间（秒）
+
+        Returns:
+            dict: 命令返回的result
+
+        Raises:
+            BrowserError: 命令返回错误或连接已断开
+        """
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self._websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def wait_event(self, method, session_id=None):
+        """
+        注册事件等待，需要在触发事件的命令之前调用
+
+        Args:
+            method (str): 事件名称，例如"Page.loadEventFired"
+            session_id (str): 只接收该标签页的事件
+
+        Returns:
+            asyncio.Future: 事件发生时返回事件参数
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((method, session_id, future))
+        return future
+
+    def subscribe(self, method, callback):
+        """
+        持续接收某个事件，回调在读取消息的协程中同步调用，需要发送命令时自行创建任务
+
+        Args:
+            method (str): 事件名称，例如"Network.loadingFinished"
+            callback: 回调函数，参数为(事件参数, sessionId)
+        """
+        self._listeners.append((method, callback))
+
+    async def _read_loop(self):
+        """读取websocket消息，分发命令响应和事件"""
+        error = BrowserError("DevTools连接已断开")
+        try:
+            async for raw in self._websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(BrowserError(f"DevTools命令失败: {message['error'].get('message')}"))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+
+                for method, callback in self._listeners:
+                    if method == message.get("method"):
+                        try:
+                            callback(message.get("params", {}), message.get("sessionId"))
+                        except Exception as e:
+                            logger.warning(f"处理DevTools事件{method}失败: {str(e)}")
+                for waiter in list(self._waiters):
+                    method, session_id, future = waiter
+                    if future.done():
+                        self._waiters.remove(waiter)
+                    elif method == message.get("method") and session_id in (None, message.get("sessionId")):
+                        future.set_result(message.get("params", {}))
+                        self._waiters.remove(waiter)
+        except Exception as e:
+            error = BrowserError(f"DevTools连接已断开: {str(e)}")
+        finally:
+            for future in list(self._pending.values()) + [waiter[2] for waiter in self._waiters]:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def close(self):
+        """关闭连接"""
+        self._reader.cancel()
+        await self._websocket.close()
+
+class AsyncTab:
+    """浏览器中的一个标签页"""
+
+    def __init__(self, connection, target_id, session_id):
+        """
+        Args:
+            connection (CdpConnection): 浏览器连接
+            target_id (str): 标签页的targetId
+            session_id (str): 附加到标签页后得到的sessionId
+        """
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.page_generation = 0
+
+    async def send(self, method, params=None, timeout=CDP_COMMAND_TIMEOUT):
+        """向该标签页发送DevTools命令"""
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    async def navigate(self, url, timeout=CDP_COMMAND_TIMEOUT):
+        """
+        打开URL并等待页面load事件
+
+        Args:
+            url (str): 要访问的URL
+            timeout (float): 超时时间（秒）
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            logger.info(f"[标签页 {self.target_id[:8]}] 正在访问URL: {url}")
+            loaded = self.connection.wait_event("Page.loadEventFired", self.session_id)
+            result = await self.send("Page.navigate", {"url": url})
+            if result.get("errorText"):
+                loaded.cancel()
+                raise BrowserError(result["errorText"])
+            await asyncio.wait_for(loaded, timeout)
+            self.page_generation += 1
+            return True
+        except Exception as e:
+            logger.error(f"[标签页 {self.target_id[:8]}] 访问URL失败: {str(e)}")
+            return False
+
+    async def evaluate(self, expression, await_promise=True, timeout=CDP_COMMAND_TIMEOUT):
+        """
+        在页面中执行表达式
+
+        Args:
+            expression (str): JavaScript表达式
+            await_promise (bool): 表达式返回Promise时是否等待其完成
+            timeout (float): 超时时间（秒）
+
+        Returns:
+            表达式的值（按JSON返回）
+
+        Raises:
+            BrowserError: 脚本抛出异常
+        """
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "awaitPromise": await_promise,
+            "returnByValue": True,
+        }, timeout)
+        if result.get("exceptionDetails"):
+            details = result["exceptionDetails"]
+            message = details.get("exception", {}).get("description") or details.get("text")
+            raise BrowserError(f"页面脚本执行失败: {message}")
+        return result.get("result", {}).get("value")
+
+    async def execute_script(self, script, *args):
+        """执行execute_script风格的脚本（通过arguments取参数，return返回结果）"""
+        expression = "(function () {%s}).apply(null, %s)" % (script, json.dumps(args))
+        return await self.evaluate(expression)
+
+    async def execute_async_script(self, script, *args, timeout=CDP_COMMAND_TIMEOUT):
+        """执行execute_async_script风格的脚本（最后一个参数为完成回调）"""
+        expression = (
+            "new Promise(function (done) { var args = %s; args.push(done); (function () {%s}).apply(null, args); })"
+            % (json.dumps(args), script)
+        )
+        return await self.evaluate(expression, timeout=timeout)
+
+    async def run_batch(self, batch, timeout=None):
+        """
+        在页面中一次性执行批量操作，与ChromeDriver.run_batch返回相同格式的结果
+
+        Args:
+            batch (ActionBatch): 批量操作
+            timeout (float): 整批操作的超时时间（秒），None表示按各步骤的超时时间之和计算
+
+        Returns:
+            list: 每个步骤的结果
+        """
+        if not len(batch):
+            return []
+        if timeout is None:
+            timeout = batch.script_timeout()
+        return await self.execute_async_script(
+            BATCH_RUNNER_SCRIPT, batch.steps, STEP_POLL_INTERVAL_MS, timeout=timeout
+        )
+
+    async def close(self):
+        """关闭标签页"""
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+        except BrowserError as e:
+            logger.warning(f"关闭标签页失败: {str(e)}")
+
+class AsyncChromeBrowser:
+    """通过DevTools协议控制的Chrome浏览器，使用临时用户数据目录和动态分配的调试端口"""
+
+    def __init__(self, profile_name=None, headless=False):
+        """
+        Args:
+            profile_name (str): 用于复制登录状态的Chrome用户配置文件名称（可选）
+            headless (bool): 是否以无头模式运行
+        """
+        self.profile_name = profile_name
+        self.headless = headless
+        self.debugging_port = None
+        self.connection = None
+        self._process = None
+        self._user_data_dir = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _launch_args(self):
+        """浏览器启动参数"""
+        args = [
+            f"--remote-debugging-port={self.debugging_port}",
+            f"--user-data-dir={self._user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-background-networking",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--disable-extensions",
+            "--disable-popup-blocking",
+            "--disable-blink-features=AutomationControlled",
+            "--password-store=basic",
+            # 多个标签页同时操作，避免后台标签页的定时器被节流
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+            "--disable-backgrounding-occluded-windows",
+        ]
+        if self.profile_name:
+            args.append(f"--profile-directory={self.profile_name}")
+        if self.headless:
+            args.append("--headless=new")
+        return args
+
+    async def _wait_for_devtools(self):
+        """等待浏览器开放调试端口，返回浏览器级别的websocket地址"""
+        url = f"http://127.0.0.1:{self.debugging_port}/json/version"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CDP_STARTUP_TIMEOUT
+        while loop.time() < deadline:
+            if self._process.returncode is not None:
+                raise BrowserError(f"Chrome进程已退出，返回码: {self._process.returncode}")
+            try:
+                body = await loop.run_in_executor(None, lambda: urllib.request.urlopen(url, timeout=1).read())
+                return json.loads(body)["webSocketDebuggerUrl"]
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise BrowserError(f"{CDP_STARTUP_TIMEOUT}秒内未能连接到Chrome调试端口")
+
+    async def start(self):
+        """启动浏览器并建立DevTools连接"""
+        self._user_data_dir = tempfile.mkdtemp(prefix="kaoshixing-cdp-", dir=ISOLATED_TEMP_DIR)
+        try:
+            if self.profile_name:
+                ProfileManager().seed_user_data_dir(self.profile_name, self._user_data_dir)
+            self.debugging_port = find_free_port()
+            self._process = await asyncio.create_subprocess_exec(
+                find_chrome_binary(), *self._launch_args(),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            self.connection = await CdpConnection.connect(await self._wait_for_devtools())
+            logger.info(f"Chrome浏览器启动成功（DevTools端口 {self.debugging_port}）")
+        except Exception as e:
+            logger.error(f"启动Chrome浏览器失败: {str(e)}")
+            await self.close()
+            raise
+
+    async def new_tab(self, url=None):
+        """
+        打开新标签页
+
+        Args:
+            url (str): 打开后访问的URL（可选）
+
+        Returns:
+            AsyncTab: 新标签页
+        """
+        target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.connection.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = AsyncTab(self.connection, target["targetId"], attached["sessionId"])
+        await tab.send("Page.enable")
+        await tab.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if url and not await tab.navigate(url):
+            raise BrowserError(f"新标签页无法打开页面: {url}")
+        return tab
+
+    async def close(self):
+        """关闭浏览器并删除临时用户数据目录"""
+        if self.connection:
+            try:
+                await self.connection.send("Browser.close", timeout=5)
+            except Exception:
+                pass
+            await self.connection.close()
+            self.connection = None
+        if self._process and self._process.returncode is None:
+            self._process.terminate()
+            try:
+                await asyncio.wait_for(self._process.wait(), 10)
+            except asyncio.TimeoutError:
+                self._process.kill()
+        self._process = None
+        if self._user_data_dir:
+            shutil.rmtree(self._user_data_dir, ignore_errors=True)
+            self._user_data_dir = None
+        logger.info("Chrome浏览器已关闭")
@@ -3,40 +3,190 @@
 
 """
 WebDriver管理模块，负责Chrome浏览器的启动和控制
+
+selenium在第一次需要浏览器时才导入，不启动浏览器的流程（参数校验、题库解析等）不承担导入开销。
 """
 
 import os
 import time
 import random
+import shutil
+import socket
 import platform
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config.settings import CHROME_BINARY_PATH, IMPLICIT_WAIT_TIME
+import tempfile
+from config.settings import (
+    CHROME_BINARY_PATH, IMPLICIT_WAIT_TIME, PAGE_LOAD_STRATEGY, PACING_MODE,
+    THROUGHPUT_WAIT_TIMEOUT, THROUGHPUT_POLL_INTERVAL, BULK_INPUT_MIN_LENGTH,
+    REMOTE_DEBUGGING_PORT, ISOLATED_TEMP_DIR, PROFILE_SNAPSHOT, REQUEST_FILTER,
+    LOW_MEMORY_MODE, RENDERER_PROCESS_LIMIT, DISK_CACHE_SIZE_MB, MEMORY_MONITOR, MEMORY_RSS_LIMIT_MB,
+)
+from core.profile_manager import ProfileManager, SNAPSHOT_META_FILE, BROWSER_LOCK_FILES
+from core.startup_cache import resolve_driver_path, invalidate_driver_path
+from core.session_state import apply_session_state, is_logged_in
+from core.readiness import install_activity_hook, wait_until_ready
+from core.waits import PageCondition, WAIT_SCRIPT, FALLBACK_CHECK_INTERVAL_MS, DEFAULT_WAIT_TIMEOUT, element_visible
+from core.actions import BATCH_RUNNER_SCRIPT, BULK_FILL_SCRIPT, STEP_POLL_INTERVAL_MS
+from utils.exceptions import ConfigError
+from utils.tracing import tracer, traced, KIND_SLEEP, KIND_WAIT, KIND_WEBDRIVER
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+class HumanPacing:
+    """默认节奏策略：每步操作后随机等待，并随机滚动页面，模拟人类操作"""
+    
+    name = "human"
+    human_gestures = True
+    bulk_input = False
+    
+    def sleep(self, min_seconds, max_seconds):
+        """
+        随机等待一段时间
+        
+        Args:
+            min_seconds (float): 最小等待时间（秒）
+            max_seconds (float): 最大等待时间（秒）
+        """
+        seconds = random.uniform(min_seconds, max_seconds)
+        with tracer.span("sleep", KIND_SLEEP, seconds=round(seconds, 3)):
+            time.sleep(seconds)
+        
+    def pause(self, driver, min_seconds, max_seconds, until=None):
+        """
+        操作之间的停顿，人类模式下忽略until条件，只做随机等待
+        
+        Args:
+            driver: selenium WebDriver实例
+            min_seconds (float): 最小等待时间（秒）
+            max_seconds (float): 最大等待时间（秒）
+            until: 预期的页面状态，expected_conditions条件
+        """
+        self.sleep(min_seconds, max_seconds)
+        
+class ThroughputPacing:
+    """高吞吐节奏策略：去掉固定等待，预期的页面状态出现后立即继续"""
+    
+    name = "throughput"
+    human_gestures = False
+    bulk_input = True
+    
+    def __init__(self, timeout=THROUGHPUT_WAIT_TIMEOUT, poll_interval=THROUGHPUT_POLL_INTERVAL):
+        """
+        Args:
+            timeout (float): 等待页面状态的超时时间（秒）
+            poll_interval (float): 检查页面状态的间隔（秒）
+        """
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        
+    def sleep(self, min_seconds, max_seconds):
+        """高吞吐模式不做固定等待"""
+        pass
+        
+    def pause(self, driver, min_seconds, max_seconds, until=None):
+        """
+        等待预期的页面状态出现，没有指定条件时立即返回
+        
+        Args:
+            driver: selenium WebDriver实例
+            min_seconds (float): 人类模式下的最小等待时间（秒），此处忽略
+            max_seconds (float): 人类模式下的最大等待时间（秒），此处忽略
+            until: 预期的页面状态，expected_conditions条件
+            
+        Returns:
+            条件的返回值，没有指定条件时返回None
+        """
+        if until is None:
+            return None
+        from selenium.webdriver.support.ui import WebDriverWait
+        with tracer.span(f"wait:{type(until).__name__}", KIND_WAIT):
+            return WebDriverWait(driver, self.timeout, poll_frequency=self.poll_interval).until(until)
+        
+# 可选的节奏策略，键为配置中使用的名称
+PACING_POLICIES = {
+    HumanPacing.name: HumanPacing,
+    ThroughputPacing.name: ThroughputPacing,
+}
+
+def get_pacing_policy(pacing=None):
+    """
+    获取节奏策略实例
+    
+    Args:
+        pacing: 策略名称或策略实例，None表示使用配置中的PACING_MODE
+        
+    Returns:
+        节奏策略实例
+        
+    Raises:
+        ConfigError: 未知的策略名称
+    """
+    if pacing is None:
+        pacing = PACING_MODE
+    if not isinstance(pacing, str):
+        return pacing
+    policy_class = PACING_POLICIES.get(pacing)
+    if policy_class is None:
+        raise ConfigError(f"未知的节奏策略: {pacing}，可选: {', '.join(PACING_POLICIES)}")
+    return policy_class()
+
+def find_free_port():
+    """
+    向操作系统申请一个空闲的本地端口
+    
+    Returns:
+        int: 端口号
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
 class ChromeDriver:
     """Chrome WebDriver管理类"""
     
-    def __init__(self, profile_path=None, headless=False):
+    def __init__(self, profile_path=None, headless=False, pacing=None, isolated=False, snapshot=None,
+                 session_state=None, request_filter=None, memory_limit=None):
         """
         初始化Chrome WebDriver
         
         Args:
             profile_path (str): Chrome用户配置文件名称
             headless (bool): 是否以无头模式运行
+            pacing: 节奏策略名称（human/throughput）或策略实例，None表示使用配置
+            isolated (bool): 是否使用隔离模式，隔离模式下使用动态分配的调试端口和
+                由配置文件复制而来的临时用户数据目录，可以同时运行多个浏览器
+            snapshot (bool): 是否使用配置文件的精简快照（只含Cookie、Local Storage和Preferences），
+                None表示使用配置中的PROFILE_SNAPSHOT；隔离模式下从快照复制临时用户数据目录
+            session_state (dict): 启动后导入的会话状态（Cookie和localStorage），由core.session_state导出，
+                通常配合隔离模式、不指定配置文件使用
+            request_filter: 请求过滤配置名称或配置字典（见core.request_filter），None表示使用配置中的REQUEST_FILTER，
+                False表示不过滤
+            memory_limit (float): Chrome进程树常驻内存的阈值（MB），超过时在任务之间回收标签页或浏览器（需要安装psutil），
+                None表示使用配置（MEMORY_MONITOR为True时使用MEMORY_RSS_LIMIT_MB），False表示不跟踪内存
         """
         self.profile_name = profile_path
         self.headless = headless
+        self.pacing = get_pacing_policy(pacing)
+        self.isolated = isolated
+        self.snapshot = PROFILE_SNAPSHOT if snapshot is None else snapshot
+        self.session_state = session_state
+        self.session_expired = False  # 导入的会话状态是否已被网站判定为失效
+        self.request_filter_profile = REQUEST_FILTER if request_filter is None else request_filter
+        self.request_filter = None  # 启动后生效的RequestFilter实例
+        if memory_limit is None:
+            memory_limit = MEMORY_RSS_LIMIT_MB if MEMORY_MONITOR else False
+        self.memory_limit = memory_limit
+        self.memory = None  # 跟踪内存时的MemoryGovernor实例，浏览器重启后继续使用
         self.driver = None
+        self.debugging_port = None
+        self.page_generation = 0  # 页面加载次数，页面相关的缓存据此失效
+        self.ready_state = None  # 最近一次访问页面时的就绪检测结果
+        self.command_count = 0  # 已发送的WebDriver命令数
+        self._script_timeout = None  # 当前会话的异步脚本超时时间（秒），相同时不再重复设置
+        self.startup_timings = {}  # 启动各阶段的耗时（秒）
+        self.first_command_at = None  # 第一个WebDriver命令完成的时间，time.perf_counter()
         self.user_data_dir = self._get_chrome_user_data_dir()
+        self._temp_user_data_dir = None
         
     def _get_chrome_user_data_dir(self):
         """
@@ -72,15 +222,67 @@ class ChromeDriver:
         """上下文管理器退出，关闭浏览器"""
         self.quit()
         
+    def _prepare_isolated_user_data_dir(self):
+        """
+        创建隔离模式使用的临时用户数据目录，指定了配置文件时从配置文件复制
+        
+        Returns:
+            str: 临时用户数据目录路径
+        """
+        temp_dir = tempfile.mkdtemp(prefix="kaoshixing-", dir=ISOLATED_TEMP_DIR)
+        self._temp_user_data_dir = temp_dir
+        if self.profile_name and self.snapshot:
+            snapshot_dir = ProfileManager().snapshot_profile(self.profile_name)
+            shutil.copytree(
+                snapshot_dir, temp_dir, dirs_exist_ok=True,
+                ignore=shutil.ignore_patterns(SNAPSHOT_META_FILE, *BROWSER_LOCK_FILES),
+            )
+        elif self.profile_name:
+            ProfileManager().seed_user_data_dir(self.profile_name, temp_dir)
+        return temp_dir
+        
+    def _cleanup_isolated_user_data_dir(self):
+        """删除隔离模式的临时用户数据目录"""
+        if self._temp_user_data_dir:
+            shutil.rmtree(self._temp_user_data_dir, ignore_errors=True)
+            self._temp_user_data_dir = None
+            
     def start(self):
         """启动Chrome浏览器"""
+        started = time.perf_counter()
+        from selenium import webdriver
+        from selenium.common.exceptions import SessionNotCreatedException
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
+        # 启动浏览器之前检查psutil，未安装时不启动浏览器
+        if self.memory_limit and self.memory is None:
+            from core.memory import MemoryGovernor
+            self.memory = MemoryGovernor(self, rss_limit_mb=self.memory_limit)
+        
         options = Options()
+        # DOM解析完成后即返回，页面何时可以操作由就绪检测判断
+        options.page_load_strategy = PAGE_LOAD_STRATEGY
         
+        # 隔离模式使用临时用户数据目录和动态分配的调试端口
+        user_data_dir = self.user_data_dir
+        if self.isolated:
+            user_data_dir = self._prepare_isolated_user_data_dir()
+            self.debugging_port = find_free_port()
+            logger.info(f"隔离模式: 调试端口 {self.debugging_port}，用户数据目录 {user_data_dir}")
+        else:
+            self.debugging_port = REMOTE_DEBUGGING_PORT
+            # 快照模式使用精简的用户数据目录，原配置文件不会被浏览器读取或锁定
+            if self.snapshot and self.profile_name:
+                user_data_dir = ProfileManager().snapshot_profile(self.profile_name)
+            
         # 如果指定了用户数据目录和配置文件名称
-        if self.user_data_dir and self.profile_name:
+        if user_data_dir and self.profile_name:
             logger.info(f"使用Chrome用户配置文件: {self.profile_name}")
-            options.add_argument(f"user-data-dir={self.user_data_dir}")
+            options.add_argument(f"user-data-dir={user_data_dir}")
             options.add_argument(f"--profile-directory={self.profile_name}")
+        elif self.isolated:
+            options.add_argument(f"user-data-dir={user_data_dir}")
         
         # 设置Chrome二进制文件路径（如果指定）
         if CHROME_BINARY_PATH and os.path.exists(CHROME_BINARY_PATH):
@@ -99,7 +301,7 @@ class ChromeDriver:
         options.add_argument("--start-maximized")
         
         # 添加解决Chrome崩溃的选项
-        options.add_argument("--remote-debugging-port=9222")  # 启用远程调试端口
+        options.add_argument(f"--remote-debugging-port={self.debugging_port}")  # 启用远程调试端口
         options.add_argument("--disable-background-networking")
         options.add_argument("--disable-default-apps")
         options.add_argument("--disable-sync")
@@ -107,6 +309,11 @@ class ChromeDriver:
         options.add_argument("--safebrowsing-disable-auto-update")
         options.add_argument("--password-store=basic")
         
+        # 低内存选项：限制渲染进程数量和磁盘缓存大小
+        if LOW_MEMORY_MODE:
+            options.add_argument(f"--renderer-process-limit={RENDERER_PROCESS_LIMIT}")
+            options.add_argument(f"--disk-cache-size={DISK_CACHE_SIZE_MB * 1024 * 1024}")
+        
         # 添加反自动化检测的选项
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
@@ -123,22 +330,94 @@ class ChromeDriver:
         
         # 启动Chrome浏览器
         try:
-            # 直接使用Chrome驱动
-            self.driver = webdriver.Chrome(options=options)
+            # chromedriver和Chrome路径按Chrome版本缓存，避免每次启动都运行Selenium Manager
+            imported = time.perf_counter()
+            driver_path, from_cache = resolve_driver_path(options, self.user_data_dir)
+            resolved = time.perf_counter()
+            try:
+                self.driver = webdriver.Chrome(options=options, service=Service(executable_path=driver_path))
+            except SessionNotCreatedException:
+                if not from_cache:
+                    raise
+                # 缓存的驱动与浏览器不匹配时重新解析一次
+                logger.warning("使用缓存的chromedriver启动失败，重新解析驱动路径")
+                invalidate_driver_path()
+                driver_path, _ = resolve_driver_path(options, self.user_data_dir, refresh=True)
+                resolved = time.perf_counter()
+                self.driver = webdriver.Chrome(options=options, service=Service(executable_path=driver_path))
+            launched = time.perf_counter()
+            self._script_timeout = None
+            self._instrument_commands(self.driver)
             
             # 修改navigator.webdriver属性，绕过反爬检测
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.first_command_at = time.perf_counter()
+            self.startup_timings = {
+                "import": imported - started,
+                "resolve_driver": resolved - imported,
+                "launch": launched - resolved,
+                "first_command": self.first_command_at - started,
+            }
+            
+            # 统计页面中的请求，用于判断网络是否空闲
+            install_activity_hook(self)
+            
+            # 在访问考试星之前导入会话状态
+            if self.session_state:
+                apply_session_state(self, self.session_state)
             
-            # 设置隐式等待时间
+            # 在访问任何页面之前启用请求过滤
+            if self.request_filter_profile:
+                self._install_request_filter()
+            
+            # 设置隐式等待时间，默认关闭，元素等待都使用显式等待
             self.driver.implicitly_wait(IMPLICIT_WAIT_TIME)
-            logger.info("Chrome浏览器启动成功")
+            logger.info(
+                f"Chrome浏览器启动成功，首个WebDriver命令用时{self.startup_timings['first_command']:.2f}秒"
+                f"（导入{self.startup_timings['import']:.2f}秒，解析驱动{self.startup_timings['resolve_driver']:.2f}秒，"
+                f"启动浏览器{self.startup_timings['launch']:.2f}秒）"
+            )
             return self.driver
         except Exception as e:
             logger.error(f"启动Chrome浏览器失败: {str(e)}")
+            self._cleanup_isolated_user_data_dir()
             raise
             
+    def _install_request_filter(self):
+        """启用请求过滤，连接失败时记录警告并继续不过滤运行，配置有误时抛出ConfigError"""
+        from core.request_filter import RequestFilter
+        
+        request_filter = RequestFilter(self.request_filter_profile)
+        try:
+            request_filter.install(self)
+            self.request_filter = request_filter
+        except Exception as e:
+            logger.warning(f"启用请求过滤失败，不过滤继续运行: {str(e)}")
+            
+    def _instrument_commands(self, web_driver):
+        """
+        包装WebDriver的命令执行方法，统计命令数，开启耗时追踪时记录每条命令的耗时
+        
+        Args:
+            web_driver: selenium WebDriver实例
+        """
+        execute = web_driver.execute
+        
+        def traced_execute(driver_command, params=None):
+            self.command_count += 1
+            if not tracer.enabled:
+                return execute(driver_command, params)
+            with tracer.span(driver_command, KIND_WEBDRIVER):
+                return execute(driver_command, params)
+                
+        web_driver.execute = traced_execute
+        
     def quit(self):
         """关闭Chrome浏览器"""
+        if self.request_filter:
+            logger.info(self.request_filter.format_stats())
+            self.request_filter.close()
+            self.request_filter = None
         if self.driver:
             try:
                 self.driver.quit()
@@ -147,13 +426,101 @@ class ChromeDriver:
                 logger.error(f"关闭Chrome浏览器失败: {str(e)}")
             finally:
                 self.driver = None
-                
-    def navigate_to(self, url):
+        self._cleanup_isolated_user_data_dir()
+
+    def recycle_tab(self, url):
+        """
+        在新标签页中打开url并关闭当前标签页，释放旧标签页的渲染进程占用的内存
+
+        Args:
+            url (str): 新标签页打开的URL
+
+        Returns:
+            bool: 是否成功打开
+        """
+        try:
+            old_handle = self.driver.current_window_handle
+            self.driver.switch_to.new_window("tab")
+            new_handle = self.driver.current_window_handle
+            self.driver.switch_to.window(old_handle)
+            self.driver.close()
+            self.driver.switch_to.window(new_handle)
+            # 请求统计脚本和请求过滤都绑定在标签页上，需要在新标签页中重新启用
+            install_activity_hook(self)
+            if self.request_filter:
+                logger.info(self.request_filter.format_stats())
+                self.request_filter.close()
+                self.request_filter = None
+                self._install_request_filter()
+        except Exception as e:
+            logger.error(f"回收标签页失败: {str(e)}")
+            return False
+        return self.navigate_to(url)
+
+    def restart(self, url):
+        """
+        重启浏览器并打开url，会话状态和请求过滤按启动参数重新应用
+
+        Args:
+            url (str): 重启后打开的URL
+
+        Returns:
+            bool: 是否成功打开
+        """
+        self.quit()
+        self.start()
+        return self.navigate_to(url)
+
+    def is_alive(self):
+        """
+        检查浏览器会话是否仍然可用
+
+        Returns:
+            bool: 浏览器已启动且能响应WebDriver命令
+        """
+        if not self.driver:
+            return False
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception as e:
+            logger.warning(f"浏览器会话不可用: {str(e)}")
+            return False
+
+    def reset(self, url):
+        """
+        重置浏览器状态，供下一个任务复用：关闭多余窗口、清空编辑器状态并重新打开页面
+
+        Args:
+            url (str): 重置后打开的URL
+
+        Returns:
+            bool: 是否重置成功
         """
-        导航到指定URL
+        try:
+            # 关闭任务中打开的多余窗口
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+
+            # 清空编辑器的会话状态，先离开页面保证单页应用被完整重新加载
+            self.driver.execute_script("window.sessionStorage.clear()")
+            self.driver.get("about:blank")
+            return self.navigate_to(url)
+        except Exception as e:
+            logger.error(f"重置浏览器状态失败: {str(e)}")
+            return False
+
+    @traced("navigate_to")
+    def navigate_to(self, url, root_selectors=None):
+        """
+        导航到指定URL，页面可以操作时返回
         
         Args:
             url (str): 要访问的URL
+            root_selectors (list): 就绪时必须出现的元素的CSS选择器，None表示使用READY_ROOT_SELECTORS
         """
         if not self.driver:
             self.start()
@@ -161,14 +528,18 @@ class ChromeDriver:
         try:
             logger.info(f"正在访问URL: {url}")
             self.driver.get(url)
+            self.page_generation += 1
             
-            # 随机等待一段时间，模拟人类行为
-            self._random_sleep(1, 3)
+            # 等待应用挂载、网络空闲且编辑器根元素出现，单页应用跳转到登录页面时立即返回
+            self.ready_state = wait_until_ready(self, root_selectors)
             
-            # 随机滚动页面，模拟人类行为
-            self._random_scroll()
+            # 使用导入的会话状态时，跳转到登录页面说明会话已失效
+            if self.session_state and not is_logged_in(self):
+                self.session_expired = True
+                logger.error(f"会话状态已失效，页面跳转到了: {self.driver.current_url}")
+                return False
             
-            logger.info(f"成功访问URL: {url}")
+            logger.info(f"成功访问URL: {url}（{self.ready_state['seconds']:.2f}秒后就绪）")
             return True
         except Exception as e:
             logger.error(f"访问URL失败: {str(e)}")
@@ -176,36 +547,94 @@ class ChromeDriver:
             
     def _random_sleep(self, min_seconds=0.5, max_seconds=2.0):
         """
-        随机等待一段时间，模拟人类行为
+        随机等待一段时间，模拟人类行为，实际是否等待由节奏策略决定
         
         Args:
             min_seconds (float): 最小等待时间（秒）
             max_seconds (float): 最大等待时间（秒）
         """
-        sleep_time = random.uniform(min_seconds, max_seconds)
-        time.sleep(sleep_time)
+        self.pacing.sleep(min_seconds, max_seconds)
         
-    def _random_scroll(self, scroll_count=None):
+    def pause(self, min_seconds, max_seconds, until=None):
         """
-        随机滚动页面，模拟人类行为
+        操作之间的停顿：人类模式下随机等待，高吞吐模式下等待预期的页面状态出现
         
         Args:
-            scroll_count (int, optional): 滚动次数，如果为None则随机1-5次
+            min_seconds (float): 最小等待时间（秒）
+            max_seconds (float): 最大等待时间（秒）
+            until: 预期的页面状态，expected_conditions条件或PageCondition（可选）
         """
-        if not scroll_count:
-            scroll_count = random.randint(1, 5)
-            
-        for _ in range(scroll_count):
-            # 随机滚动距离
-            scroll_distance = random.randint(100, 500)
-            scroll_direction = random.choice([1, -1])  # 1表示向下滚动，-1表示向上滚动
+        # 高吞吐模式下PageCondition在页面中监听DOM变化，不轮询chromedriver
+        if isinstance(until, PageCondition) and not self.pacing.human_gestures:
+            return self.wait_for(until, getattr(self.pacing, "timeout", DEFAULT_WAIT_TIMEOUT))
+        return self.pacing.pause(self.driver, min_seconds, max_seconds, until)
+        
+    def set_script_timeout(self, seconds, at_least=False):
+        """
+        设置异步脚本的超时时间，与当前值相同时不发送命令
+        
+        Args:
+            seconds (float): 超时时间（秒）
+            at_least (bool): 只在当前值小于seconds时修改
+        """
+        if at_least and self._script_timeout is not None and self._script_timeout >= seconds:
+            return
+        if seconds != self._script_timeout:
+            self.driver.set_script_timeout(seconds)
+            self._script_timeout = seconds
+        
+    def wait_for(self, condition, timeout=DEFAULT_WAIT_TIMEOUT):
+        """
+        在页面中等待条件满足，DOM变化后立即重新检查，整个等待只产生一次WebDriver往返
+        
+        Args:
+            condition (PageCondition): 等待条件，见core.waits
+            timeout (float): 超时时间（秒）
             
-            # 执行滚动
-            self.driver.execute_script(f"window.scrollBy(0, {scroll_distance * scroll_direction})")
+        Returns:
+            元素、元素列表或True
             
-            # 随机等待
-            self._random_sleep(0.2, 1.0)
+        Raises:
+            TimeoutException: 超时仍未满足条件
+            StaleElementReferenceException: 等待的元素已从页面中移除
+        """
+        with tracer.span(f"wait:{condition.description}", KIND_WAIT):
+            # 页面脚本自己控制超时，脚本超时只作为兜底
+            self.set_script_timeout(timeout + 5, at_least=True)
+            result = self.driver.execute_async_script(
+                WAIT_SCRIPT, condition.to_script_arg(), int(timeout * 1000), FALLBACK_CHECK_INTERVAL_MS
+            )
+        value = condition.accept(result)
+        if value is False:
+            from selenium.common.exceptions import TimeoutException
+            raise TimeoutException(f"{timeout}秒内未满足等待条件: {condition.description}")
+        return value
+        
+    @traced("run_batch")
+    def run_batch(self, batch, timeout=None):
+        """
+        在页面中一次性执行批量操作，只产生一次WebDriver往返
+        
+        Args:
+            batch (ActionBatch): 批量操作
+            timeout (float): 整批操作的超时时间（秒），None表示按各步骤的超时时间之和计算，
+                步骤越多超时时间越长
             
+        Returns:
+            list: 每个步骤的结果，包含step、label、ok、elapsed_ms、value或error字段
+        """
+        if not len(batch):
+            return []
+        if timeout is None:
+            timeout = batch.script_timeout()
+        self.set_script_timeout(timeout)
+        results = self.driver.execute_async_script(BATCH_RUNNER_SCRIPT, batch.steps, STEP_POLL_INTERVAL_MS)
+        failed = [result for result in results if not result.get("ok") and not result.get("skipped")]
+        if failed:
+            logger.warning(f"批量操作在步骤 {failed[0]['label']} 失败: {failed[0].get('error')}")
+        return results
+        
+    @traced("click_element")
     def click_element(self, element, random_delay=True):
         """
         模拟人类点击元素
@@ -214,9 +643,11 @@ class ChromeDriver:
             element: 要点击的WebElement元素
             random_delay (bool): 是否在点击前随机等待
         """
+        from selenium.webdriver.common.action_chains import ActionChains
+        
         try:
             # 确保元素可见
-            WebDriverWait(self.driver, 10).until(EC.visibility_of(element))
+            self.wait_for(element_visible(element))
             
             # 随机等待
             if random_delay:
@@ -240,7 +671,8 @@ class ChromeDriver:
             logger.error(f"点击元素失败: {str(e)}")
             return False
             
-    def input_text(self, element, text, clear_first=True, random_typing=True):
+    @traced("input_text")
+    def input_text(self, element, text, clear_first=True, random_typing=True, bulk=None):
         """
         模拟人类输入文本
         
@@ -249,10 +681,20 @@ class ChromeDriver:
             text (str): 要输入的文本
             clear_first (bool): 是否先清空输入框
             random_typing (bool): 是否模拟人类随机输入速度
+            bulk (bool): 是否一次性写入，None表示由节奏策略和文本长度决定
         """
+        if bulk is None:
+            bulk = self.pacing.bulk_input or (
+                BULK_INPUT_MIN_LENGTH is not None and len(text) >= BULK_INPUT_MIN_LENGTH
+            )
+        if bulk:
+            return self.fill_text(element, text, clear_first)
+            
+        from selenium.webdriver.common.action_chains import ActionChains
+        
         try:
             # 确保元素可见
-            WebDriverWait(self.driver, 10).until(EC.visibility_of(element))
+            self.wait_for(element_visible(element))
             
             # 移动到元素位置
             ActionChains(self.driver).move_to_element(element).perform()
@@ -282,4 +724,41 @@ class ChromeDriver:
             return True
         except Exception as e:
             logger.error(f"输入文本失败: {str(e)}")
+            return False
+            
+    @traced("fill_text")
+    def fill_text(self, element, text, clear_first=True):
+        """
+        一次性写入文本，支持普通输入框、textarea、contenteditable和iframe富文本编辑器
+        
+        写入后触发Vue组件依赖的input和change事件，并读回一次确认内容已生效。
+        
+        Args:
+            element: 要输入文本的WebElement元素
+            text (str): 要输入的文本
+            clear_first (bool): 是否先清空原有内容，False时追加到原有内容之后
+            
+        Returns:
+            bool: 读回的内容与预期一致时返回True
+        """
+        try:
+            result = self.driver.execute_async_script(BULK_FILL_SCRIPT, element, text, not clear_first)
+            if result.get("error"):
+                logger.error(f"写入文本失败: {result['error']}")
+                return False
+                
+            committed = result.get("value") or ""
+            # 富文本编辑器读回时换行和首尾空白可能被规整，比较时忽略这些差异
+            if clear_first:
+                matched = " ".join(committed.split()) == " ".join(text.split())
+            else:
+                matched = " ".join(committed.split()).endswith(" ".join(text.split()))
+            if not matched:
+                logger.error(f"写入文本后读回的内容不一致: {committed[:50]}")
+                return False
+                
+            self._random_sleep(0.3, 1.0)
+            return True
+        except Exception as e:
+            logger.error(f"写入文本失败: {str(e)}")
             return False
\ No newline at end of file
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+浏览器内存管理模块，跟踪Chrome进程树的常驻内存和页面的JS堆，超过阈值时在任务之间回收
+
+试卷编辑器中的题目越多，渲染进程的内存越大，DOM操作逐渐变慢，最终可能导致标签页崩溃。
+MemoryGovernor在每批题目完成后采样；任务进行中试卷可能还没有保存，关闭标签页会丢失未保存的内容，
+因此超过阈值时只记录警告，等任务结束、浏览器归还会话池时再回收：
+先在新标签页中打开页面并关闭旧标签页，仍然超过阈值时重启浏览器。
+每个任务的采样记录在任务结束时输出到日志。
+
+进程内存通过psutil读取，需要安装psutil。
+"""
+
+import time
+from contextlib import contextmanager
+from config.settings import MEMORY_RSS_LIMIT_MB, MEMORY_JS_HEAP_LIMIT_MB, MEMORY_RECYCLE
+from utils.exceptions import ConfigError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 回收方式
+RECYCLE_TAB = "tab"
+RECYCLE_BROWSER = "browser"
+
+# 日志中最多列出的采样数，超过时均匀抽取（总是包含最后一次采样）
+MAX_LOGGED_SAMPLES = 20
+
+_MB = 1024 * 1024
+
+class MemoryGovernor:
+    """浏览器内存跟踪和回收"""
+
+    def __init__(self, driver, rss_limit_mb=MEMORY_RSS_LIMIT_MB, heap_limit_mb=MEMORY_JS_HEAP_LIMIT_MB,
+                 recycle=MEMORY_RECYCLE):
+        """
+        Args:
+            driver: ChromeDriver实例，浏览器重启后继续使用同一个MemoryGovernor
+            rss_limit_mb (float): Chrome进程树常驻内存的阈值（MB），None表示不限制
+            heap_limit_mb (float): 页面JS堆的阈值（MB），None表示不限制
+            recycle (str): 超过阈值时的回收方式，RECYCLE_TAB或RECYCLE_BROWSER
+
+        Raises:
+            ConfigError: 未安装psutil或回收方式无效
+        """
+        try:
+            import psutil
+        except ImportError:
+            raise ConfigError("跟踪浏览器内存需要安装psutil: pip install psutil")
+        if recycle not in (RECYCLE_TAB, RECYCLE_BROWSER):
+            raise ConfigError(f"未知的内存回收方式: {recycle}，可选: {RECYCLE_TAB}, {RECYCLE_BROWSER}")
+        self._psutil = psutil
+        self.driver = driver
+        self.rss_limit_mb = rss_limit_mb
+        self.heap_limit_mb = heap_limit_mb
+        self.recycle = recycle
+        self.job = None
+        self.samples = []
+        self._warned = False
+        self._job_started = time.monotonic()
+
+    def measure(self):
+        """
+        读取当前的内存占用
+
+        Returns:
+            tuple: (Chrome进程树的常驻内存MB, 当前页面的JS堆MB)，无法读取的一项为None
+        """
+        rss = heap = None
+        web_driver = self.driver.driver
+        try:
+            root = self._psutil.Process(web_driver.service.process.pid)
+            rss = 0
+            # chromedriver的子进程即Chrome的浏览器、GPU和各渲染进程
+            for process in [root] + root.children(recursive=True):
+                try:
+                    rss += process.memory_info().rss
+                except (self._psutil.NoSuchProcess, self._psutil.AccessDenied):
+                    continue
+            rss = round(rss / _MB, 1)
+        except Exception as e:
+            logger.debug(f"读取浏览器进程内存失败: {str(e)}")
+        try:
+            heap = round(web_driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"] / _MB, 1)
+        except Exception as e:
+            logger.debug(f"读取JS堆大小失败: {str(e)}")
+        return rss, heap
+
+    def sample(self, label=""):
+        """
+        采样一次并记录到当前任务
+
+        Args:
+            label (str): 采样位置，例如批次序号
+
+        Returns:
+            dict: 采样结果，包含seconds（任务开始后的秒数）、label、rss_mb、heap_mb
+        """
+        rss, heap = self.measure()
+        record = {
+            "seconds": round(time.monotonic() - self._job_started, 1),
+            "label": label,
+            "rss_mb": rss,
+            "heap_mb": heap,
+        }
+        self.samples.append(record)
+        logger.debug(f"内存采样 {label}: 常驻内存{rss}MB，JS堆{heap}MB")
+        return record
+
+    def exceeded(self, record=None):
+        """
+        检查内存是否超过阈值
+
+        Args:
+            record (dict): sample()的结果，None时重新采样（不记录到任务）
+
+        Returns:
+            str: 超过阈值的说明，未超过时返回None
+        """
+        if record is None:
+            rss, heap = self.measure()
+        else:
+            rss, heap = record["rss_mb"], record["heap_mb"]
+        if self.rss_limit_mb and rss is not None and rss > self.rss_limit_mb:
+            return f"常驻内存{rss}MB超过{self.rss_limit_mb}MB"
+        if self.heap_limit_mb and heap is not None and heap > self.heap_limit_mb:
+            return f"JS堆{heap}MB超过{self.heap_limit_mb}MB"
+        return None
+
+    def checkpoint(self, label):
+        """
+        在一批题目或一步计划完成后采样，超过阈值时只记录警告（每个任务一次），回收留到任务结束后
+
+        Args:
+            label (str): 检查点说明
+
+        Returns:
+            str: 超过阈值的说明，未超过时返回None
+        """
+        reason = self.exceeded(self.sample(label))
+        if reason is not None and not self._warned:
+            self._warned = True
+            logger.warning(f"{reason}，试卷可能还没有保存，任务结束后再回收")
+        return reason
+
+    def reclaim(self, url):
+        """
+        在任务之间回收内存：超过阈值时回收标签页或浏览器并打开url，调用时当前任务必须已经结束
+
+        Args:
+            url (str): 回收后打开的页面
+
+        Returns:
+            bool: 内存是否在阈值以内（未超过阈值或回收成功），False时调用方应关闭该浏览器
+        """
+        reason = self.exceeded()
+        if reason is None:
+            return True
+
+        if self.recycle == RECYCLE_TAB:
+            logger.info(f"{reason}，在新标签页中重新打开页面")
+            if not self.driver.recycle_tab(url):
+                return False
+            reason = self.exceeded()
+            if reason is None:
+                return True
+
+        logger.info(f"{reason}，重启浏览器")
+        if not self.driver.restart(url):
+            return False
+        return self.exceeded() is None
+
+    def begin_job(self, job):
+        """开始记录一个任务的内存变化"""
+        self.job = job
+        self.samples = []
+        self._warned = False
+        self._job_started = time.monotonic()
+        self.sample("开始")
+
+    def end_job(self):
+        """
+        结束当前任务，在日志中输出内存变化
+
+        Returns:
+            dict: 任务的内存报告，包含job、samples以及常驻内存和JS堆的峰值
+        """
+        self.sample("结束")
+        report = self.report()
+        logger.info(self.format_report(report))
+        self.job = None
+        return report
+
+    def report(self):
+        """当前任务的内存报告"""
+        def peak(key):
+            values = [record[key] for record in self.samples if record[key] is not None]
+            return max(values) if values else None
+
+        return {
+            "job": self.job,
+            "samples": list(self.samples),
+            "peak_rss_mb": peak("rss_mb"),
+            "peak_heap_mb": peak("heap_mb"),
+        }
+
+    @staticmethod
+    def format_report(report):
+        """
+        将report()的结果格式化为日志文本
+
+        Args:
+            report (dict): 内存报告
+
+        Returns:
+            str: 多行文本，第一行为汇总，之后每行一个采样
+        """
+        samples = report["samples"]
+        lines = [
+            f"内存（{report['job']}）: 常驻内存峰值{report['peak_rss_mb']}MB，JS堆峰值{report['peak_heap_mb']}MB，"
+            f"采样{len(samples)}次"
+        ]
+        if len(samples) > MAX_LOGGED_SAMPLES:
+            step = -(-len(samples) // MAX_LOGGED_SAMPLES)
+            samples = samples[:-1:step] + samples[-1:]
+        for record in samples:
+            lines.append(f"  {record['seconds']:>7.1f}秒 {record['label']}: 常驻内存{record['rss_mb']}MB，JS堆{record['heap_mb']}MB")
+        return "\n".join(lines)
+
+@contextmanager
+def track_job(driver, job):
+    """
+    在代码块内记录一个任务的内存变化，结束时输出到日志；没有跟踪内存时不做任何事
+
+    Args:
+        driver: ChromeDriver实例
+        job (str): 任务名称
+    """
+    governor = driver.memory
+    if governor is None:
+        yield
+        return
+    governor.begin_job(job)
+    try:
+        yield
+    finally:
+        governor.end_job()
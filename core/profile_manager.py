@@ -6,13 +6,42 @@ Chrome配置文件管理模块，负责获取和管理Chrome用户配置文件
 """
 
 import os
+import json
 import platform
 import re
+import shutil
+import fnmatch
+import tempfile
 from pathlib import Path
+from config.settings import ISOLATED_PROFILE_IGNORE, SNAPSHOT_DIR, SNAPSHOT_INCLUDE
+from core.startup_cache import cached_profile_index
+from utils.exceptions import ChromeProfileError
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 快照目录中记录源文件状态的文件
+SNAPSHOT_META_FILE = "snapshot.json"
+
+# 判断快照是否过期时检查的源文件，路径相对于配置文件目录
+SNAPSHOT_SOURCE_FILES = ["Cookies", "Network/Cookies"]
+
+# 浏览器运行时在用户数据目录中创建的锁文件
+BROWSER_LOCK_FILES = ["SingletonLock", "lockfile"]
+
+def default_snapshot_root():
+    """
+    获取快照的存放目录，优先使用内存文件系统
+    
+    Returns:
+        str: 快照的存放目录
+    """
+    if SNAPSHOT_DIR:
+        return SNAPSHOT_DIR
+    if platform.system() == "Linux" and os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return os.path.join("/dev/shm", "kaoshixing-snapshots")
+    return os.path.join(tempfile.gettempdir(), "kaoshixing-snapshots")
+
 class ProfileManager:
     """Chrome用户配置文件管理类"""
     
@@ -57,6 +86,18 @@ class ProfileManager:
             logger.error(f"Chrome用户数据目录不存在: {self.chrome_user_data_dir}")
             return []
             
+        # 用户数据目录未变化时直接使用上次扫描的结果
+        profiles = cached_profile_index(self.chrome_user_data_dir, self._scan_profiles)
+        logger.info(f"找到 {len(profiles)} 个Chrome用户配置文件")
+        return profiles
+        
+    def _scan_profiles(self):
+        """
+        扫描用户数据目录中的配置文件
+        
+        Returns:
+            list: 配置文件名称列表
+        """
         profiles = []
         
         # 默认配置文件
@@ -66,12 +107,11 @@ class ProfileManager:
             
         # 其他配置文件（Profile 1, Profile 2, ...）
         profile_pattern = re.compile(r"Profile \d+")
-        for item in os.listdir(self.chrome_user_data_dir):
-            item_path = os.path.join(self.chrome_user_data_dir, item)
-            if os.path.isdir(item_path) and profile_pattern.match(item):
-                profiles.append(item)
-                
-        logger.info(f"找到 {len(profiles)} 个Chrome用户配置文件")
+        with os.scandir(self.chrome_user_data_dir) as entries:
+            for entry in entries:
+                if profile_pattern.match(entry.name) and entry.is_dir():
+                    profiles.append(entry.name)
+                    
         return profiles
         
     def get_profile_path(self, profile_name):
@@ -110,4 +150,155 @@ class ProfileManager:
             return None
             
         path = Path(profile_path)
-        return path.name 
\ No newline at end of file
+        return path.name
+
+    def seed_user_data_dir(self, profile_name, target_dir, ignore=ISOLATED_PROFILE_IGNORE):
+        """
+        将指定配置文件复制到新的用户数据目录，供隔离的浏览器实例使用
+
+        复制内容包括用户数据目录下的Local State（Cookie解密密钥所在）和配置文件目录，
+        跳过缓存和锁文件。Chrome正在使用中而无法读取的文件会被跳过。
+
+        Args:
+            profile_name (str): 配置文件名称
+            target_dir (str): 新的用户数据目录
+            ignore (list): 跳过的文件名模式
+
+        Returns:
+            str: 新的用户数据目录
+
+        Raises:
+            ChromeProfileError: 配置文件不存在
+        """
+        if not self.get_profile_path(profile_name):
+            raise ChromeProfileError(f"配置文件不存在: {profile_name}")
+
+        os.makedirs(target_dir, exist_ok=True)
+        local_state = os.path.join(self.chrome_user_data_dir, "Local State")
+        if os.path.isfile(local_state):
+            self._copy_file(local_state, os.path.join(target_dir, "Local State"))
+
+        source = os.path.join(self.chrome_user_data_dir, profile_name)
+        skipped = self._copy_tree(source, os.path.join(target_dir, profile_name), ignore)
+        if skipped:
+            logger.warning(f"复制配置文件时跳过了 {skipped} 个无法读取的文件")
+        logger.info(f"已将配置文件 '{profile_name}' 复制到: {target_dir}")
+        return target_dir
+
+    def _snapshot_fingerprint(self, profile_name):
+        """
+        获取源配置文件中Cookie等文件的状态，状态变化说明登录信息已更新
+
+        Returns:
+            dict: {相对路径: [修改时间, 大小]}
+        """
+        fingerprint = {}
+        paths = [os.path.join(profile_name, name) for name in SNAPSHOT_SOURCE_FILES] + ["Local State"]
+        for relative_path in paths:
+            try:
+                stat = os.stat(os.path.join(self.chrome_user_data_dir, relative_path))
+                fingerprint[relative_path.replace(os.sep, "/")] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                continue
+        return fingerprint
+
+    def snapshot_profile(self, profile_name, snapshot_root=None, include=SNAPSHOT_INCLUDE):
+        """
+        创建或复用配置文件的精简快照，作为浏览器的用户数据目录
+
+        快照只包含Local State以及include中的Cookie、Local Storage、Preferences等文件，
+        默认存放在内存文件系统中。源配置文件的Cookie未变化时直接复用已有快照，
+        变化后重新复制；浏览器只读写快照，不会修改原配置文件。
+
+        Args:
+            profile_name (str): 配置文件名称
+            snapshot_root (str): 快照的存放目录，None表示使用default_snapshot_root()
+            include (list): 复制的文件和目录，路径相对于配置文件目录
+
+        Returns:
+            str: 快照的用户数据目录，启动时配合--profile-directory=profile_name使用
+
+        Raises:
+            ChromeProfileError: 配置文件不存在
+        """
+        if not self.get_profile_path(profile_name):
+            raise ChromeProfileError(f"配置文件不存在: {profile_name}")
+
+        snapshot_root = snapshot_root or default_snapshot_root()
+        snapshot_dir = os.path.join(snapshot_root, re.sub(r"[^\w.-]", "_", profile_name))
+        fingerprint = self._snapshot_fingerprint(profile_name)
+
+        meta = {}
+        try:
+            with open(os.path.join(snapshot_dir, SNAPSHOT_META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if meta.get("fingerprint") == fingerprint and meta.get("include") == list(include):
+            logger.info(f"复用配置文件快照: {snapshot_dir}")
+            return snapshot_dir
+
+        if meta and any(os.path.lexists(os.path.join(snapshot_dir, name)) for name in BROWSER_LOCK_FILES):
+            logger.warning(f"配置文件快照正在被浏览器使用，暂不刷新: {snapshot_dir}")
+            return snapshot_dir
+
+        # 先复制到临时目录，完成后再替换旧快照，复制中断不会留下不完整的快照
+        os.makedirs(snapshot_root, exist_ok=True)
+        building_dir = tempfile.mkdtemp(prefix=".building-", dir=snapshot_root)
+        local_state = os.path.join(self.chrome_user_data_dir, "Local State")
+        if os.path.isfile(local_state):
+            self._copy_file(local_state, os.path.join(building_dir, "Local State"))
+
+        skipped = 0
+        copied = 0
+        for relative_path in include:
+            source = os.path.join(self.chrome_user_data_dir, profile_name, relative_path)
+            target = os.path.join(building_dir, profile_name, relative_path)
+            if os.path.isdir(source):
+                skipped += self._copy_tree(source, target, ISOLATED_PROFILE_IGNORE)
+                copied += 1
+            elif os.path.isfile(source):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if self._copy_file(source, target):
+                    copied += 1
+                else:
+                    skipped += 1
+        if skipped:
+            logger.warning(f"创建快照时跳过了 {skipped} 个无法读取的文件")
+
+        with open(os.path.join(building_dir, SNAPSHOT_META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"profile": profile_name, "include": list(include), "fingerprint": fingerprint}, f, indent=2)
+
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        os.replace(building_dir, snapshot_dir)
+        logger.info(f"已{'刷新' if meta else '创建'}配置文件快照（{copied}项）: {snapshot_dir}")
+        return snapshot_dir
+
+    def _copy_tree(self, source, target, ignore):
+        """
+        递归复制目录，跳过匹配ignore的条目
+
+        Returns:
+            int: 因无法读取而跳过的文件数
+        """
+        skipped = 0
+        os.makedirs(target, exist_ok=True)
+        for entry in os.scandir(source):
+            if any(fnmatch.fnmatch(entry.name, pattern) for pattern in ignore):
+                continue
+            target_path = os.path.join(target, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                skipped += self._copy_tree(entry.path, target_path, ignore)
+            elif entry.is_file(follow_symlinks=False):
+                if not self._copy_file(entry.path, target_path):
+                    skipped += 1
+        return skipped
+
+    def _copy_file(self, source, target):
+        """复制单个文件，文件被占用时返回False"""
+        try:
+            shutil.copy2(source, target)
+            return True
+        except OSError as e:
+            logger.debug(f"无法复制文件 {source}: {str(e)}")
+            return False
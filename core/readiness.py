@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+页面就绪检测模块，判断考试星的单页应用何时可以开始操作
+
+浏览器使用eager页面加载策略，DOM解析完成后driver.get就返回，不等待图片等资源。
+之后在页面中一次执行异步脚本，同时满足以下条件时返回：
+- 应用已挂载：Vue应用的根元素已渲染（页面没有应用根元素时只要求DOM解析完成）
+- 网络空闲：没有进行中的fetch/XHR请求，且最近READY_NETWORK_IDLE_MS毫秒内没有请求结束
+- 编辑器根元素已出现：READY_ROOT_SELECTORS中任意一个选择器命中
+页面跳转到登录页面时立即返回，由调用方判断会话是否失效。
+"""
+
+import time
+from config.settings import (
+    READY_TIMEOUT, READY_NETWORK_IDLE_MS, READY_APP_SELECTOR, READY_ROOT_SELECTORS, LOGIN_URL_KEYWORDS,
+)
+from utils.tracing import tracer, KIND_WAIT
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 检查页面状态的间隔（毫秒）
+READY_POLL_INTERVAL_MS = 50
+
+# 就绪条件及其说明
+READY_CONDITIONS = (("mounted", "应用挂载"), ("idle", "网络空闲"), ("root", "编辑器根元素"))
+
+# 在每个文档加载时注入，统计进行中的fetch/XHR请求和最近一次请求活动的时间
+ACTIVITY_HOOK_SCRIPT = """
+(function () {
+    if (window.__pageActivity) { return; }
+    var activity = window.__pageActivity = {inflight: 0, last: Date.now()};
+    function begin() { activity.inflight++; activity.last = Date.now(); }
+    function end() { activity.inflight = Math.max(0, activity.inflight - 1); activity.last = Date.now(); }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { end(); return response; },
+                function (error) { end(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+})();
+"""
+
+# 等待页面就绪，返回各项条件的状态
+READY_SCRIPT = """
+var appSelector = arguments[0], roots = arguments[1], idleMs = arguments[2];
+var timeoutMs = arguments[3], loginKeywords = arguments[4], pollMs = arguments[5];
+var done = arguments[arguments.length - 1];
+var started = Date.now();
+function mounted() {
+    if (document.readyState === 'loading') { return false; }
+    var app = appSelector ? document.querySelector(appSelector) : null;
+    if (!app) { return true; }
+    return !!(app.__vue_app__ || app.__vue__ || app.children.length);
+}
+function lastActivity() {
+    var activity = window.__pageActivity;
+    if (activity && activity.inflight > 0) { return null; }
+    // 没有注入统计脚本时（例如导航前未启用）只能根据已完成的资源判断
+    var last = performance.timeOrigin;
+    var entries = performance.getEntriesByType('resource');
+    for (var i = 0; i < entries.length; i++) {
+        last = Math.max(last, performance.timeOrigin + entries[i].responseEnd);
+    }
+    return activity ? Math.max(last, activity.last) : last;
+}
+function rootPresent() {
+    if (!roots.length) { return true; }
+    return roots.some(function (selector) { return document.querySelector(selector) !== null; });
+}
+function check() {
+    var url = location.href.toLowerCase();
+    var last = lastActivity();
+    var state = {
+        mounted: mounted(),
+        idle: last !== null && Date.now() - last >= idleMs,
+        root: rootPresent(),
+        login: loginKeywords.some(function (keyword) { return url.indexOf(keyword) !== -1; }),
+        elapsed_ms: Date.now() - started
+    };
+    state.ready = state.mounted && state.idle && state.root;
+    if (state.ready || state.login || state.elapsed_ms >= timeoutMs) {
+        done(state);
+        return;
+    }
+    setTimeout(check, pollMs);
+}
+check();
+"""
+
+def install_activity_hook(driver):
+    """
+    注入请求统计脚本，之后加载的每个文档都会生效，需要在访问页面之前调用
+
+    Args:
+        driver: 已启动的ChromeDriver实例
+    """
+    driver.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": ACTIVITY_HOOK_SCRIPT})
+
+def wait_until_ready(driver, root_selectors=None, timeout=READY_TIMEOUT, idle_ms=READY_NETWORK_IDLE_MS):
+    """
+    等待当前页面可以操作，整个等待只产生一次WebDriver往返
+
+    Args:
+        driver: ChromeDriver实例
+        root_selectors (list): 编辑器根元素的CSS选择器，任意一个命中即可，None表示使用READY_ROOT_SELECTORS，
+            空列表表示不检查
+        timeout (float): 超时时间（秒）
+        idle_ms (int): 视为网络空闲的无请求时间（毫秒）
+
+    Returns:
+        dict: 各项条件的状态，ready表示全部满足，login表示页面跳转到了登录页面
+    """
+    roots = READY_ROOT_SELECTORS if root_selectors is None else root_selectors
+    started = time.perf_counter()
+    with tracer.span("wait:page_ready", KIND_WAIT):
+        driver.set_script_timeout(timeout + 5, at_least=True)
+        state = driver.driver.execute_async_script(
+            READY_SCRIPT, READY_APP_SELECTOR, list(roots), idle_ms, int(timeout * 1000),
+            LOGIN_URL_KEYWORDS, READY_POLL_INTERVAL_MS,
+        )
+    state["seconds"] = round(time.perf_counter() - started, 3)
+    if not state["ready"] and not state["login"]:
+        pending = [label for name, label in READY_CONDITIONS if not state[name]]
+        logger.warning(f"页面在{timeout}秒内未就绪，未满足: {', '.join(pending)}")
+    return state
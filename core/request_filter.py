@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求过滤模块，通过DevTools协议拦截自动化不需要的资源，缩短页面加载时间
+
+- block_urls通过Network.setBlockedURLs在浏览器内直接拦截，不经过Python
+- block_types通过Fetch.enable只暂停这些类型的请求，allow_urls中的放行，其余以BlockedByClient失败
+- 同时监听Network事件，统计各资源类型的请求数、传输字节数和拦截数
+
+过滤器在后台线程中通过调试端口单独连接到ChromeDriver控制的标签页，与chromedriver的会话互不影响。
+"""
+
+import re
+import json
+import asyncio
+import threading
+import urllib.request
+from config.settings import REQUEST_FILTER_PROFILES
+from core.cdp_driver import CdpConnection, CDP_COMMAND_TIMEOUT
+from core.startup_cache import _load, _save
+from utils.exceptions import BrowserError, ConfigError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# DevTools协议中的资源类型
+RESOURCE_TYPES = (
+    "Document", "Stylesheet", "Image", "Media", "Font", "Script", "TextTrack", "XHR", "Fetch",
+    "Prefetch", "EventSource", "WebSocket", "Manifest", "SignedExchange", "Ping",
+    "CSPViolationReport", "Preflight", "Other",
+)
+
+# 各资源类型的平均大小（字节），由bench.filter_check的对照加载测得，用于估算节省的流量
+SIZE_CACHE_FILE = "request_filter_sizes.json"
+
+def _wildcard_to_regex(pattern):
+    """将setBlockedURLs风格的通配符（*匹配任意字符）转换为正则表达式"""
+    return re.compile("^" + ".*".join(re.escape(part) for part in pattern.split("*")) + "$", re.IGNORECASE)
+
+def get_filter_profile(profile):
+    """
+    获取过滤配置
+
+    Args:
+        profile: 配置名称（REQUEST_FILTER_PROFILES中的键）或配置字典
+
+    Returns:
+        tuple: (名称, 配置字典)
+
+    Raises:
+        ConfigError: 配置不存在或资源类型有误
+    """
+    if isinstance(profile, str):
+        if profile not in REQUEST_FILTER_PROFILES:
+            raise ConfigError(f"未知的请求过滤配置: {profile}，可选: {', '.join(REQUEST_FILTER_PROFILES)}")
+        name, config = profile, REQUEST_FILTER_PROFILES[profile]
+    else:
+        name, config = "custom", profile or {}
+    unknown = [value for value in config.get("block_types", []) if value not in RESOURCE_TYPES]
+    if unknown:
+        raise ConfigError(f"未知的资源类型: {', '.join(unknown)}，可选: {', '.join(RESOURCE_TYPES)}")
+    return name, config
+
+def _page_websocket_url(debugging_port, target_id):
+    """获取标签页的DevTools websocket地址，chromedriver的窗口句柄即标签页的targetId"""
+    with urllib.request.urlopen(f"http://127.0.0.1:{debugging_port}/json/list", timeout=5) as response:
+        targets = [target for target in json.loads(response.read()) if target.get("type") == "page"]
+    for target in targets:
+        if target.get("id") == target_id:
+            return target["webSocketDebuggerUrl"]
+    if targets:
+        return targets[0]["webSocketDebuggerUrl"]
+    raise BrowserError(f"调试端口{debugging_port}上没有可连接的标签页")
+
+class RequestFilter:
+    """一个标签页的请求过滤器"""
+
+    def __init__(self, profile, disable_cache=False):
+        """
+        Args:
+            profile: 过滤配置名称或配置字典，空字典表示只统计不拦截
+            disable_cache (bool): 是否禁用浏览器缓存，对照测试时保证每次都从网络加载
+        """
+        self.name, config = get_filter_profile(profile)
+        self.block_types = list(config.get("block_types", []))
+        self.block_urls = list(config.get("block_urls", []))
+        self.allow_urls = list(config.get("allow_urls", []))
+        self._allow_patterns = [_wildcard_to_regex(pattern) for pattern in self.allow_urls]
+        self.disable_cache = disable_cache
+        self.requests = {}  # 资源类型 -> 完成的请求数
+        self.bytes = {}  # 资源类型 -> 传输的字节数
+        self.blocked = {}  # 资源类型 -> 拦截的请求数
+        self.allowed = 0  # 因allow_urls放行的请求数
+        self._types = {}
+        self._loop = None
+        self._thread = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def is_allowed(self, url):
+        """URL是否在放行列表中"""
+        return any(pattern.match(url) for pattern in self._allow_patterns)
+
+    def install(self, driver):
+        """
+        连接到ChromeDriver当前的标签页并开始过滤，需要在访问页面之前调用
+
+        Args:
+            driver: 已启动的ChromeDriver实例
+        """
+        ws_url = _page_websocket_url(driver.debugging_port, driver.driver.current_window_handle)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="request-filter", daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._attach(ws_url), self._loop).result(CDP_COMMAND_TIMEOUT)
+        except Exception:
+            self.close()
+            raise
+        logger.info(
+            f"请求过滤已启用（{self.name}）: 拦截类型[{', '.join(self.block_types) or '无'}]，"
+            f"拦截URL {len(self.block_urls)}条，放行URL {len(self.allow_urls)}条"
+        )
+
+    async def _attach(self, ws_url):
+        """建立连接，订阅事件并下发过滤规则"""
+        self._connection = await CdpConnection.connect(ws_url)
+        self._connection.subscribe("Network.requestWillBeSent", self._on_request)
+        self._connection.subscribe("Network.loadingFinished", self._on_finished)
+        self._connection.subscribe("Network.loadingFailed", self._on_failed)
+        self._connection.subscribe("Fetch.requestPaused", self._on_paused)
+        await self._connection.send("Network.enable")
+        if self.disable_cache:
+            await self._connection.send("Network.setCacheDisabled", {"cacheDisabled": True})
+        if self.block_urls:
+            await self._connection.send("Network.setBlockedURLs", {"urls": self.block_urls})
+        if self.block_types:
+            patterns = [{"urlPattern": "*", "resourceType": value, "requestStage": "Request"} for value in self.block_types]
+            await self._connection.send("Fetch.enable", {"patterns": patterns})
+
+    def _count(self, counter, resource_type, amount=1):
+        with self._lock:
+            counter[resource_type] = counter.get(resource_type, 0) + amount
+
+    def _on_request(self, params, session_id):
+        self._types[params["requestId"]] = params.get("type", "Other")
+
+    def _on_finished(self, params, session_id):
+        resource_type = self._types.pop(params["requestId"], "Other")
+        self._count(self.requests, resource_type)
+        self._count(self.bytes, resource_type, int(params.get("encodedDataLength", 0)))
+
+    def _on_failed(self, params, session_id):
+        resource_type = self._types.pop(params["requestId"], params.get("type", "Other"))
+        # setBlockedURLs拦截的请求，blockedReason为inspector；Fetch拦截的请求在_on_paused中统计
+        if params.get("blockedReason") == "inspector":
+            self._count(self.blocked, resource_type)
+
+    def _on_paused(self, params, session_id):
+        request_id = params["requestId"]
+        if self.is_allowed(params["request"]["url"]):
+            with self._lock:
+                self.allowed += 1
+            command = self._connection.send("Fetch.continueRequest", {"requestId": request_id})
+        else:
+            self._count(self.blocked, params.get("resourceType", "Other"))
+            command = self._connection.send("Fetch.failRequest", {"requestId": request_id, "errorReason": "BlockedByClient"})
+        asyncio.ensure_future(command).add_done_callback(self._check_command)
+
+    def _check_command(self, future):
+        if not future.cancelled() and future.exception():
+            logger.debug(f"处理被拦截的请求失败: {str(future.exception())}")
+
+    def estimated_saved_bytes(self, sizes=None):
+        """
+        按各资源类型的平均大小估算拦截节省的字节数
+
+        Args:
+            sizes (dict): 资源类型 -> 平均大小，默认使用bench.filter_check测得的数据
+
+        Returns:
+            int: 估算的字节数，没有平均大小数据时返回None
+        """
+        sizes = _load(SIZE_CACHE_FILE) if sizes is None else sizes
+        if not sizes:
+            return None
+        with self._lock:
+            return int(sum(count * sizes.get(resource_type, 0) for resource_type, count in self.blocked.items()))
+
+    def stats(self):
+        """
+        过滤统计
+
+        Returns:
+            dict: 请求数、传输字节数、拦截数（按资源类型）和估算节省的字节数
+        """
+        with self._lock:
+            stats = {
+                "profile": self.name,
+                "requests": sum(self.requests.values()),
+                "bytes": sum(self.bytes.values()),
+                "blocked": sum(self.blocked.values()),
+                "allowed": self.allowed,
+                "blocked_by_type": dict(self.blocked),
+                "requests_by_type": dict(self.requests),
+                "bytes_by_type": dict(self.bytes),
+            }
+        stats["estimated_saved_bytes"] = self.estimated_saved_bytes()
+        return stats
+
+    def format_stats(self):
+        """生成一行统计说明"""
+        stats = self.stats()
+        blocked = ", ".join(f"{key} {value}" for key, value in sorted(stats["blocked_by_type"].items())) or "无"
+        saved = stats["estimated_saved_bytes"]
+        saved_text = f"，约节省{saved / 1024:.0f}KB" if saved is not None else ""
+        return (
+            f"请求过滤（{self.name}）: 拦截{stats['blocked']}个请求（{blocked}）{saved_text}，"
+            f"完成{stats['requests']}个请求，传输{stats['bytes'] / 1024:.0f}KB"
+        )
+
+    def close(self):
+        """断开连接并停止后台线程，断开后拦截规则随之失效"""
+        if self._loop is None:
+            return
+        if self._connection is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._connection.close(), self._loop).result(5)
+            except Exception:
+                pass
+            self._connection = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop.close()
+        self._loop = None
+
+def save_resource_sizes(stats):
+    """
+    保存各资源类型的平均大小，供之后估算节省的流量
+
+    Args:
+        stats (dict): 未拦截任何请求的RequestFilter.stats()
+    """
+    sizes = _load(SIZE_CACHE_FILE)
+    for resource_type, count in stats["requests_by_type"].items():
+        if count:
+            sizes[resource_type] = stats["bytes_by_type"].get(resource_type, 0) // count
+    _save(SIZE_CACHE_FILE, sizes)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+重试与备选方式模块，为页面操作提供统一的失败分类、有限次数的退避重试和熔断
+
+一个操作可以有多种执行方式（例如鼠标点击和键盘选择），FallbackChain按顺序尝试：
+- 每种方式遇到可重试的失败（元素失效、点击被遮挡、元素未找到、等待超时）时按抖动的指数退避重试
+- 浏览器已断开等致命错误和已对页面产生影响的失败不再重试，也不换用其他方式
+- 连续失败达到阈值的方式暂时跳过（熔断），过一段时间再试一次
+- 记录每种方式的成功率和耗时，样本足够后优先使用期望耗时最短的方式
+"""
+
+import time
+import random
+import threading
+from config.settings import (
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT,
+)
+from utils.exceptions import RetryExhaustedError
+from utils.tracing import tracer, KIND_SLEEP
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 失败类型
+FAILURE_STALE = "stale"  # 元素已从页面中移除或重新渲染
+FAILURE_TIMEOUT = "timeout"  # 等待页面状态超时
+FAILURE_INTERCEPTED = "intercepted"  # 点击被其他元素遮挡或元素不可交互
+FAILURE_NOT_FOUND = "not_found"  # 元素未找到
+FAILURE_COMMITTED = "committed"  # 操作已对页面产生影响
+FAILURE_FATAL = "fatal"  # 浏览器或会话已不可用
+FAILURE_UNKNOWN = "unknown"
+
+# 按异常类名分类，不需要导入selenium；沿继承链查找，子类优先
+_FAILURE_KINDS = {
+    "StaleElementReferenceException": FAILURE_STALE,
+    "TimeoutException": FAILURE_TIMEOUT,
+    "ElementClickInterceptedException": FAILURE_INTERCEPTED,
+    "ElementNotInteractableException": FAILURE_INTERCEPTED,
+    "MoveTargetOutOfBoundsException": FAILURE_INTERCEPTED,
+    "NoSuchElementException": FAILURE_NOT_FOUND,
+    "ElementNotFoundError": FAILURE_NOT_FOUND,
+    "StepCommittedError": FAILURE_COMMITTED,
+    "InvalidSessionIdException": FAILURE_FATAL,
+    "NoSuchWindowException": FAILURE_FATAL,
+    "SessionExpiredError": FAILURE_FATAL,
+}
+
+# WebDriverException中表示浏览器已断开的信息
+_FATAL_MESSAGES = ("chrome not reachable", "disconnected", "session deleted", "target window already closed")
+
+# 在同一种方式内重试的失败类型
+RETRYABLE_FAILURES = frozenset([FAILURE_STALE, FAILURE_INTERCEPTED, FAILURE_NOT_FOUND, FAILURE_TIMEOUT])
+
+# 不再换用其他方式的失败类型
+TERMINAL_FAILURES = frozenset([FAILURE_COMMITTED, FAILURE_FATAL])
+
+# 按期望耗时排序前，每种方式至少需要的尝试次数
+MIN_SAMPLES = 5
+
+def classify_failure(error):
+    """
+    判断异常的失败类型
+
+    Args:
+        error (Exception): 异常
+
+    Returns:
+        str: FAILURE_*常量
+    """
+    for cls in type(error).__mro__:
+        kind = _FAILURE_KINDS.get(cls.__name__)
+        if kind:
+            return kind
+    message = str(error).lower()
+    if any(text in message for text in _FATAL_MESSAGES):
+        return FAILURE_FATAL
+    return FAILURE_UNKNOWN
+
+def backoff_delay(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """
+    第attempt次重试前的等待时间，在[0, min(最长时间, 基础时间 * 2^attempt)]内随机取值
+
+    Args:
+        attempt (int): 已失败的次数，从1开始
+
+    Returns:
+        float: 等待时间（秒）
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+class StrategyStats:
+    """一种执行方式的统计信息和熔断状态"""
+
+    def __init__(self, name):
+        self.name = name
+        self.attempts = 0
+        self.successes = 0
+        self.total_seconds = 0.0
+        self.failures = {}
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    @property
+    def success_rate(self):
+        """成功率，没有尝试过时为None"""
+        return self.successes / self.attempts if self.attempts else None
+
+    @property
+    def mean_seconds(self):
+        """每次尝试的平均耗时（秒）"""
+        return self.total_seconds / self.attempts if self.attempts else 0.0
+
+    @property
+    def expected_seconds(self):
+        """得到一次成功的期望耗时（秒）"""
+        return self.mean_seconds / max(self.success_rate or 0.0, 0.05)
+
+    def is_open(self, now=None):
+        """熔断是否生效，超过重置时间后允许再试一次"""
+        if self.opened_at is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.opened_at < CIRCUIT_RESET_TIMEOUT
+
+    def record(self, seconds, failure=None):
+        """
+        记录一次尝试
+
+        Args:
+            seconds (float): 耗时（秒）
+            failure (str): 失败类型，成功时为None
+        """
+        self.attempts += 1
+        self.total_seconds += seconds
+        if failure is None:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.opened_at = None
+            return
+        self.failures[failure] = self.failures.get(failure, 0) + 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            if not self.is_open():
+                logger.warning(f"{self.name}连续失败{self.consecutive_failures}次，{CIRCUIT_RESET_TIMEOUT}秒内跳过")
+            self.opened_at = time.monotonic()
+
+    def to_dict(self):
+        """转换为可序列化的字典"""
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "success_rate": round(self.success_rate, 3) if self.attempts else None,
+            "mean_seconds": round(self.mean_seconds, 3),
+            "failures": dict(self.failures),
+            "circuit_open": self.is_open(),
+        }
+
+# 全部方式的统计信息，键为"操作.方式"
+_STATS = {}
+_stats_lock = threading.Lock()
+
+def get_strategy_stats(name):
+    """获取或创建一种方式的统计信息"""
+    with _stats_lock:
+        stats = _STATS.get(name)
+        if stats is None:
+            stats = _STATS[name] = StrategyStats(name)
+        return stats
+
+def strategy_stats():
+    """
+    获取全部方式的统计信息
+
+    Returns:
+        dict: 键为"操作.方式"，值为统计字典
+    """
+    with _stats_lock:
+        return {name: stats.to_dict() for name, stats in _STATS.items()}
+
+def format_strategy_stats():
+    """生成各方式的统计表，没有记录时返回空字符串"""
+    with _stats_lock:
+        items = sorted(_STATS.values(), key=lambda stats: stats.name)
+    if not items:
+        return ""
+    lines = [f"{'方式':<32}{'尝试':>6}{'成功率':>8}{'平均耗时(s)':>12}  失败类型"]
+    for stats in items:
+        failures = ", ".join(f"{kind}={count}" for kind, count in sorted(stats.failures.items())) or "-"
+        lines.append(
+            f"{stats.name:<32}{stats.attempts:>6}{stats.success_rate or 0:>8.0%}"
+            f"{stats.mean_seconds:>12.3f}  {failures}{'（熔断中）' if stats.is_open() else ''}"
+        )
+    return "\n".join(lines)
+
+def reset_strategy_stats():
+    """清空全部统计信息和熔断状态"""
+    with _stats_lock:
+        _STATS.clear()
+
+class FallbackChain:
+    """一个操作的多种执行方式"""
+
+    def __init__(self, name, strategies, max_attempts=RETRY_MAX_ATTEMPTS, retry_on=RETRYABLE_FAILURES):
+        """
+        Args:
+            name (str): 操作名称
+            strategies (list): [(方式名称, 函数), ...]，按优先顺序排列，函数的参数与run相同
+            max_attempts (int): 每种方式的最多尝试次数
+            retry_on (frozenset): 在同一种方式内重试的失败类型
+        """
+        self.name = name
+        self.strategies = list(strategies)
+        self.max_attempts = max_attempts
+        self.retry_on = retry_on
+
+    def ordered(self):
+        """
+        按优先顺序返回本次要尝试的方式
+
+        所有方式的样本都足够时按期望耗时排序，否则保持声明的顺序；熔断中的方式排到最后，
+        全部熔断时仍然尝试，保证操作不会因为熔断而直接失败。
+
+        Returns:
+            list: [(方式名称, 函数, StrategyStats), ...]
+        """
+        entries = [
+            (name, func, get_strategy_stats(f"{self.name}.{name}"))
+            for name, func in self.strategies
+        ]
+        if all(stats.attempts >= MIN_SAMPLES for _, _, stats in entries):
+            entries.sort(key=lambda entry: entry[2].expected_seconds)
+        now = time.monotonic()
+        return [entry for entry in entries if not entry[2].is_open(now)] + \
+            [entry for entry in entries if entry[2].is_open(now)]
+
+    def run(self, *args, **kwargs):
+        """
+        依次尝试各种方式，返回第一个成功的结果
+
+        Returns:
+            成功的方式的返回值
+
+        Raises:
+            Exception: 致命错误或已对页面产生影响的失败，原样抛出
+            RetryExhaustedError: 所有方式都失败
+        """
+        last_error = None
+        for name, func, stats in self.ordered():
+            for attempt in range(1, self.max_attempts + 1):
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    failure = classify_failure(e)
+                    stats.record(time.perf_counter() - started, failure)
+                    last_error = e
+                    logger.warning(f"{self.name}: {name}方式第{attempt}次失败（{failure}）: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+                    if failure in TERMINAL_FAILURES:
+                        raise
+                    if failure not in self.retry_on or attempt == self.max_attempts or stats.is_open():
+                        break
+                    delay = backoff_delay(attempt)
+                    with tracer.span("retry_backoff", KIND_SLEEP, seconds=round(delay, 3)):
+                        time.sleep(delay)
+                    continue
+                stats.record(time.perf_counter() - started)
+                if attempt > 1 or name != self.strategies[0][0]:
+                    logger.info(f"{self.name}: 通过{name}方式完成（第{attempt}次尝试）")
+                return result
+        raise RetryExhaustedError(f"{self.name}: 所有方式均失败，最后的错误: {str(last_error)}") from last_error
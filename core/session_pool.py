@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+浏览器会话池模块，保持若干个已启动的ChromeDriver，在多个任务之间复用
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from core.driver import ChromeDriver
+from config.settings import (
+    DEFAULT_URL, POOL_SIZE, POOL_MAX_JOBS_PER_SESSION, POOL_IDLE_TIMEOUT,
+)
+from utils.exceptions import BrowserError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class PooledSession:
+    """会话池中的一个浏览器会话"""
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver: 已启动的ChromeDriver实例
+        """
+        self.driver = driver
+        self.jobs_served = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class SessionPool:
+    """
+    ChromeDriver会话池
+
+    会话在任务之间通过reset()回到reset_url，空闲超过idle_timeout的会话会被关闭，
+    处理任务数达到max_jobs_per_session的会话会被重启。
+    """
+
+    def __init__(self, size=POOL_SIZE, driver_factory=None, reset_url=DEFAULT_URL,
+                 max_jobs_per_session=POOL_MAX_JOBS_PER_SESSION, idle_timeout=POOL_IDLE_TIMEOUT):
+        """
+        初始化会话池
+
+        Args:
+            size (int): 最多同时存在的浏览器数量
+            driver_factory: 创建ChromeDriver实例的函数，默认使用ChromeDriver()
+            reset_url (str): 会话启动和重置后打开的URL
+            max_jobs_per_session (int): 每个会话最多处理的任务数
+            idle_timeout (float): 空闲会话的最长保留时间（秒）
+        """
+        self.size = size
+        self.driver_factory = driver_factory or ChromeDriver
+        self.reset_url = reset_url
+        self.max_jobs_per_session = max_jobs_per_session
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._busy = {}
+        self._starting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        """上下文管理器入口，预热会话池"""
+        self.warm_up()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出，关闭全部会话"""
+        self.close()
+
+    def _create_session(self):
+        """
+        启动一个新的浏览器会话并打开reset_url
+
+        Returns:
+            PooledSession: 新会话
+        """
+        driver = self.driver_factory()
+        try:
+            driver.start()
+            if not driver.navigate_to(self.reset_url):
+                raise BrowserError(f"新会话无法打开页面: {self.reset_url}")
+        except Exception:
+            driver.quit()
+            raise
+        logger.info("会话池启动了一个新的浏览器会话")
+        return PooledSession(driver)
+
+    def _discard(self, session, reason):
+        """关闭会话，不放回会话池"""
+        logger.info(f"关闭浏览器会话（{reason}），已处理 {session.jobs_served} 个任务")
+        session.driver.quit()
+
+    def warm_up(self):
+        """启动会话直到达到会话池大小"""
+        while True:
+            with self._condition:
+                if self._closed or len(self._idle) + len(self._busy) + self._starting >= self.size:
+                    return
+                self._starting += 1
+            try:
+                session = self._create_session()
+            finally:
+                with self._condition:
+                    self._starting -= 1
+            with self._condition:
+                self._idle.append(session)
+                self._condition.notify()
+
+    def evict_idle(self):
+        """
+        关闭空闲时间超过idle_timeout的会话
+
+        Returns:
+            int: 关闭的会话数量
+        """
+        now = time.monotonic()
+        with self._condition:
+            expired = [s for s in self._idle if now - s.last_used > self.idle_timeout]
+            self._idle = [s for s in self._idle if s not in expired]
+            self._condition.notify_all()
+        for session in expired:
+            self._discard(session, "空闲超时")
+        return len(expired)
+
+    def acquire(self, timeout=None):
+        """
+        从会话池取出一个可用的会话，没有空闲会话且未达到上限时启动新会话
+
+        Args:
+            timeout (float): 等待空闲会话的超时时间（秒），None表示一直等待
+
+        Returns:
+            ChromeDriver: 可用的浏览器会话
+
+        Raises:
+            BrowserError: 会话池已关闭或等待超时
+        """
+        self.evict_idle()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise BrowserError("会话池已关闭")
+                    if self._idle:
+                        session = self._idle.pop()
+                        create = False
+                        break
+                    if len(self._busy) + self._starting < self.size:
+                        self._starting += 1
+                        create = True
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise BrowserError("等待空闲浏览器会话超时")
+                    self._condition.wait(remaining)
+
+            if create:
+                try:
+                    session = self._create_session()
+                finally:
+                    with self._condition:
+                        self._starting -= 1
+                        self._condition.notify()
+            elif not session.driver.is_alive():
+                # 健康检查失败，丢弃后重新获取
+                self._discard(session, "健康检查失败")
+                with self._condition:
+                    self._condition.notify()
+                continue
+
+            with self._condition:
+                self._busy[id(session.driver)] = session
+            return session.driver
+
+    def release(self, driver, healthy=True):
+        """
+        将会话归还会话池，重置后供下一个任务使用
+
+        Args:
+            driver: acquire()返回的ChromeDriver实例
+            healthy (bool): 任务是否正常结束，False时直接关闭该会话
+        """
+        with self._condition:
+            session = self._busy.pop(id(driver), None)
+        if session is None:
+            logger.warning("归还的浏览器会话不属于该会话池")
+            return
+
+        session.jobs_served += 1
+        session.last_used = time.monotonic()
+
+        if self._closed:
+            self._discard(session, "会话池已关闭")
+        elif not healthy:
+            self._discard(session, "任务异常")
+        elif session.jobs_served >= self.max_jobs_per_session:
+            self._discard(session, "达到任务数上限")
+        elif driver.memory is not None and not driver.memory.reclaim(self.reset_url):
+            self._discard(session, "内存超过阈值")
+        elif not driver.reset(self.reset_url):
+            self._discard(session, "重置失败")
+        else:
+            with self._condition:
+                self._idle.append(session)
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        以上下文管理器方式使用会话，任务抛出异常时该会话不再复用
+
+        Args:
+            timeout (float): 等待空闲会话的超时时间（秒）
+
+        Yields:
+            ChromeDriver: 可用的浏览器会话
+        """
+        driver = self.acquire(timeout)
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self.release(driver, healthy)
+
+    def close(self):
+        """关闭会话池中的全部空闲会话，正在使用的会话在归还时关闭"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for session in idle:
+            self._discard(session, "会话池已关闭")
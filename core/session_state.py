@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+会话状态模块，在已登录的浏览器中导出Cookie和localStorage，导入到不带配置文件的浏览器中
+
+一次交互式登录导出的状态可以供多个无头或并行的工作浏览器使用。
+状态文件使用Fernet加密保存，密钥来自环境变量KAOSHIXING_STATE_KEY或本地密钥文件。
+"""
+
+import os
+import json
+import time
+from config.settings import (
+    DEFAULT_URL, SESSION_STATE_KEY_FILE, SESSION_STATE_MAX_AGE, SESSION_COOKIE_DOMAIN,
+    SESSION_AUTH_COOKIES, LOGIN_URL_KEYWORDS, LOGIN_TIMEOUT,
+)
+from utils.exceptions import ConfigError, SessionExpiredError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 指定密钥的环境变量
+STATE_KEY_ENV = "KAOSHIXING_STATE_KEY"
+
+# 状态文件格式版本
+STATE_VERSION = 1
+
+# Network.setCookies接受的Cookie字段
+_COOKIE_PARAM_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority")
+
+# 页面加载时写入localStorage，同一份状态在同一个源上只写入一次，避免覆盖页面之后的修改
+_LOCAL_STORAGE_SCRIPT = """
+(function (origin, items, marker) {
+    if (location.origin !== origin) { return; }
+    try {
+        if (localStorage.getItem('__session_state_applied') === marker) { return; }
+        Object.keys(items).forEach(function (key) { localStorage.setItem(key, items[key]); });
+        localStorage.setItem('__session_state_applied', marker);
+    } catch (e) {}
+})(%s, %s, %s);
+"""
+
+def _get_cipher():
+    """
+    获取加密器，密钥文件不存在时生成新密钥
+
+    Returns:
+        Fernet: 加密器
+
+    Raises:
+        ConfigError: 未安装cryptography
+    """
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError:
+        raise ConfigError("会话状态加密需要安装cryptography: pip install cryptography")
+
+    key = os.environ.get(STATE_KEY_ENV)
+    if key:
+        return Fernet(key.encode("ascii"))
+
+    if not os.path.exists(SESSION_STATE_KEY_FILE):
+        os.makedirs(os.path.dirname(SESSION_STATE_KEY_FILE), exist_ok=True)
+        fd = os.open(SESSION_STATE_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(Fernet.generate_key())
+        logger.info(f"已生成会话状态密钥: {SESSION_STATE_KEY_FILE}")
+    with open(SESSION_STATE_KEY_FILE, "rb") as f:
+        return Fernet(f.read().strip())
+
+def export_session_state(driver, path):
+    """
+    导出已登录浏览器的Cookie和当前页面所在源的localStorage，加密写入文件
+
+    Args:
+        driver: 已打开考试星页面的ChromeDriver实例
+        path (str): 状态文件路径
+
+    Returns:
+        dict: 导出的状态
+    """
+    cookies = driver.driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    cookies = [cookie for cookie in cookies if cookie["domain"].lstrip(".").endswith(SESSION_COOKIE_DOMAIN)]
+    storage = driver.driver.execute_script(
+        "var items = {};"
+        "for (var i = 0; i < localStorage.length; i++) { var key = localStorage.key(i); items[key] = localStorage.getItem(key); }"
+        "return { origin: location.origin, items: items };"
+    )
+    storage["items"].pop("__session_state_applied", None)
+    state = {
+        "version": STATE_VERSION,
+        "saved_at": time.time(),
+        "origin": storage["origin"],
+        "local_storage": storage["items"],
+        "cookies": cookies,
+    }
+
+    data = _get_cipher().encrypt(json.dumps(state, ensure_ascii=False).encode("utf-8"))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    logger.info(f"已导出会话状态: {len(cookies)}个Cookie，{len(state['local_storage'])}项localStorage -> {path}")
+    return state
+
+def load_session_state(path):
+    """
+    读取并解密状态文件
+
+    Args:
+        path (str): 状态文件路径
+
+    Returns:
+        dict: 会话状态
+
+    Raises:
+        ConfigError: 文件无法解密或格式不正确
+    """
+    cipher = _get_cipher()
+    from cryptography.fernet import InvalidToken
+
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        state = json.loads(cipher.decrypt(data).decode("utf-8"))
+    except InvalidToken:
+        raise ConfigError(f"无法解密会话状态文件，密钥不匹配: {path}")
+    if state.get("version") != STATE_VERSION:
+        raise ConfigError(f"不支持的会话状态文件版本: {state.get('version')}")
+    return state
+
+def session_expires_at(state):
+    """
+    计算会话状态的过期时间
+
+    Args:
+        state (dict): 会话状态
+
+    Returns:
+        float: 过期时间的时间戳，取导出时间加有效期与登录凭证Cookie过期时间中较早的一个
+    """
+    expires_at = state["saved_at"] + SESSION_STATE_MAX_AGE
+    for cookie in state["cookies"]:
+        if cookie["name"] in SESSION_AUTH_COOKIES and not cookie.get("session") and cookie.get("expires", -1) > 0:
+            expires_at = min(expires_at, cookie["expires"])
+    return expires_at
+
+def is_session_expired(state, margin=60):
+    """
+    判断会话状态是否已过期
+
+    Args:
+        state (dict): 会话状态
+        margin (float): 提前视为过期的时间（秒），保证任务执行期间不会过期
+
+    Returns:
+        bool: 是否已过期
+    """
+    return time.time() + margin >= session_expires_at(state)
+
+def apply_session_state(driver, state):
+    """
+    将会话状态导入浏览器，需要在访问考试星页面之前调用
+
+    Cookie通过DevTools协议直接写入，不需要先打开对应的域名；
+    localStorage在页面加载时由注入的脚本写入。
+
+    Args:
+        driver: 已启动的ChromeDriver实例
+        state (dict): 会话状态
+    """
+    cookies = []
+    for cookie in state["cookies"]:
+        param = {field: cookie[field] for field in _COOKIE_PARAM_FIELDS if field in cookie}
+        if cookie.get("session") or param.get("expires", -1) <= 0:
+            param.pop("expires", None)
+        cookies.append(param)
+    driver.driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+    if state["local_storage"]:
+        source = _LOCAL_STORAGE_SCRIPT % (
+            json.dumps(state["origin"]),
+            json.dumps(state["local_storage"], ensure_ascii=False),
+            json.dumps(str(state["saved_at"])),
+        )
+        driver.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+    logger.info(f"已导入会话状态: {len(cookies)}个Cookie，{len(state['local_storage'])}项localStorage")
+
+def is_logged_in(driver):
+    """
+    根据当前页面地址判断是否处于登录状态，未登录时考试星会跳转到登录页面
+
+    Args:
+        driver: ChromeDriver实例
+
+    Returns:
+        bool: 当前页面不是登录页面时返回True
+    """
+    current_url = driver.driver.current_url.lower()
+    return not any(keyword in current_url for keyword in LOGIN_URL_KEYWORDS)
+
+def login_and_export(profile_name, path, url=DEFAULT_URL, timeout=LOGIN_TIMEOUT):
+    """
+    使用配置文件打开有界面的浏览器，等待登录完成后导出会话状态
+
+    配置文件已登录时直接导出；否则在打开的浏览器中手动登录，登录成功后自动导出。
+
+    Args:
+        profile_name (str): Chrome用户配置文件名称
+        path (str): 状态文件路径
+        url (str): 登录后访问的考试星页面
+        timeout (float): 等待手动登录的超时时间（秒）
+
+    Returns:
+        dict: 导出的状态
+
+    Raises:
+        SessionExpiredError: 超时仍未登录
+    """
+    from core.driver import ChromeDriver
+
+    with ChromeDriver(profile_path=profile_name, pacing="throughput") as driver:
+        driver.navigate_to(url)
+        deadline = time.monotonic() + timeout
+        if not is_logged_in(driver):
+            logger.info(f"请在打开的浏览器中登录考试星，{timeout}秒内完成...")
+        while not is_logged_in(driver):
+            if time.monotonic() > deadline:
+                raise SessionExpiredError(f"{timeout}秒内未完成登录")
+            time.sleep(2)
+        # 登录后页面可能再跳转一次，回到目标页面再导出
+        if driver.driver.current_url != url:
+            driver.navigate_to(url)
+        return export_session_state(driver, path)
+
+def ensure_session_state(path, profile_name, url=DEFAULT_URL):
+    """
+    读取会话状态，文件不存在、无法解密或已过期时重新登录并导出
+
+    Args:
+        path (str): 状态文件路径
+        profile_name (str): 重新登录时使用的Chrome用户配置文件名称
+        url (str): 考试星页面
+
+    Returns:
+        dict: 有效的会话状态
+    """
+    if os.path.exists(path):
+        try:
+            state = load_session_state(path)
+            if not is_session_expired(state):
+                remaining = session_expires_at(state) - time.time()
+                logger.info(f"使用会话状态 {path}，剩余有效时间{remaining / 3600:.1f}小时")
+                return state
+            logger.info("会话状态已过期，重新登录")
+        except (ConfigError, ValueError, KeyError) as e:
+            logger.warning(f"会话状态不可用: {str(e)}，重新登录")
+    return login_and_export(profile_name, path, url)
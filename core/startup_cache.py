@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动缓存模块，减少每次启动时重复的解析工作
+
+- chromedriver和Chrome的路径：首次由Selenium Manager解析，之后按Chrome版本复用，
+  Chrome升级后自动重新解析
+- 配置文件列表：按用户数据目录的修改时间复用，新增或删除配置文件后自动重新扫描
+"""
+
+import os
+import re
+import json
+import time
+import platform
+import plistlib
+import subprocess
+from config.settings import CACHE_DIR, CHROME_BINARY_PATH, STARTUP_CACHE_ENABLED
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 缓存文件
+DRIVER_CACHE_FILE = "driver_paths.json"
+PROFILE_CACHE_FILE = "profile_index.json"
+
+_VERSION_PATTERN = re.compile(r"\d+\.\d+\.\d+\.\d+")
+
+def _load(name):
+    """读取缓存文件，不存在或已损坏时返回空字典"""
+    try:
+        with open(os.path.join(CACHE_DIR, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save(name, data):
+    """写入缓存文件，先写临时文件再替换，写入失败时只记录日志"""
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.debug(f"写入缓存失败 {path}: {str(e)}")
+
+def detect_chrome_version(binary_path=None, user_data_dir=None):
+    """
+    不启动浏览器获取Chrome版本号
+
+    Windows读取注册表，macOS读取应用的Info.plist，Linux执行chrome --version，
+    都失败时使用用户数据目录中的Last Version文件（最后一次运行的版本）。
+
+    Args:
+        binary_path (str): Chrome可执行文件路径
+        user_data_dir (str): Chrome用户数据目录
+
+    Returns:
+        str: 版本号，获取失败时返回None
+    """
+    system = platform.system()
+    version = None
+    try:
+        if system == "Windows":
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon") as key:
+                version = winreg.QueryValueEx(key, "version")[0]
+        elif binary_path and os.path.exists(binary_path):
+            if system == "Darwin" and ".app/" in binary_path:
+                plist_path = os.path.join(binary_path.split(".app/")[0] + ".app", "Contents", "Info.plist")
+                with open(plist_path, "rb") as f:
+                    version = plistlib.load(f).get("CFBundleShortVersionString")
+            else:
+                output = subprocess.run(
+                    [binary_path, "--version"], capture_output=True, text=True, timeout=10
+                ).stdout
+                match = _VERSION_PATTERN.search(output)
+                version = match.group(0) if match else None
+    except Exception as e:
+        logger.debug(f"读取Chrome版本失败: {str(e)}")
+
+    if not version and user_data_dir:
+        try:
+            with open(os.path.join(user_data_dir, "Last Version"), "r", encoding="utf-8") as f:
+                version = f.read().strip() or None
+        except OSError:
+            pass
+    return version
+
+def resolve_driver_path(options, user_data_dir=None, refresh=False):
+    """
+    获取chromedriver路径，并将Chrome路径写入options.binary_location
+
+    缓存的版本与当前Chrome版本一致且文件仍然存在时直接使用缓存，
+    否则调用Selenium Manager解析并更新缓存。
+
+    Args:
+        options: selenium ChromeOptions
+        user_data_dir (str): Chrome用户数据目录，用于读取版本号
+        refresh (bool): 是否忽略缓存重新解析
+
+    Returns:
+        tuple: (chromedriver路径, 是否来自缓存)
+    """
+    cache = _load(DRIVER_CACHE_FILE) if STARTUP_CACHE_ENABLED and not refresh else {}
+    if cache and cache.get("binary_setting") == CHROME_BINARY_PATH:
+        version = detect_chrome_version(cache.get("browser_path"), user_data_dir)
+        paths = (cache.get("driver_path"), cache.get("browser_path"))
+        if version and version == cache.get("chrome_version") and all(path and os.path.exists(path) for path in paths):
+            options.binary_location = cache["browser_path"]
+            logger.info(f"使用缓存的chromedriver: {cache['driver_path']}（Chrome {version}）")
+            return cache["driver_path"], True
+
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+    # Selenium Manager会把解析到的Chrome路径写入options.binary_location
+    options.binary_location = CHROME_BINARY_PATH if CHROME_BINARY_PATH and os.path.exists(CHROME_BINARY_PATH) else ""
+    started = time.perf_counter()
+    driver_path = SeleniumManager().driver_location(options)
+    browser_path = options.binary_location
+    version = detect_chrome_version(browser_path, user_data_dir)
+    logger.info(f"Selenium Manager解析chromedriver用时{time.perf_counter() - started:.2f}秒: {driver_path}")
+
+    if STARTUP_CACHE_ENABLED and version and browser_path:
+        _save(DRIVER_CACHE_FILE, {
+            "chrome_version": version,
+            "binary_setting": CHROME_BINARY_PATH,
+            "driver_path": driver_path,
+            "browser_path": browser_path,
+        })
+    return driver_path, False
+
+def invalidate_driver_path():
+    """删除chromedriver路径缓存"""
+    try:
+        os.remove(os.path.join(CACHE_DIR, DRIVER_CACHE_FILE))
+    except OSError:
+        pass
+
+def cached_profile_index(user_data_dir, scan):
+    """
+    获取配置文件列表，用户数据目录的修改时间未变化时使用缓存
+
+    新增或删除配置文件目录会更新用户数据目录的修改时间，缓存随之失效。
+
+    Args:
+        user_data_dir (str): Chrome用户数据目录
+        scan: 扫描配置文件的函数，返回配置文件名称列表
+
+    Returns:
+        list: 配置文件名称列表
+    """
+    if not STARTUP_CACHE_ENABLED:
+        return scan()
+    try:
+        mtime_ns = os.stat(user_data_dir).st_mtime_ns
+    except OSError:
+        return scan()
+
+    cache = _load(PROFILE_CACHE_FILE)
+    entry = cache.get(user_data_dir)
+    if entry and entry.get("mtime_ns") == mtime_ns:
+        return list(entry["profiles"])
+
+    profiles = scan()
+    cache[user_data_dir] = {"mtime_ns": mtime_ns, "profiles": profiles}
+    _save(PROFILE_CACHE_FILE, cache)
+    return profiles
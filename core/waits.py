@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+页面内等待模块，在页面中用MutationObserver监听DOM变化，条件满足时立即返回
+
+WebDriverWait每隔一段时间向chromedriver发送一次检查命令，条件满足后最多还要再等一个检查间隔。
+ChromeDriver.wait_for把条件交给页面中的脚本：先检查一次，不满足时注册MutationObserver，
+每次DOM变化后重新检查，整个等待只产生一次execute_async_script调用。
+
+PageCondition同时可以像expected_conditions一样直接传给WebDriverWait，用于没有ChromeDriver实例的场合。
+"""
+
+# 条件类型
+WAIT_PRESENT = "present"  # 元素存在
+WAIT_CLICKABLE = "clickable"  # 元素可见且可用
+WAIT_TEXT = "text"  # 元素的文本匹配正则表达式
+WAIT_COUNT = "count"  # 匹配的元素数量达到要求
+WAIT_HIDDEN = "hidden"  # 匹配的元素全部隐藏或不存在
+WAIT_VISIBLE_ELEMENT = "visible_element"  # 指定的元素可见
+
+# 等待的默认超时时间（秒）
+DEFAULT_WAIT_TIMEOUT = 10
+
+# 没有DOM变化时（例如只有CSS动画改变了可见性）的兜底检查间隔（毫秒）
+FALLBACK_CHECK_INTERVAL_MS = 250
+
+# 在页面中检查条件，满足时返回{index: 命中的选择器序号, value: 元素、元素列表或true}，否则返回null
+_EVALUATE_FUNCTION = """
+function evaluateCondition(c) {
+    function query(kind, value) {
+        if (kind === 'xpath') {
+            var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var j = 0; j < result.snapshotLength; j++) { nodes.push(result.snapshotItem(j)); }
+            return nodes;
+        }
+        return Array.from(document.querySelectorAll(value));
+    }
+    function isVisible(el) { return el.offsetParent !== null && !el.disabled; }
+    function matches(el) {
+        if (c.visible && !isVisible(el)) { return false; }
+        if (c.text && (el.textContent || '').trim().indexOf(c.text) === -1) { return false; }
+        if (c.role && el.getAttribute('role') !== c.role && el.tagName.toLowerCase() !== c.role) { return false; }
+        if (c.pattern && !new RegExp(c.pattern).test((el.textContent || '').trim())) { return false; }
+        return true;
+    }
+    if (c.kind === 'visible_element') {
+        if (!c.element.isConnected) { return {stale: true}; }
+        return c.element.offsetParent !== null ? {index: -1, value: c.element} : null;
+    }
+    if (c.kind === 'hidden') {
+        for (var h = 0; h < c.chain.length; h++) {
+            if (query(c.chain[h][0], c.chain[h][1]).some(isVisible)) { return null; }
+        }
+        return {index: -1, value: true};
+    }
+    for (var i = 0; i < c.chain.length; i++) {
+        var found = query(c.chain[i][0], c.chain[i][1]).filter(matches);
+        if (c.kind === 'count') {
+            if (found.length >= c.count) { return {index: i, value: found}; }
+            continue;
+        }
+        if (found.length) { return {index: i, value: c.all ? found : found[0]}; }
+    }
+    return null;
+}
+"""
+
+# 立即检查一次，供WebDriverWait轮询使用
+CHECK_SCRIPT = _EVALUATE_FUNCTION + "return evaluateCondition(arguments[0]);"
+
+# 条件满足或超时时返回，超时返回null
+WAIT_SCRIPT = _EVALUATE_FUNCTION + """
+var condition = arguments[0], timeoutMs = arguments[1], fallbackMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var result = evaluateCondition(condition);
+if (result) {
+    done(result);
+} else {
+    var finished = false, observer, fallback, timer;
+    var finish = function (value) {
+        if (finished) { return; }
+        finished = true;
+        observer.disconnect();
+        clearInterval(fallback);
+        clearTimeout(timer);
+        done(value);
+    };
+    var recheck = function () {
+        var value = evaluateCondition(condition);
+        if (value) { finish(value); }
+    };
+    observer = new MutationObserver(recheck);
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    fallback = setInterval(recheck, fallbackMs);
+    timer = setTimeout(function () { finish(null); }, timeoutMs);
+}
+"""
+
+def _selector_kind(by):
+    """将选择器类型转换为脚本中使用的类型，取值与selenium的By.CSS_SELECTOR、By.XPATH相同"""
+    return "xpath" if by == "xpath" else "css"
+
+class PageCondition:
+    """在页面中检查的等待条件"""
+
+    def __init__(self, kind, selectors=(), text=None, role=None, visible=False, all_matches=False,
+                 pattern=None, count=None, element=None, description=""):
+        """
+        Args:
+            kind (str): 条件类型，WAIT_*常量
+            selectors (list): 按顺序尝试的选择器，元素为(CSS或XPATH, 选择器)
+            text (str): 元素文本需要包含的内容（可选）
+            role (str): 元素的role属性或标签名（可选）
+            visible (bool): 是否只匹配可见且可用的元素
+            all_matches (bool): 是否返回命中选择器的全部元素
+            pattern (str): 元素文本需要匹配的正则表达式（JavaScript语法），WAIT_TEXT使用
+            count (int): 需要达到的元素数量，WAIT_COUNT使用
+            element: 等待可见的WebElement，WAIT_VISIBLE_ELEMENT使用
+            description (str): 条件说明，用于日志和耗时追踪
+        """
+        self.kind = kind
+        self.selectors = list(selectors)
+        self.text = text
+        self.role = role
+        self.visible = visible or kind == WAIT_CLICKABLE
+        self.all_matches = all_matches
+        self.pattern = pattern
+        self.count = count
+        self.element = element
+        self.description = description or kind
+        self.matched_index = None  # 最近一次满足条件时命中的选择器序号
+
+    def to_script_arg(self):
+        """转换为页面脚本的参数"""
+        return {
+            "kind": self.kind,
+            "chain": [(_selector_kind(by), value) for by, value in self.selectors],
+            "text": self.text,
+            "role": self.role,
+            "visible": self.visible,
+            "all": self.all_matches,
+            "pattern": self.pattern,
+            "count": self.count,
+            "element": self.element,
+        }
+
+    def accept(self, result):
+        """
+        处理页面脚本的返回值
+
+        Returns:
+            条件满足时返回元素、元素列表或True，否则返回False
+
+        Raises:
+            StaleElementReferenceException: 等待的元素已从页面中移除
+        """
+        if not result:
+            return False
+        if result.get("stale"):
+            from selenium.common.exceptions import StaleElementReferenceException
+            raise StaleElementReferenceException(f"{self.description}: 元素已从页面中移除")
+        self.matched_index = result["index"]
+        return result["value"]
+
+    def __call__(self, web_driver):
+        """立即检查一次，用法与expected_conditions相同"""
+        return self.accept(web_driver.execute_script(CHECK_SCRIPT, self.to_script_arg()))
+
+def element_present(selectors, text=None, role=None, all_matches=False, description=""):
+    """元素存在，对应EC.presence_of_element_located"""
+    return PageCondition(WAIT_PRESENT, selectors, text=text, role=role, all_matches=all_matches, description=description)
+
+def element_clickable(selectors, text=None, role=None, all_matches=False, description=""):
+    """元素可见且可用，对应EC.element_to_be_clickable"""
+    return PageCondition(WAIT_CLICKABLE, selectors, text=text, role=role, all_matches=all_matches, description=description)
+
+def text_matches(selectors, pattern, visible=False, description=""):
+    """元素的文本匹配正则表达式，对应EC.text_to_be_present_in_element"""
+    return PageCondition(WAIT_TEXT, selectors, pattern=pattern, visible=visible, description=description)
+
+def count_reached(selectors, count, visible=False, description=""):
+    """匹配的元素数量达到count，返回全部匹配的元素"""
+    return PageCondition(WAIT_COUNT, selectors, count=count, visible=visible, description=description)
+
+def all_hidden(selectors, description=""):
+    """匹配的元素全部隐藏或不存在，对应EC.invisibility_of_element_located"""
+    return PageCondition(WAIT_HIDDEN, selectors, description=description)
+
+def element_visible(element, description=""):
+    """指定的元素可见，对应EC.visibility_of"""
+    return PageCondition(WAIT_VISIBLE_ELEMENT, element=element, description=description or "visibility_of")
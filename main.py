@@ -3,24 +3,48 @@
 
 """
 自动化脚本：使用指定的Chrome用户配置文件打开特定网站并执行操作
+
+selenium、接口模式和DevTools协议驱动都在需要时才导入，参数和题库有误时可以立即退出。
 """
 
+import time
+
+# 进程启动时间，用于统计冷启动耗时
+STARTED_AT = time.perf_counter()
+
 import argparse
+import contextlib
+import functools
+import itertools
 import sys
 import os
-from core.driver import ChromeDriver
+from core.driver import ChromeDriver, PACING_POLICIES
 from core.profile_manager import ProfileManager
-from config.settings import DEFAULT_URL
-from utils.logger import setup_logger
+from core.session_pool import SessionPool
+from core.session_state import ensure_session_state, login_and_export
+from core.memory import track_job
+from config.settings import DEFAULT_URL, PACING_MODE, PROFILE_SNAPSHOT, API_BASE_URL, API_PAPER_VIEW_URL, JOURNAL_ENABLED, REQUEST_FILTER_PROFILES, DEDUP_ENABLED, DEDUP_LIBRARY, DAEMON_WORKERS, DAEMON_POLL_INTERVAL
+from utils.logger import setup_logger, enable_json_logging, get_process_queue, configure_worker_logging, log_context, format_logging_stats
 from utils.helpers import is_valid_url
+from utils.exceptions import BrowserError, ConfigError
+from utils.tracing import tracer
+from core.retry import format_strategy_stats
 from automation.paper_settings import configure_paper_settings
 from automation.question_management import add_section, add_question, QuestionType
+from automation.question_import import iter_questions, iter_batches, import_questions, DEFAULT_BATCH_SIZE
+from automation.paper_spec import load_spec, compile_plan, execute_plan
+from automation.journal import BuildJournal
+from automation.question_index import QuestionIndex
+from automation.job_queue import JobQueue, format_metrics
 
 logger = setup_logger(__name__)
 
 # 默认使用的配置文件名称
 DEFAULT_PROFILE = "Profile 2"
 
+# 题库文件本身有误时的异常：格式错误、文件不存在或无法读取、编码错误，只影响该文件对应的试卷
+IMPORT_FILE_ERRORS = (ConfigError, OSError, UnicodeDecodeError)
+
 def perform_automation_steps(driver):
     """执行自动化步骤"""
     try:
@@ -35,14 +59,352 @@ def perform_automation_steps(driver):
         logger.error(f"执行自动化步骤时发生错误: {str(e)}")
         return False
 
+def log_cold_start(driver):
+    """记录从进程启动到第一个WebDriver命令完成的耗时"""
+    if driver.first_command_at is not None:
+        logger.info(f"冷启动耗时: 进程启动到首个WebDriver命令{driver.first_command_at - STARTED_AT:.2f}秒")
+
+def load_first_batch(import_file, batch_size):
+    """
+    解析题库的第一批题目，浏览器在第一批解析成功后才启动
+
+    Args:
+        import_file (str): 题库文件路径
+        batch_size (int): 每批题目数量
+
+    Returns:
+        iterator: 包含第一批在内的全部批次，题库为空时返回None
+    """
+    batches = iter_batches(iter_questions(import_file), batch_size)
+    first_batch = next(batches, None)
+    if first_batch is None:
+        return None
+    logger.info(f"题库第一批解析完成: {len(first_batch)}题")
+    return itertools.chain([first_batch], batches)
+
+def run_import(driver, import_file, batches, restart=False, library=None):
+    """
+    导入一个题库，启用导入日志时同一题库未完成的任务从中断处继续
+
+    Args:
+        driver: 已打开创建试卷页面的ChromeDriver实例
+        import_file (str): 题库文件路径
+        batches: 题目批次迭代器
+        restart (bool): 是否放弃未完成的任务重新创建试卷
+        library (str): 题库名称，指定时启用去重，同一题库中已有的题目也跳过，None时使用配置中的DEDUP_LIBRARY
+
+    Returns:
+        ImportStats: 导入统计信息
+    """
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(log_context(job=os.path.basename(import_file)))
+        stack.enter_context(track_job(driver, os.path.basename(import_file)))
+        library = library or DEDUP_LIBRARY
+        index = stack.enter_context(QuestionIndex(library=library)) if DEDUP_ENABLED or library else None
+        if not JOURNAL_ENABLED:
+            return import_questions(driver, batches, index=index)
+        journal = stack.enter_context(BuildJournal())
+        if journal.start_job(import_file, restart) and journal.paper_url:
+            logger.info(f"打开中断的试卷: {journal.paper_url}")
+            if not driver.navigate_to(journal.paper_url):
+                raise BrowserError(f"无法打开中断的试卷: {journal.paper_url}")
+        stats = import_questions(driver, batches, journal, index)
+        if stats.succeeded:
+            journal.finish()
+        return stats
+
+def build_papers(driver_factory, url, import_files, batch_size, first_batches, restart=False, library=None):
+    """
+    使用预热的浏览器会话依次创建多份试卷，每个题库文件对应一份试卷
+
+    Args:
+        driver_factory: 创建ChromeDriver实例的函数
+        url (str): 创建试卷页面的URL
+        import_files (list): 题库文件路径列表
+        batch_size (int): 每批题目数量
+        first_batches: 第一个题库已解析的批次迭代器
+        restart (bool): 是否放弃未完成的导入任务重新创建试卷
+        library (str): 去重使用的题库名称
+
+    Returns:
+        int: 创建成功的试卷数量
+    """
+    succeeded = 0
+    with SessionPool(size=1, driver_factory=driver_factory, reset_url=url) as pool:
+        for index, import_file in enumerate(import_files):
+            # 一个题库有误（文件不存在、编码错误或后续批次中有格式错误的行）时跳过，继续创建其余的试卷
+            try:
+                batches = first_batches if index == 0 else load_first_batch(import_file, batch_size)
+                if batches is None:
+                    logger.error(f"题库为空: {import_file}")
+                    continue
+                logger.info(f"开始创建第{index + 1}/{len(import_files)}份试卷: {import_file}")
+                with pool.session() as driver:
+                    if run_import(driver, import_file, batches, restart, library).succeeded:
+                        succeeded += 1
+            except IMPORT_FILE_ERRORS as e:
+                logger.error(f"题库读取失败 {import_file}: {str(e)}")
+    logger.info(f"试卷创建完成: 成功{succeeded}份，共{len(import_files)}份")
+    return succeeded
+
+def build_papers_via_api(driver, api_base, import_files, batch_size, first_batches):
+    """
+    使用浏览器的登录状态通过后台接口创建试卷，每个题库文件对应一份试卷
+
+    Args:
+        driver: 已打开考试星页面的ChromeDriver实例，只用于读取登录状态和核对结果
+        api_base (str): 接口地址
+        import_files (list): 题库文件路径列表
+        batch_size (int): 每批题目数量
+        first_batches: 第一个题库已解析的批次迭代器
+
+    Returns:
+        int: 创建成功的试卷数量
+    """
+    from automation.api_client import KaoshixingApiClient, session_from_driver, import_questions_via_api
+    
+    cookies, headers = session_from_driver(driver)
+    succeeded = 0
+    last_paper_id = None
+    with KaoshixingApiClient(cookies, headers, base_url=api_base) as client:
+        for index, import_file in enumerate(import_files):
+            # 一个题库有误时跳过，继续创建其余的试卷
+            try:
+                batches = first_batches if index == 0 else load_first_batch(import_file, batch_size)
+                if batches is None:
+                    logger.error(f"题库为空: {import_file}")
+                    continue
+                paper_name = os.path.splitext(os.path.basename(import_file))[0]
+                paper_id, stats = import_questions_via_api(client, paper_name, batches)
+            except IMPORT_FILE_ERRORS as e:
+                logger.error(f"题库读取失败 {import_file}: {str(e)}")
+                continue
+            if paper_id and stats.succeeded:
+                succeeded += 1
+                last_paper_id = paper_id
+                logger.info(f"试卷已创建: {API_PAPER_VIEW_URL.format(paper_id=paper_id)}")
+    
+    # 在浏览器中打开最后创建的试卷核对结果
+    if last_paper_id and api_base == API_BASE_URL:
+        # 查看页面没有编辑器，不等待编辑器的就绪元素
+        driver.navigate_to(API_PAPER_VIEW_URL.format(paper_id=last_paper_id), root_selectors=[])
+    logger.info(f"试卷创建完成: 成功{succeeded}份，共{len(import_files)}份")
+    return succeeded
+
+def build_paper_job(profile_name, url, import_file, batch_size, pacing, snapshot=None, session_state=None, restart=False, request_filter=None, library=None, memory_limit=None):
+    """
+    在独立进程中使用隔离的浏览器创建一份试卷，供进程池调用
+
+    Args:
+        profile_name (str): 用于复制登录状态的Chrome用户配置文件名称
+        url (str): 创建试卷页面的URL
+        import_file (str): 题库文件路径
+        batch_size (int): 每批题目数量
+        pacing (str): 节奏策略名称
+        snapshot (bool): 是否从配置文件快照复制临时用户数据目录
+        session_state (dict): 会话状态，指定时使用不带配置文件的空白浏览器并导入会话状态
+        restart (bool): 是否放弃未完成的导入任务重新创建试卷
+        request_filter (str): 请求过滤配置名称，None时使用配置中的REQUEST_FILTER
+        library (str): 去重使用的题库名称
+        memory_limit (float): 浏览器常驻内存的阈值（MB），None时使用配置
+
+    Returns:
+        bool: 试卷是否创建成功，会话状态失效时返回None
+    """
+    try:
+        batches = load_first_batch(import_file, batch_size)
+        if batches is None:
+            logger.error(f"题库为空: {import_file}")
+            return False
+        if session_state:
+            driver = ChromeDriver(pacing=pacing, isolated=True, session_state=session_state, request_filter=request_filter, memory_limit=memory_limit)
+        else:
+            driver = ChromeDriver(profile_path=profile_name, pacing=pacing, isolated=True, snapshot=snapshot, request_filter=request_filter, memory_limit=memory_limit)
+        with driver:
+            if not driver.navigate_to(url):
+                return None if driver.session_expired else False
+            return run_import(driver, import_file, batches, restart, library).succeeded
+    except Exception as e:
+        logger.error(f"创建试卷失败 {import_file}: {str(e)}")
+        return False
+
+def build_papers_parallel(workers, profile_name, url, import_files, batch_size, pacing, snapshot=None, session_state_file=None, restart=False, request_filter=None, library=None, memory_limit=None):
+    """
+    使用进程池并行创建多份试卷，每个进程使用独立的调试端口和临时用户数据目录
+
+    Args:
+        workers (int): 并行进程数
+        profile_name (str): Chrome用户配置文件名称
+        url (str): 创建试卷页面的URL
+        import_files (list): 题库文件路径列表，每个文件对应一份试卷
+        batch_size (int): 每批题目数量
+        pacing (str): 节奏策略名称
+        snapshot (bool): 是否从配置文件快照复制临时用户数据目录
+        session_state_file (str): 会话状态文件，指定时各进程使用空白浏览器并导入会话状态，
+            会话失效时重新登录一次并重试失效的试卷
+        restart (bool): 是否放弃未完成的导入任务重新创建试卷
+        request_filter (str): 请求过滤配置名称，None时使用配置中的REQUEST_FILTER
+        library (str): 去重使用的题库名称
+        memory_limit (float): 浏览器常驻内存的阈值（MB），None时使用配置
+
+    Returns:
+        int: 创建成功的试卷数量
+    """
+    logger.info(f"使用 {workers} 个进程并行创建 {len(import_files)} 份试卷")
+    session_state = None
+    if session_state_file:
+        session_state = ensure_session_state(session_state_file, profile_name, url)
+    elif snapshot if snapshot is not None else PROFILE_SNAPSHOT:
+        # 先在主进程中创建或刷新快照，各进程只需复制
+        ProfileManager().snapshot_profile(profile_name)
+    job = functools.partial(
+        build_paper_job, profile_name, url, batch_size=batch_size, pacing=pacing,
+        snapshot=snapshot, session_state=session_state, restart=restart, request_filter=request_filter, library=library,
+        memory_limit=memory_limit,
+    )
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # 各进程的日志发送到主进程，由主进程统一写入日志文件
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_worker_logging, initargs=(get_process_queue(),)) as executor:
+        results = list(executor.map(job, import_files))
+        
+        # 会话在运行中失效时重新登录，只重试失效的试卷
+        expired = [index for index, result in enumerate(results) if result is None]
+        if expired and session_state_file:
+            logger.warning(f"{len(expired)}份试卷因会话失效未完成，重新登录后重试")
+            job.keywords["session_state"] = login_and_export(profile_name, session_state_file, url)
+            retried = executor.map(job, [import_files[index] for index in expired])
+            for index, result in zip(expired, retried):
+                results[index] = result
+    for import_file, succeeded in zip(import_files, results):
+        if not succeeded:
+            logger.error(f"试卷创建失败: {import_file}")
+    succeeded = sum(1 for result in results if result)
+    logger.info(f"试卷创建完成: 成功{succeeded}份，共{len(import_files)}份")
+    return succeeded
+
+def daemon_worker(name, stop_event, url, batch_size, pacing, driver_kwargs):
+    """
+    常驻服务的工作进程：保持一个已打开创建试卷页面的浏览器，从任务队列中依次领取任务创建试卷
+
+    Args:
+        name (str): 工作进程名称，记录在任务队列中
+        stop_event: 设置后处理完当前任务退出
+        url (str): 创建试卷页面的URL，每个任务结束后浏览器回到该页面
+        batch_size (int): 每批题目数量
+        pacing (str): 节奏策略名称
+        driver_kwargs (dict): 创建ChromeDriver的其余参数
+    """
+    driver_factory = functools.partial(ChromeDriver, pacing=pacing, **driver_kwargs)
+    with JobQueue() as queue, SessionPool(size=1, driver_factory=driver_factory, reset_url=url) as pool:
+        logger.info("浏览器已预热，开始领取任务")
+        while not stop_event.is_set():
+            job = queue.claim(name)
+            if job is None:
+                stop_event.wait(DAEMON_POLL_INTERVAL)
+                continue
+            logger.info(f"领取任务{job['id']}: {job['import_file']}")
+            succeeded, error, retryable = False, None, True
+            try:
+                batches = load_first_batch(job["import_file"], batch_size)
+                if batches is None:
+                    error, retryable = "题库为空", False
+                else:
+                    with pool.session() as driver:
+                        stats = run_import(driver, job["import_file"], batches, bool(job["restart"]), job["library"])
+                    succeeded = stats.succeeded
+                    if stats.mismatches:
+                        error = f"试卷状态与预期不一致: {stats.mismatches[0]}"
+                    elif not succeeded:
+                        error = f"第{stats.failed_record['line']}行添加失败"
+            except IMPORT_FILE_ERRORS as e:
+                # 题库文件本身有误，重试也不会成功
+                error, retryable = f"题库读取失败: {str(e)}", False
+            except Exception as e:
+                error = str(e)
+            status = queue.finish(job["id"], succeeded, error, retryable)
+            if succeeded:
+                logger.info(f"任务{job['id']}完成")
+            else:
+                logger.error(f"任务{job['id']}失败（{status}）: {error}")
+
 def main():
     """主程序入口"""
     parser = argparse.ArgumentParser(description='使用指定的Chrome用户配置文件打开网站')
     parser.add_argument('-p', '--profile', type=str, default=DEFAULT_PROFILE, help='Chrome用户配置文件名称')
     parser.add_argument('-u', '--url', type=str, default=DEFAULT_URL, help='要打开的网站URL')
+    parser.add_argument('-i', '--import-file', type=str, nargs='+', help='要导入的题库文件（.jsonl/.csv/.xlsx），多个文件时依次创建多份试卷并复用浏览器')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='题库每批解析的题目数量')
+    parser.add_argument('--workers', type=int, default=1, help='并行创建试卷的进程数，大于1时每个进程使用隔离的浏览器实例')
+    parser.add_argument('--engine', type=str, default='selenium', choices=['selenium', 'cdp'], help='浏览器驱动：selenium使用chromedriver，cdp直接使用DevTools协议，多份试卷在同一浏览器的多个标签页中并发创建')
+    parser.add_argument('--backend', type=str, default='browser', choices=['browser', 'api'], help='创建试卷的方式：browser通过页面操作，api复用登录状态直接调用后台接口')
+    parser.add_argument('--api-base', type=str, default=API_BASE_URL, help='接口模式使用的接口地址，可以指向本地模拟服务')
+    parser.add_argument('--pacing', type=str, default=PACING_MODE, choices=list(PACING_POLICIES), help='操作节奏策略：human模拟人类随机等待，throughput等到页面状态就绪后立即继续')
+    parser.add_argument('--snapshot', action='store_true', default=None, help='使用配置文件的精简快照启动浏览器（只含Cookie、Local Storage和Preferences，存放在内存盘中），不读取和锁定原配置文件')
+    parser.add_argument('--session-state', type=str, help='会话状态文件：浏览器不使用配置文件，启动后导入文件中加密保存的Cookie和localStorage；文件不存在或已过期时先用配置文件打开浏览器登录并导出')
+    parser.add_argument('--request-filter', type=str, choices=list(REQUEST_FILTER_PROFILES), help='通过DevTools协议拦截自动化不需要的请求（统计、图片、字体等），默认使用配置中的REQUEST_FILTER；可先用 python -m bench.filter_check 检查编辑器是否仍然可用')
+    parser.add_argument('--memory-limit', type=float, metavar='MB', help='跟踪浏览器进程树的常驻内存和页面的JS堆（需要安装psutil），常驻内存超过此值（MB）时在任务之间回收标签页或浏览器，默认使用配置中的MEMORY_MONITOR和MEMORY_RSS_LIMIT_MB')
+    parser.add_argument('--library', type=str, default=DEDUP_LIBRARY, help='题库名称：启用题目去重，导入时跳过试卷和同一题库中已有的题目（合并多份题库时使用）')
+    parser.add_argument('--restart', action='store_true', help='忽略导入日志中未完成的任务，重新创建试卷（默认从上次中断的位置继续）')
+    parser.add_argument('--spec', type=str, help='试卷描述文件（.json/.yaml），编译为合并操作后的执行计划，输出计划和预计耗时后执行')
+    parser.add_argument('--plan-only', action='store_true', help='只输出--spec的执行计划，不启动浏览器')
+    parser.add_argument('--daemon', type=int, nargs='?', const=DAEMON_WORKERS, metavar='WORKERS', help='以常驻服务运行：启动指定数量的工作进程（默认DAEMON_WORKERS），各自保持预热的浏览器，从任务队列中持续领取任务创建试卷，Ctrl+C停止')
+    parser.add_argument('--submit', type=str, nargs='+', metavar='FILE', help='把题库文件提交到常驻服务的任务队列后退出，可与--library、--restart一起使用')
+    parser.add_argument('--queue-status', action='store_true', help='输出任务队列深度、任务耗时和工作进程利用率后退出')
+    parser.add_argument('--log-json', action='store_true', help='日志文件使用JSON Lines格式，每条记录附带job、worker、step字段')
+    parser.add_argument('--trace', type=str, help='记录每一步的耗时并导出为Chrome trace JSON文件，可在chrome://tracing中查看（不包含--workers子进程）')
     args = parser.parse_args()
+    if args.spec:
+        # 试卷描述文件只在单个浏览器中通过页面操作执行
+        conflicts = [
+            option for option, used in (
+                ('-i/--import-file', args.import_file),
+                ('--backend api', args.backend == 'api'),
+                ('--engine cdp', args.engine == 'cdp'),
+                ('--workers', args.workers > 1),
+                ('--daemon', args.daemon),
+            ) if used
+        ]
+        if conflicts:
+            parser.error(f"--spec不能与{', '.join(conflicts)}一起使用")
+    
+    if args.log_json:
+        enable_json_logging()
+    if args.trace:
+        tracer.enable()
     
     try:
+        # 提交任务和查询队列不需要浏览器
+        if args.submit:
+            missing = [path for path in args.submit if not os.path.isfile(path)]
+            if missing:
+                logger.error(f"题库文件不存在: {', '.join(missing)}")
+                sys.exit(1)
+            with JobQueue() as queue:
+                ids = [queue.submit(path, args.library, args.restart) for path in args.submit]
+                logger.info(f"已提交{len(ids)}个任务: {ids}，等待中的任务{queue.depth()}个")
+            return
+        if args.queue_status:
+            with JobQueue() as queue:
+                print(format_metrics(queue.metrics()))
+            return
+        
+        # 先编译试卷描述并输出执行计划，描述有误时不启动浏览器
+        plan = None
+        if args.spec:
+            plan = compile_plan(load_spec(args.spec), args.pacing)
+            print(plan.format())
+            if args.plan_only:
+                return
+        
+        # 先解析题库第一批，避免题库有误时白白启动浏览器
+        batches = None
+        if args.import_file and args.workers <= 1:
+            batches = load_first_batch(args.import_file[0], args.batch_size)
+            if batches is None:
+                logger.error(f"题库为空: {args.import_file[0]}")
+                sys.exit(1)
+        
         # 获取Chrome用户配置文件
         profile_manager = ProfileManager()
         
@@ -62,6 +424,10 @@ def main():
                 if not available_profiles:
                     logger.error("未找到任何Chrome用户配置文件")
                     sys.exit(1)
+                if args.daemon:
+                    # 常驻服务不等待输入
+                    logger.error(f"可用的Chrome用户配置文件: {', '.join(available_profiles)}，请通过 -p 指定")
+                    sys.exit(1)
                     
                 print("可用的Chrome用户配置文件:")
                 for i, profile in enumerate(available_profiles, 1):
@@ -94,12 +460,90 @@ def main():
         # 获取Chrome用户数据目录
         chrome_user_data_dir = profile_manager.chrome_user_data_dir
         
+        # 指定会话状态文件时使用空白浏览器导入登录状态，否则使用配置文件
+        if args.session_state:
+            driver_kwargs = {"isolated": True, "session_state": ensure_session_state(args.session_state, profile_name, url)}
+        else:
+            driver_kwargs = {"profile_path": profile_name, "snapshot": args.snapshot}
+        driver_kwargs["request_filter"] = args.request_filter
+        driver_kwargs["memory_limit"] = args.memory_limit
+        
+        # 常驻服务：各工作进程使用隔离的浏览器，从任务队列中领取任务
+        if args.daemon:
+            if not args.session_state and (args.snapshot if args.snapshot is not None else PROFILE_SNAPSHOT):
+                # 先在主进程中创建或刷新快照，各进程只需复制
+                profile_manager.snapshot_profile(profile_name)
+            from automation.daemon import JobDaemon
+            worker_args = (url, args.batch_size, args.pacing, {**driver_kwargs, "isolated": True})
+            JobDaemon(daemon_worker, worker_args, workers=args.daemon).serve_forever()
+            return
+        
+        # 接口模式：浏览器只用于登录和核对
+        if args.backend == 'api':
+            if not args.import_file:
+                logger.error("接口模式需要通过 -i 指定题库文件")
+                sys.exit(1)
+            if batches is None:
+                # --workers大于1时上面没有解析第一个题库
+                batches = load_first_batch(args.import_file[0], args.batch_size)
+                if batches is None:
+                    logger.error(f"题库为空: {args.import_file[0]}")
+                    sys.exit(1)
+            with ChromeDriver(pacing=args.pacing, **driver_kwargs) as driver:
+                log_cold_start(driver)
+                if not driver.navigate_to(url):
+                    sys.exit(1)
+                if build_papers_via_api(driver, args.api_base, args.import_file, args.batch_size, batches) < len(args.import_file):
+                    sys.exit(1)
+            return
+        
+        # DevTools协议驱动：一个浏览器，每份试卷一个标签页
+        if args.engine == 'cdp':
+            if not args.import_file:
+                logger.error("cdp驱动需要通过 -i 指定题库文件")
+                sys.exit(1)
+            # --workers大于1时上面没有解析第一个题库
+            jobs = [(args.import_file[0], batches)] if batches is not None else []
+            for import_file in args.import_file[len(jobs):]:
+                file_batches = load_first_batch(import_file, args.batch_size)
+                if file_batches is None:
+                    logger.error(f"题库为空: {import_file}")
+                    sys.exit(1)
+                jobs.append((import_file, file_batches))
+            import asyncio
+            from automation.async_flows import build_papers_async
+            results = asyncio.run(build_papers_async(profile_name, url, jobs))
+            if not all(results):
+                sys.exit(1)
+            return
+        
+        # 多个题库时并行创建试卷
+        if args.import_file and args.workers > 1:
+            if build_papers_parallel(args.workers, profile_name, url, args.import_file, args.batch_size, args.pacing, args.snapshot, args.session_state, args.restart, args.request_filter, args.library, args.memory_limit) < len(args.import_file):
+                sys.exit(1)
+            return
+        
+        # 多个题库时复用同一个浏览器依次创建试卷
+        if args.import_file and len(args.import_file) > 1:
+            driver_factory = functools.partial(ChromeDriver, pacing=args.pacing, **driver_kwargs)
+            if build_papers(driver_factory, url, args.import_file, args.batch_size, batches, args.restart, args.library) < len(args.import_file):
+                sys.exit(1)
+            return
+        
         # 启动Chrome浏览器
-        with ChromeDriver(profile_path=profile_name) as driver:
+        with ChromeDriver(pacing=args.pacing, **driver_kwargs) as driver:
+            log_cold_start(driver)
             # 导航到目标网站
             if driver.navigate_to(url):
                 # 执行自动化步骤
-                if perform_automation_steps(driver):
+                if plan is not None:
+                    with track_job(driver, os.path.basename(args.spec)):
+                        succeeded = execute_plan(driver, plan).succeeded
+                elif batches is not None:
+                    succeeded = run_import(driver, args.import_file[0], batches, args.restart, args.library).succeeded
+                else:
+                    succeeded = perform_automation_steps(driver)
+                if succeeded:
                     logger.info("自动化任务执行成功")
                 else:
                     logger.error("自动化任务执行失败")
@@ -108,6 +552,14 @@ def main():
     except Exception as e:
         logger.error(f"发生错误: {str(e)}")
         sys.exit(1)
+    finally:
+        strategy_summary = format_strategy_stats()
+        if strategy_summary:
+            logger.info("操作方式统计:\n" + strategy_summary)
+        logger.info("日志耗时（emit为自动化线程的耗时）:\n" + format_logging_stats())
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
+            logger.info("耗时汇总:\n" + tracer.format_summary())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
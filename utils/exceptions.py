@@ -15,4 +15,24 @@ class BrowserError(Exception):
     
 class ConfigError(Exception):
     """配置相关错误"""
-    pass 
\ No newline at end of file
+    pass
+    
+class ElementNotFoundError(BrowserError):
+    """页面元素定位失败"""
+    pass
+    
+class ApiError(Exception):
+    """后台接口调用相关错误"""
+    pass
+    
+class SessionExpiredError(BrowserError):
+    """登录状态已失效"""
+    pass
+    
+class StepCommittedError(BrowserError):
+    """操作已经对页面产生影响后失败，重试或换用其他方式可能重复操作"""
+    pass
+    
+class RetryExhaustedError(BrowserError):
+    """所有方式和重试次数都已用完"""
+    pass
\ No newline at end of file
@@ -3,65 +3,356 @@
 
 """
 日志工具模块，用于记录程序运行日志
+
+所有模块的日志记录器共用一个QueueHandler，调用日志时只把记录放入队列，
+由后台的QueueListener线程统一写入控制台和滚动日志文件，自动化线程不做磁盘I/O。
+并行的工作进程通过configure_worker_logging把记录发送到主进程的队列，日志文件只有一个写入者。
 """
 
 import os
+import json
+import time
+import queue
+import atexit
+import bisect
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 # 尝试导入配置，如果失败则使用默认值
 try:
-    from config.settings import LOG_LEVEL, LOG_FILE, LOG_FORMAT, LOG_DATE_FORMAT
+    from config.settings import LOG_LEVEL, LOG_FILE, LOG_FORMAT, LOG_DATE_FORMAT, LOG_JSON
 except ImportError:
     LOG_LEVEL = "INFO"
     LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "app.log")
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    LOG_JSON = False
 
 # 确保日志目录存在
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
+# 日志记录附带的上下文字段
+CONTEXT_FIELDS = ("job", "worker", "step")
+
+# 耗时直方图的桶上限（微秒），最后一个桶不设上限
+HISTOGRAM_BUCKETS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+_context = contextvars.ContextVar("log_context", default={})
+
+class EmitHistogram:
+    """耗时直方图"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_US):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """记录一次耗时"""
+        micros = seconds * 1e6
+        index = bisect.bisect_left(self.buckets, micros)
+        with self._lock:
+            self.counts[index] += 1
+            self.total_us += micros
+            self.max_us = max(self.max_us, micros)
+
+    @property
+    def count(self):
+        """记录次数"""
+        return sum(self.counts)
+
+    def percentile(self, percent):
+        """按桶估算百分位数，返回所在桶的上限（微秒），落在最后一个桶时返回最大值"""
+        total = self.count
+        if not total:
+            return 0.0
+        target = percent / 100.0 * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return float(self.buckets[index]) if index < len(self.buckets) else self.max_us
+        return self.max_us
+
+    def to_dict(self):
+        """转换为可序列化的字典"""
+        labels = [f"<={bound}us" for bound in self.buckets] + [f">{self.buckets[-1]}us"]
+        count = self.count
+        return {
+            "count": count,
+            "mean_us": round(self.total_us / count, 2) if count else 0.0,
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "max_us": round(self.max_us, 2),
+            "buckets": {label: value for label, value in zip(labels, self.counts) if value},
+        }
+
+class ContextQueueHandler(QueueHandler):
+    """在调用线程中补充上下文字段后放入队列，并统计放入队列的耗时"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.histogram = EmitHistogram()
+
+    def prepare(self, record):
+        context = _context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        return super().prepare(record)
+
+    def emit(self, record):
+        started = time.perf_counter()
+        if _backend.pid != os.getpid():
+            _backend.ensure(self.level)
+        super().emit(record)
+        self.histogram.observe(time.perf_counter() - started)
+
+class TimedHandler(logging.Handler):
+    """包装写入控制台和文件的处理器，统计后台线程中每条记录的写入耗时"""
+
+    def __init__(self, handler):
+        super().__init__(handler.level)
+        self.handler = handler
+        self.histogram = EmitHistogram()
+
+    def handle(self, record):
+        started = time.perf_counter()
+        result = self.handler.handle(record)
+        self.histogram.observe(time.perf_counter() - started)
+        return result
+
+    def close(self):
+        self.handler.close()
+        super().close()
+
+class JsonFormatter(logging.Formatter):
+    """JSON Lines格式，每条记录一行"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, LOG_DATE_FORMAT),
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _Backend:
+    """当前进程的日志后端"""
+
+    def __init__(self):
+        self.pid = None
+        self.handler = None
+        self.listener = None
+        self.process_queue = None
+        self.json_format = LOG_JSON
+        self._lock = threading.Lock()
+
+    def _build_handlers(self, level):
+        """创建由后台线程使用的控制台和文件处理器"""
+        formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+
+        # 创建控制台处理器
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(level)
+        console_handler.setFormatter(formatter)
+
+        # 创建文件处理器（滚动日志文件）
+        file_handler = RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setLevel(level)
+        file_handler.setFormatter(JsonFormatter() if self.json_format else formatter)
+        return [TimedHandler(console_handler), TimedHandler(file_handler)]
+
+    def ensure(self, level):
+        """
+        获取当前进程的QueueHandler，首次调用时启动后台写入线程
+
+        fork出的子进程继承了父进程的状态但没有写入线程，没有调用configure_worker_logging时
+        在子进程中重新启动自己的写入线程。
+        """
+        with self._lock:
+            if self.pid == os.getpid():
+                return self.handler
+            self.pid = os.getpid()
+            log_queue = queue.SimpleQueue()
+            if self.handler is None:
+                self.handler = ContextQueueHandler(log_queue)
+            else:
+                self.handler.queue = log_queue
+                self.handler.histogram = EmitHistogram()
+            self.handler.setLevel(level)
+            self.listener = QueueListener(log_queue, *self._build_handlers(level), respect_handler_level=True)
+            self.listener.start()
+            self.process_queue = None
+            return self.handler
+
+    def get_process_queue(self):
+        """获取可以在进程间传递的队列，首次调用时后台线程改为从该队列读取"""
+        import multiprocessing
+
+        self.ensure(_level())
+        with self._lock:
+            if self.process_queue is None and self.listener is not None:
+                process_queue = multiprocessing.Queue()
+                handlers = self.listener.handlers
+                self.listener.stop()
+                self.handler.queue = process_queue
+                self.listener = QueueListener(process_queue, *handlers, respect_handler_level=True)
+                self.listener.start()
+                self.process_queue = process_queue
+            return self.process_queue
+
+    def attach(self, process_queue, level):
+        """工作进程：把记录发送到主进程的队列，不启动写入线程"""
+        with self._lock:
+            if self.listener is not None and self.pid == os.getpid():
+                self.listener.stop()
+            self.listener = None
+            self.pid = os.getpid()
+            if self.handler is None:
+                self.handler = ContextQueueHandler(process_queue)
+            else:
+                self.handler.queue = process_queue
+                self.handler.histogram = EmitHistogram()
+            self.handler.setLevel(level)
+
+    def stop(self):
+        """处理完队列中剩余的记录后停止写入线程"""
+        with self._lock:
+            if self.listener is not None and self.pid == os.getpid():
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.handler.flush()
+            self.listener = None
+            self.pid = None
+
+_backend = _Backend()
+atexit.register(_backend.stop)
+
+def _level():
+    """配置的日志级别"""
+    return getattr(logging, LOG_LEVEL.upper(), logging.INFO)
+
 def setup_logger(name):
     """
     设置并返回一个命名的日志记录器
-    
+
     Args:
         name (str): 日志记录器名称
-        
+
     Returns:
         logging.Logger: 配置好的日志记录器
     """
     # 创建日志记录器
     logger = logging.getLogger(name)
-    
+
     # 如果已经配置过，直接返回
     if logger.handlers:
         return logger
-        
+
     # 设置日志级别
-    level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
+    level = _level()
     logger.setLevel(level)
-    
-    # 创建控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    
-    # 创建文件处理器（滚动日志文件）
-    file_handler = RotatingFileHandler(
-        LOG_FILE,
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setLevel(level)
-    
-    # 创建格式化器
-    formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-    
-    # 添加处理器到日志记录器
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
-    return logger 
\ No newline at end of file
+
+    # 所有记录器共用同一个队列处理器
+    logger.addHandler(_backend.ensure(level))
+    logger.propagate = False
+
+    return logger
+
+def enable_json_logging():
+    """日志文件改为JSON Lines格式，需要在输出任何日志之前调用"""
+    if not _backend.json_format:
+        _backend.json_format = True
+        _backend.stop()
+        _backend.ensure(_level())
+
+def get_process_queue():
+    """
+    获取传给工作进程的日志队列，用法：
+        ProcessPoolExecutor(initializer=configure_worker_logging, initargs=(get_process_queue(),))
+
+    Returns:
+        multiprocessing.Queue: 日志队列
+    """
+    return _backend.get_process_queue()
+
+def configure_worker_logging(process_queue, worker=None):
+    """
+    在工作进程中调用，日志记录发送到主进程，由主进程统一写入
+
+    Args:
+        process_queue: get_process_queue返回的队列
+        worker: 工作进程标识，默认使用进程号
+    """
+    _backend.attach(process_queue, _level())
+    set_log_context(worker=worker if worker is not None else f"pid-{os.getpid()}")
+
+def set_log_context(**fields):
+    """设置当前上下文的日志字段（job、worker、step），值为None时删除"""
+    context = dict(_context.get())
+    for field, value in fields.items():
+        if value is None:
+            context.pop(field, None)
+        else:
+            context[field] = value
+    _context.set(context)
+
+@contextmanager
+def log_context(**fields):
+    """
+    在代码块内为日志记录附加字段
+
+    Args:
+        **fields: job、worker、step等字段
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+def logging_stats():
+    """
+    日志耗时统计：emit为调用线程放入队列的耗时，其余为后台线程写入各处理器的耗时
+
+    Returns:
+        dict: 各部分的直方图
+    """
+    stats = {}
+    if _backend.handler is not None:
+        stats["emit"] = _backend.handler.histogram.to_dict()
+    if _backend.listener is not None:
+        for timed in _backend.listener.handlers:
+            target = "file" if isinstance(timed.handler, RotatingFileHandler) else "console"
+            stats[target] = timed.histogram.to_dict()
+    return stats
+
+def format_logging_stats():
+    """生成日志耗时统计表"""
+    lines = [f"{'阶段':<10}{'次数':>8}{'平均(us)':>10}{'p50(us)':>10}{'p99(us)':>10}{'最大(us)':>10}"]
+    for name, item in logging_stats().items():
+        lines.append(
+            f"{name:<10}{item['count']:>8}{item['mean_us']:>10.1f}{item['p50_us']:>10.0f}"
+            f"{item['p99_us']:>10.0f}{item['max_us']:>10.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+耗时追踪模块，记录自动化过程中每一步的嵌套耗时，可以导出为Chrome trace格式
+
+默认关闭，关闭时span只做一次判断，不记录任何数据。
+导出的JSON可以在chrome://tracing或https://ui.perfetto.dev中打开。
+"""
+
+import os
+import json
+import math
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# span类型
+KIND_STEP = "step"  # 由多个操作组成的步骤
+KIND_WEBDRIVER = "webdriver"  # 一次WebDriver命令（一次HTTP往返）
+KIND_WAIT = "wait"  # 等待页面状态
+KIND_SLEEP = "sleep"  # 固定等待
+
+class Span:
+    """一段耗时记录"""
+
+    __slots__ = ("name", "kind", "start", "end", "depth", "thread_id", "args")
+
+    def __init__(self, name, kind, start, depth, thread_id, args):
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.end = None
+        self.depth = depth
+        self.thread_id = thread_id
+        self.args = args
+
+    @property
+    def duration(self):
+        """耗时（秒）"""
+        return (self.end or time.perf_counter()) - self.start
+
+def percentile(sorted_values, percent):
+    """按最近秩法计算百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class Tracer:
+    """耗时追踪器"""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """开始记录"""
+        self.enabled = True
+
+    def disable(self):
+        """停止记录"""
+        self.enabled = False
+
+    def clear(self):
+        """清空已记录的数据"""
+        with self._lock:
+            self.spans = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, kind=KIND_STEP, **args):
+        """
+        记录一段耗时，可以嵌套
+
+        Args:
+            name (str): 名称，例如"navigate_to"
+            kind (str): 类型，KIND_STEP、KIND_WEBDRIVER、KIND_WAIT或KIND_SLEEP
+            **args: 附加信息，导出到trace的args中
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span = Span(name, kind, time.perf_counter(), len(stack), threading.get_ident(), args)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def traced(self, name=None, kind=KIND_STEP):
+        """
+        装饰器，将函数调用记录为一段耗时
+
+        Args:
+            name (str): 名称，默认使用函数名
+            kind (str): 类型
+        """
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(span_name, kind):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def to_chrome_trace(self):
+        """
+        转换为Chrome trace-event格式
+
+        Returns:
+            dict: 包含traceEvents的字典
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": round((span.start - self._origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {key: str(value) for key, value in span.args.items()},
+            }
+            for span in sorted(spans, key=lambda span: span.start)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """
+        导出为Chrome trace JSON文件
+
+        Args:
+            path (str): 文件路径
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        logger.info(f"已导出耗时追踪: {path}（{len(self.spans)}段）")
+
+    def summary(self):
+        """
+        按名称和类型汇总耗时
+
+        Returns:
+            dict: {(名称, 类型): {count, total, p50, p95, max}}，时间单位为秒
+        """
+        groups = {}
+        with self._lock:
+            for span in self.spans:
+                groups.setdefault((span.name, span.kind), []).append(span.duration)
+
+        result = {}
+        for key, durations in groups.items():
+            durations.sort()
+            result[key] = {
+                "count": len(durations),
+                "total": sum(durations),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "max": durations[-1],
+            }
+        return result
+
+    def kind_totals(self):
+        """
+        按类型汇总最内层耗时，用于查看时间花在了等待、固定等待还是WebDriver命令上
+
+        Returns:
+            dict: {类型: 总耗时（秒）}，嵌套在其他span中的部分不重复计算
+        """
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        # 按线程和开始时间排序后一次遍历，用栈记录当前的祖先span，每个span从直接父span的耗时中扣除
+        spans.sort(key=lambda span: (span.thread_id, span.start, span.depth))
+        own = {}
+        stack = []
+        for span in spans:
+            duration = span.duration
+            own[id(span)] = duration
+            while stack and (
+                stack[-1][0].thread_id != span.thread_id or stack[-1][0].depth >= span.depth
+                or span.start + duration > stack[-1][1]
+            ):
+                stack.pop()
+            if stack and stack[-1][0].depth == span.depth - 1:
+                own[id(stack[-1][0])] -= duration
+            stack.append((span, span.start + duration))
+        for span in spans:
+            totals[span.kind] = totals.get(span.kind, 0.0) + max(own[id(span)], 0.0)
+        return totals
+
+    def format_summary(self):
+        """
+        生成可读的汇总表
+
+        Returns:
+            str: 按总耗时降序排列的汇总表
+        """
+        rows = sorted(self.summary().items(), key=lambda item: item[1]["total"], reverse=True)
+        lines = [f"{'名称':<36}{'类型':<10}{'次数':>6}{'总计(s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}"]
+        for (name, kind), stats in rows:
+            lines.append(
+                f"{name[:36]:<36}{kind:<10}{stats['count']:>6}{stats['total']:>10.2f}"
+                f"{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}"
+            )
+        totals = self.kind_totals()
+        if totals:
+            lines.append("自身耗时: " + "，".join(f"{kind} {seconds:.2f}s" for kind, seconds in sorted(totals.items())))
+        return "\n".join(lines)
+
+# 全局追踪器
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced